@@ -0,0 +1,431 @@
+"""Benchmark S3Manager against a local S3-compatible stand-in.
+
+Start a stand-in first, for example moto (`moto_server -p 5000`) or MinIO,
+and make sure cred.py holds keys it accepts (moto accepts any). Then:
+
+    python benchmark.py --endpoint-url http://127.0.0.1:5000 --output run.json
+    python benchmark.py --endpoint-url http://127.0.0.1:5000 --compare run.json
+
+Each scenario records wall time, ops/s, MB/s, p50/p99 latency of the S3
+requests it made, and the peak RSS sampled while it ran with its growth
+over the RSS it started at. The queue_* scenarios push the same kind of
+work through TransferScheduler (one folder job plus a file job), the path
+the app uses. The JSON report can be compared with an earlier run to
+catch regressions in the transfer paths.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+from s3_manager import S3Manager, MAX_CONCURRENCY, MULTIPART_CHUNKSIZE
+from transfer_queue import TransferScheduler
+
+try:
+    import psutil
+except ImportError:  # RSS is then read from /proc, where there is one
+    psutil = None
+
+DEFAULT_ENDPOINT = "http://127.0.0.1:5000"
+DEFAULT_BUCKET = "s3manager-benchmark"
+SCENARIOS = ["list_10k", "list_100k", "upload_small", "upload_large", "queue_upload", "download", "queue_download",
+             "delete"]
+
+MB = 1024 * 1024
+
+# Changes larger than this fraction are flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+RSS_SAMPLE_INTERVAL = 0.05  # Seconds between memory samples while a scenario runs
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where it cannot be read."""
+    if psutil:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Samples the current RSS on a thread while a scenario runs.
+
+    ru_maxrss never goes down, so it would charge every scenario with the
+    peak of the ones before it. Sampling gives each scenario its own peak
+    and its growth over the RSS it started with.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = self.peak = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        if self.start is not None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.thread:
+            self.stopped.set()
+            self.thread.join()
+            self.peak = max(self.peak, current_rss())
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def peak_mb(self):
+        return None if self.peak is None else round(self.peak / MB, 1)
+
+    def growth_mb(self):
+        return None if self.peak is None else round((self.peak - self.start) / MB, 1)
+
+
+class RequestTimer:
+    """Records the latency of every S3 request made through a client."""
+
+    def __init__(self, client):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)  # operation name -> seconds
+        client.meta.events.register("before-call.s3", self._on_before_call)
+        client.meta.events.register("after-call.s3", self._on_after_call)
+
+    def reset(self):
+        with self.lock:
+            self.latencies.clear()
+
+    def _on_before_call(self, context=None, **kwargs):
+        if context is not None:
+            context["benchmark_start"] = time.perf_counter()
+
+    def _on_after_call(self, model=None, context=None, **kwargs):
+        start = (context or {}).get("benchmark_start")
+        if start is not None:
+            with self.lock:
+                self.latencies[model.name].append(time.perf_counter() - start)
+
+    def summary(self):
+        with self.lock:
+            latencies = {name: list(values) for name, values in self.latencies.items()}
+        every = [value for values in latencies.values() for value in values]
+        result = {
+            "requests": len(every),
+            "p50_ms": _ms(percentile(every, 0.50)),
+            "p99_ms": _ms(percentile(every, 0.99)),
+            "operations": {},
+        }
+        for name, values in sorted(latencies.items()):
+            result["operations"][name] = {
+                "requests": len(values),
+                "p50_ms": _ms(percentile(values, 0.50)),
+                "p99_ms": _ms(percentile(values, 0.99)),
+            }
+        return result
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class Benchmark:
+    def __init__(self, manager, workdir, args):
+        self.s3 = manager
+        self.workdir = workdir
+        self.args = args
+        self.timer = RequestTimer(manager.s3)
+        self.results = {}
+
+    def run(self, scenarios):
+        self._ensure_bucket()
+        for name in scenarios:
+            print(f"Running {name} ...")
+            self.results[name] = getattr(self, f"scenario_{name}")()
+            print(f"  {format_result(self.results[name])}")
+        return self.results
+
+    def measure(self, func, ops, nbytes=0):
+        """Time `func()` and summarise it as one scenario result."""
+        self.s3.listing_cache.clear()
+        self.timer.reset()
+        with RssSampler() as rss:
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+        result = {
+            "seconds": round(seconds, 3),
+            "ops": ops,
+            "ops_per_s": round(ops / seconds, 1) if seconds else None,
+            "bytes": nbytes,
+            "mb_per_s": round(nbytes / MB / seconds, 1) if seconds and nbytes else None,
+            "peak_rss_mb": rss.peak_mb(),
+            "rss_growth_mb": rss.growth_mb(),
+        }
+        result.update(self.timer.summary())
+        return result
+
+    # --- Scenarios ---
+    def scenario_list_10k(self):
+        return self._list_scenario(10_000)
+
+    def scenario_list_100k(self):
+        return self._list_scenario(100_000)
+
+    def _list_scenario(self, count):
+        prefix = f"list-{count}/"
+        self._populate(prefix, count)
+        listed = []
+        result = self.measure(lambda: listed.extend(self.s3.list_prefix(prefix)[1]), count)
+        result["listed"] = len(listed)
+        return result
+
+    def scenario_upload_small(self):
+        folder = self._small_folder()
+        outcome = []
+        result = self.measure(
+            lambda: outcome.append(self.s3.upload_many(self.s3.iter_upload_targets([folder], ""))),
+            self.args.small_files, self.args.small_files * self.args.small_size)
+        result["failed"] = len(outcome[0][1])
+        return result
+
+    def scenario_upload_large(self):
+        path, size = self._large_file()
+        digest = []
+        result = self.measure(lambda: digest.append(self.s3.upload_file(path, "large/large.bin")), 1, size)
+        result["failed"] = int(digest[0] is None)
+        os.remove(path)
+        return result
+
+    def scenario_download(self):
+        """Download everything the upload scenarios left in the bucket."""
+        keys = [key for key in ("small/", "large/large.bin") if self._exists(key)]
+        nbytes = sum(obj["Size"] for key in keys for page in self.s3.iter_objects(key) for obj in page)
+        target = os.path.join(self.workdir, "download")
+        os.makedirs(target, exist_ok=True)
+
+        outcome = []
+        ops = sum(1 for _ in self.s3.expand_keys(keys))
+        result = self.measure(lambda: outcome.append(self.s3.download_objects(keys, target)), ops, nbytes)
+        result["failed"] = len(outcome[0][1])
+        shutil.rmtree(target, ignore_errors=True)
+        return result
+
+    def scenario_queue_upload(self):
+        """The small files as one folder job and the large file as a file job, through TransferScheduler."""
+        folder = self._small_folder()
+        path, size = self._large_file()
+        counts = []
+
+        def add_jobs(scheduler):
+            scheduler.add_folder_upload(folder, "queue/")
+            scheduler.add_upload(path, "queue/large.bin", size)
+
+        result = self.measure(lambda: counts.append(self._run_queue(add_jobs)),
+                              self.args.small_files + 1, self.args.small_files * self.args.small_size + size)
+        result["failed"] = counts[0]["failed"]
+        os.remove(path)
+        return result
+
+    def scenario_queue_download(self):
+        """Download what queue_upload left as one folder job through TransferScheduler."""
+        if not self._exists("queue/"):
+            print("  nothing under queue/; run queue_upload first")
+            return self.measure(lambda: None, 0)
+        nbytes = sum(obj["Size"] for page in self.s3.iter_objects("queue/") for obj in page)
+        ops = sum(1 for _ in self.s3.expand_keys(["queue/"]))
+        target = os.path.join(self.workdir, "queue-download")
+        os.makedirs(target, exist_ok=True)
+        counts = []
+        result = self.measure(
+            lambda: counts.append(self._run_queue(lambda scheduler: scheduler.add_folder_download("queue/", target))),
+            ops, nbytes)
+        result["failed"] = counts[0]["failed"]
+        shutil.rmtree(target, ignore_errors=True)
+        return result
+
+    def scenario_delete(self):
+        """Delete every key the other scenarios created."""
+        keys = [prefix for prefix in ("list-10000/", "list-100000/", "small/", "large/", "queue/")
+                if self._exists(prefix)]
+        ops = sum(1 for _ in self.s3.expand_keys(keys))
+        outcome = []
+        result = self.measure(lambda: outcome.append(self.s3.delete_objects(keys)), ops)
+        result["failed"] = len(outcome[0][1])
+        return result
+
+    def _run_queue(self, add_jobs):
+        """Queue jobs on a fresh TransferScheduler and wait until none is queued or running; returns its counts."""
+        changed = threading.Event()
+        journal = tempfile.mkstemp(dir=self.workdir, suffix=".db")
+        os.close(journal[0])
+        scheduler = TransferScheduler(self.s3, journal_path=journal[1], on_change=lambda job: changed.set())
+        add_jobs(scheduler)
+        while True:
+            counts, _, _ = scheduler.summary()
+            if not counts["queued"] and not counts["running"]:
+                return counts
+            changed.wait()
+            changed.clear()
+
+    # --- Setup helpers (not timed) ---
+    def _small_folder(self):
+        """The folder of small files the upload scenarios send, written once."""
+        folder = os.path.join(self.workdir, "small")
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+            payload = os.urandom(self.args.small_size)
+            for i in range(self.args.small_files):
+                with open(os.path.join(folder, f"file-{i:06d}.bin"), "wb") as f:
+                    f.write(payload)
+        return folder
+
+    def _large_file(self):
+        """Write the large upload file; returns (path, size). Callers remove it when done."""
+        path = os.path.join(self.workdir, "large.bin")
+        block = os.urandom(MB)
+        with open(path, "wb") as f:
+            for _ in range(self.args.large_size_mb):
+                f.write(block)
+        return path, self.args.large_size_mb * MB
+
+    def _ensure_bucket(self):
+        try:
+            self.s3.s3.head_bucket(Bucket=self.s3.bucket)
+        except ClientError:
+            region = self.s3.s3.meta.region_name
+            kwargs = {"Bucket": self.s3.bucket}
+            if region and region != "us-east-1":
+                kwargs["CreateBucketConfiguration"] = {"LocationConstraint": region}
+            self.s3.s3.create_bucket(**kwargs)
+
+    def _exists(self, prefix):
+        return any(page for page in self.s3.iter_objects(prefix, page_size=1))
+
+    def _populate(self, prefix, count):
+        """Create `count` empty keys under `prefix` unless they are already there."""
+        existing = sum(len(page) for page in self.s3.iter_objects(prefix))
+        if existing >= count:
+            return
+        print(f"  creating {count:,} keys under {prefix} ...")
+        with ThreadPoolExecutor(max_workers=self.s3.pool.max_pool_connections) as pool:
+            list(pool.map(lambda i: self.s3.s3.put_object(Bucket=self.s3.bucket, Key=f"{prefix}key-{i:07d}", Body=b""),
+                          range(count)))
+
+
+def format_result(result):
+    parts = [f"{result['seconds']}s", f"{result['ops_per_s']} ops/s"]
+    if result["mb_per_s"] is not None:
+        parts.append(f"{result['mb_per_s']} MB/s")
+    parts.append(f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms")
+    if result["peak_rss_mb"] is not None:
+        parts.append(f"peak RSS {result['peak_rss_mb']} MB ({result['rss_growth_mb']:+} MB)")
+    return ", ".join(parts)
+
+
+def compare(previous, current):
+    """Print how each scenario moved relative to an earlier report."""
+    # (metric, True if higher is better)
+    metrics = [("ops_per_s", True), ("mb_per_s", True), ("p50_ms", False), ("p99_ms", False), ("peak_rss_mb", False),
+               ("rss_growth_mb", False)]
+    regressions = 0
+    for name, result in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        changes = []
+        for metric, higher_is_better in metrics:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change < -REGRESSION_THRESHOLD if higher_is_better else change > REGRESSION_THRESHOLD
+            regressions += worse
+            changes.append(f"{metric} {before} -> {after} ({change:+.0%}){' REGRESSION' if worse else ''}")
+        print(f"{name}: " + "; ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint-url", default=DEFAULT_ENDPOINT)
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--small-files", type=int, default=1000)
+    parser.add_argument("--small-size", type=int, default=64 * 1024, help="bytes per small file")
+    parser.add_argument("--large-size-mb", type=int, default=2048)
+    parser.add_argument("--part-size-mb", type=int, default=MULTIPART_CHUNKSIZE // MB)
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="earlier report to compare this run against")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    # No local databases: the app's inventory and caches belong to cred.S3_BUCKET, and their commits are not transfers
+    manager = S3Manager(part_size=args.part_size_mb * MB, max_concurrency=args.concurrency,
+                        hash_cache_path=None, inventory_path=None, preview_cache_path=None,
+                        endpoint_url=args.endpoint_url)
+    manager.bucket = args.bucket
+
+    workdir = tempfile.mkdtemp(prefix="s3bench-")
+    try:
+        results = Benchmark(manager, workdir, args).run(scenarios)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "endpoint_url": args.endpoint_url,
+        "config": {
+            "part_size_mb": args.part_size_mb,
+            "concurrency": args.concurrency,
+            "max_pool_connections": manager.pool.max_pool_connections,
+            "small_files": args.small_files,
+            "small_size": args.small_size,
+            "large_size_mb": args.large_size_mb,
+        },
+        "pool": manager.pool.stats(),
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if compare(previous, report):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import mimetypes
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Files smaller than this are sent as they are
+MIN_COMPRESS_SIZE = 4 * 1024
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Content types worth compressing, besides every text/* type
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/xml", "application/javascript", "application/x-javascript",
+    "application/x-ndjson", "application/x-yaml", "application/yaml", "application/sql",
+    "application/x-sh", "application/csv", "image/svg+xml",
+}
+
+# Extensions mimetypes does not map to a text type
+COMPRESSIBLE_EXTENSIONS = {".log", ".jsonl", ".ndjson", ".yaml", ".yml", ".tsv", ".ini", ".cfg", ".toml", ".md"}
+
+# Already-compressed files that mimetypes has no encoding for; compressing them again only costs CPU
+COMPRESSED_EXTENSIONS = {".zst", ".zip", ".7z", ".rar", ".lz4", ".tgz", ".gz", ".bz2", ".xz", ".br"}
+
+# User metadata stored on compressed objects (S3 lower-cases metadata keys)
+META_ORIGINAL_SIZE = "original-size"
+META_ORIGINAL_SHA256 = "original-sha256"
+
+
+def available_encoding(encoding):
+    """Return the Content-Encoding to use for `encoding`, or None when compression is off.
+
+    zstd needs the optional `zstandard` package and falls back to gzip
+    without it.
+    """
+    if not encoding:
+        return None
+    if encoding not in ("gzip", "zstd"):
+        raise ValueError(f"Unsupported compression: {encoding}")
+    if encoding == "zstd" and zstandard is None:
+        print("zstandard is not installed; compressing with gzip instead")
+        return "gzip"
+    return encoding
+
+
+def is_compressible(path, content_type, size):
+    """True for text-like files worth compressing; "data.csv.gz" and friends are already compressed."""
+    if size < MIN_COMPRESS_SIZE:
+        return False
+    if mimetypes.guess_type(path)[1] or os.path.splitext(path)[1].lower() in COMPRESSED_EXTENSIONS:
+        return False
+    if content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES:
+        return True
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_stream(encoding, chunks):
+    """Yield the compressed form of an iterable of byte chunks."""
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def decompress_stream(encoding, chunks):
+    """Yield the decompressed form of an iterable of compressed byte chunks."""
+    if encoding == "zstd":
+        if zstandard is None:
+            raise OSError("Downloading zstd-compressed objects requires the zstandard package")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        decompressor = zlib.decompressobj(31)
+    errors = (zlib.error, zstandard.ZstdError) if zstandard else zlib.error
+    try:
+        for chunk in chunks:
+            out = decompressor.decompress(chunk)
+            if out:
+                yield out
+        flush = getattr(decompressor, "flush", None)
+        if flush:
+            yield flush()
+    except errors as e:
+        raise OSError(f"Corrupt {encoding} data: {e}")
+
+
+def stored_encoding(head):
+    """The encoding of an object this app compressed, from a HeadObject/GetObject response, else None."""
+    encoding = head.get("ContentEncoding")
+    if encoding in ("gzip", "zstd") and META_ORIGINAL_SIZE in head.get("Metadata", {}):
+        return encoding
+    return None
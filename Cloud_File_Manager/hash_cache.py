@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import os
+import sqlite3
+import threading
+
+
+class HashCache:
+    """On-disk index of file checksums keyed by path, size, mtime and inode.
+
+    A cached entry is only trusted while the file's (size, mtime_ns, inode)
+    still match, so unchanged files cost a single stat call. Entries for
+    files that changed are replaced the next time they are hashed.
+    """
+
+    def __init__(self, db_path="hash_cache.db"):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER,"
+            " sha256 BLOB, part_size INTEGER, composite TEXT)"
+        )
+        self.conn.commit()
+
+    def get(self, path, stat=None):
+        """Return (sha256 digest, part_size, composite) for an unchanged file, else None."""
+        path = os.path.abspath(path)
+        stat = stat or os.stat(path)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, inode, sha256, part_size, composite FROM hashes WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if row is None:
+                return None
+            if tuple(row[:3]) != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                self.conn.execute("DELETE FROM hashes WHERE path = ?", (path,))
+                self.conn.commit()
+                return None
+        return row[3], row[4], row[5]
+
+    def put(self, path, stat, sha256, part_size=None, composite=None):
+        """Record checksums computed from the file as it was at `stat`."""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, sha256, part_size, composite),
+            )
+            self.conn.commit()
+
+    def checksums(self, path, part_size):
+        """Return (sha256 digest, multipart composite checksum) for a file.
+
+        Both are computed in one pass when the cache has no usable entry.
+        The composite is S3's "base64(sha256 of part digests)-N" form for
+        the given part size.
+        """
+        stat = os.stat(path)
+        cached = self.get(path, stat)
+        if cached and cached[1] == part_size:
+            return cached[0], cached[2]
+
+        full, composite = self.compute(path, part_size)
+        self.put(path, stat, full, part_size, composite)
+        return full, composite
+
+    @staticmethod
+    def compute(path, part_size):
+        """Read a file once and return (sha256 digest, multipart composite checksum)."""
+        full = hashlib.sha256()
+        combined = hashlib.sha256()
+        parts = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(part_size), b""):
+                full.update(chunk)
+                combined.update(hashlib.sha256(chunk).digest())
+                parts += 1
+        return full.digest(), f"{base64.b64encode(combined.digest()).decode()}-{parts}"
+
+    def sha256(self, path):
+        """Return the SHA256 digest of a file, reading it only if it changed."""
+        cached = self.get(path)
+        if cached:
+            return cached[0]
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        self.put(path, stat, digest.digest())
+        return digest.digest()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,244 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote
+
+# Rows written per transaction while crawling or importing
+INSERT_BATCH = 5000
+
+# Most matches a search returns
+SEARCH_LIMIT = 10000
+
+SEARCH_MODES = ("substring", "prefix", "glob")
+
+
+def _prefix_end(prefix):
+    """Smallest string greater than every string starting with `prefix`."""
+    return prefix + "\U0010ffff"
+
+
+def _glob_literal_prefix(pattern):
+    """The part of a glob before its first wildcard, usable as a key range."""
+    for index, char in enumerate(pattern):
+        if char in "*?[":
+            return pattern[:index]
+    return pattern
+
+
+class BucketInventory:
+    """Local SQLite index of a bucket's keys for instant search.
+
+    The index is filled by a paginated crawl (of the whole bucket or one
+    prefix) or by importing an S3 Inventory report, and S3Manager patches it
+    as objects are uploaded or deleted. Every crawl or import stamps the
+    rows it sees with a new generation and then removes rows under the same
+    prefix that it did not see, so keys deleted elsewhere drop out too.
+    """
+
+    def __init__(self, db_path="inventory.db", bucket=None):
+        self.bucket = bucket  # inventory reports for other buckets are refused
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            " key TEXT PRIMARY KEY, size INTEGER, etag TEXT, last_modified REAL, generation INTEGER)"
+            " WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS objects_size ON objects (size)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS objects_modified ON objects (last_modified)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS crawls (prefix TEXT PRIMARY KEY, finished REAL)")
+        self.conn.commit()
+
+    # --- Building the index ---
+    def crawl(self, s3_manager, prefix="", on_progress=None):
+        """List every key under `prefix` and make the index match it.
+
+        `on_progress(count)` is called after each listing page. Returns the
+        number of keys indexed. If the listing fails the error propagates and
+        nothing is swept: keys not reached yet keep their old rows.
+        """
+        generation = time.time_ns()
+        count = 0
+        for page in s3_manager.iter_objects(prefix):
+            self._store(((obj["Key"], obj["Size"], obj.get("ETag", "").strip('"'),
+                          obj["LastModified"].timestamp()) for obj in page), generation)
+            count += len(page)
+            if on_progress:
+                on_progress(count)
+        self._sweep(prefix, generation)
+        return count
+
+    def import_manifest(self, manifest_path, s3_client=None):
+        """Replace the index with an S3 Inventory report.
+
+        `manifest_path` is a local manifest.json. Its data files are read
+        from the manifest's folder when present (as downloaded with the
+        manifest) and fetched through `s3_client` otherwise. CSV and, with
+        pyarrow installed, Parquet reports are supported. Returns the number
+        of keys imported. A report for a bucket other than this inventory's
+        raises ValueError before anything is changed.
+        """
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        source = manifest.get("sourceBucket")
+        if self.bucket and source != self.bucket:
+            raise ValueError(f"The inventory report is for bucket {source!r}, not {self.bucket!r}")
+        file_format = manifest.get("fileFormat", "CSV").upper()
+        columns = [name.strip() for name in manifest.get("fileSchema", "").split(",")]
+        bucket = manifest.get("destinationBucket", "").split(":::")[-1]
+        folder = os.path.dirname(os.path.abspath(manifest_path))
+
+        generation = time.time_ns()
+        count = 0
+        for entry in manifest.get("files", []):
+            local = os.path.join(folder, os.path.basename(entry["key"]))
+            if os.path.exists(local):
+                with open(local, "rb") as f:
+                    data = f.read()
+            elif s3_client is not None:
+                data = s3_client.get_object(Bucket=bucket, Key=entry["key"])["Body"].read()
+            else:
+                raise FileNotFoundError(f"Inventory file not found next to the manifest: {local}")
+            rows = self._parquet_rows(data) if file_format == "PARQUET" else self._csv_rows(data, columns)
+            count += self._store(rows, generation)
+        self._sweep("", generation)
+        return count
+
+    @staticmethod
+    def _csv_rows(data, columns):
+        """Yield index rows from a (gzipped) inventory CSV with no header."""
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        position = {name: index for index, name in enumerate(columns)}
+        for record in csv.reader(io.StringIO(data.decode("utf-8"))):
+            yield (
+                unquote(record[position["Key"]]),
+                int(record[position["Size"]] or 0) if "Size" in position else 0,
+                record[position["ETag"]] if "ETag" in position else None,
+                _parse_date(record[position["LastModifiedDate"]]) if "LastModifiedDate" in position else None,
+            )
+
+    @staticmethod
+    def _parquet_rows(data):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Importing Parquet inventory reports requires pyarrow")
+        table = pq.read_table(io.BytesIO(data))
+        names = set(table.column_names)
+        for row in table.to_pylist():
+            modified = row.get("last_modified_date") if "last_modified_date" in names else None
+            yield (
+                row["key"],
+                row.get("size") or 0,
+                row.get("e_tag"),
+                modified.timestamp() if modified else None,
+            )
+
+    def _store(self, rows, generation):
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append((*row, generation))
+            if len(batch) >= INSERT_BATCH:
+                count += self._insert(batch)
+                batch = []
+        return count + self._insert(batch)
+
+    def _insert(self, batch):
+        if not batch:
+            return 0
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)", batch)
+            self.conn.commit()
+        return len(batch)
+
+    def _sweep(self, prefix, generation):
+        """Drop rows under `prefix` that the crawl or import with `generation` did not see."""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM objects WHERE key >= ? AND key < ? AND generation < ?",
+                (prefix, _prefix_end(prefix), generation),
+            )
+            if not prefix:
+                self.conn.execute("DELETE FROM crawls")
+            self.conn.execute("INSERT OR REPLACE INTO crawls VALUES (?, ?)", (prefix, time.time()))
+            self.conn.commit()
+
+    # --- Keeping it current ---
+    def put(self, key, size, etag=None, last_modified=None):
+        """Record an object created or replaced through this app."""
+        self._insert([(key, size, etag, last_modified or time.time(), time.time_ns())])
+
+    def remove(self, keys):
+        with self.lock:
+            self.conn.executemany("DELETE FROM objects WHERE key = ?", ((key,) for key in keys))
+            self.conn.commit()
+
+    # --- Queries ---
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def last_crawl(self, prefix=""):
+        """Time of the last full crawl or import covering `prefix`, or None."""
+        with self.lock:
+            rows = self.conn.execute("SELECT prefix, finished FROM crawls").fetchall()
+        times = [finished for crawled, finished in rows if prefix.startswith(crawled)]
+        return max(times) if times else None
+
+    def search(self, query="", mode="substring", min_size=None, max_size=None,
+               modified_after=None, modified_before=None, limit=SEARCH_LIMIT):
+        """Return (key, size, etag, last_modified) rows matching a query, ordered by key.
+
+        `mode` is "prefix" (keys starting with `query`), "substring"
+        (case-insensitive match anywhere in the key) or "glob" (`*`, `?` and
+        `[...]`, case-sensitive). Prefix and glob queries use the key index;
+        sizes are bytes and dates are Unix timestamps.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        clauses, params = [], []
+        if mode == "prefix" or mode == "glob":
+            start = query if mode == "prefix" else _glob_literal_prefix(query)
+            if start:
+                clauses.append("key >= ? AND key < ?")
+                params += [start, _prefix_end(start)]
+            if mode == "glob" and query:
+                clauses.append("key GLOB ?")
+                params.append(query)
+        elif query:
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("key LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        for clause, value in (("size >= ?", min_size), ("size <= ?", max_size),
+                              ("last_modified >= ?", modified_after), ("last_modified < ?", modified_before)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        sql = "SELECT key, size, etag, last_modified FROM objects"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY key LIMIT ?"
+        with self.lock:
+            return self.conn.execute(sql, (*params, limit)).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _parse_date(text):
+    """Parse an inventory timestamp such as 2024-01-31T12:00:00.000Z."""
+    if not text:
+        return None
+    return datetime.datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
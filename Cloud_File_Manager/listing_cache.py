@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def parent_prefix(key):
+    """Return the prefix that lists `key` ("a/b/c.txt" -> "a/b/", "a/b/" -> "a/")."""
+    stripped = key.rstrip("/")
+    if "/" not in stripped:
+        return ""
+    return stripped.rsplit("/", 1)[0] + "/"
+
+
+class ListingCache:
+    """Bounded LRU cache of prefix listings with a time-to-live.
+
+    Entries map a prefix to the (folders, files) it lists. Mutations patch
+    or drop only the entries of the prefixes they touch, and bump a stamp so
+    a listing that started before the mutation is not stored over it.
+    """
+
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # prefix -> (expires_at, folders set, files set)
+        self._stamp = 0
+
+    def stamp(self):
+        with self.lock:
+            return self._stamp
+
+    def get(self, prefix):
+        """Return sorted (folders, files) for a fresh entry, else None."""
+        with self.lock:
+            entry = self.entries.get(prefix)
+            if entry is None:
+                return None
+            expires_at, folders, files = entry
+            if expires_at < time.monotonic():
+                del self.entries[prefix]
+                return None
+            self.entries.move_to_end(prefix)
+            return sorted(folders), sorted(files)
+
+    def put(self, prefix, folders, files, stamp=None):
+        """Store a listing unless the cache was mutated since `stamp`."""
+        with self.lock:
+            if stamp is not None and stamp != self._stamp:
+                return
+            self.entries[prefix] = (time.monotonic() + self.ttl, set(folders), set(files))
+            self.entries.move_to_end(prefix)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, prefix):
+        with self.lock:
+            self._stamp += 1
+            self.entries.pop(prefix, None)
+
+    def invalidate_tree(self, prefix):
+        """Drop `prefix` and every cached prefix below it."""
+        with self.lock:
+            self._stamp += 1
+            for cached in [p for p in self.entries if p.startswith(prefix)]:
+                del self.entries[cached]
+
+    def clear(self):
+        with self.lock:
+            self._stamp += 1
+            self.entries.clear()
+
+    def add_key(self, key):
+        """Patch cached listings for a newly created object or folder marker.
+
+        The key is added to its parent listing and each missing intermediate
+        folder is added to the listing above it.
+        """
+        with self.lock:
+            self._stamp += 1
+            child = key
+            while child:
+                entry = self.entries.get(parent_prefix(child))
+                if entry is not None:
+                    _, folders, files = entry
+                    if child.endswith("/"):
+                        folders.add(child)
+                    else:
+                        files.add(child)
+                child = parent_prefix(child)
+
+    def remove_key(self, key):
+        """Patch cached listings for a deleted object.
+
+        Folder markers only drop their parent listing, because the folder
+        still exists while it has contents. When a file removal may have
+        emptied its folder (the listing is empty or not cached), the folder
+        may have disappeared, so the listing above it is dropped as well.
+        """
+        with self.lock:
+            self._stamp += 1
+            parent = parent_prefix(key)
+            entry = self.entries.get(parent)
+            if key.endswith("/"):
+                self.entries.pop(parent, None)
+                return
+            if entry is not None:
+                _, folders, files = entry
+                files.discard(key)
+                if folders or files:
+                    return
+            if parent:
+                self.entries.pop(parent, None)
+                self.entries.pop(parent_prefix(parent), None)
@@ -0,0 +1,355 @@
+import os
+import sqlite3
+import stat
+import threading
+import time
+
+from local_manager import iter_local_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+LOCAL_INDEX_PATH = "local_index.db"
+
+# Rows written per transaction while scanning
+INSERT_BATCH = 5000
+
+# Seconds filesystem events are collected before the index is updated
+EVENT_DELAY = 0.5
+
+# Most matches a search returns
+SEARCH_LIMIT = 10000
+
+
+def _under(path):
+    """(start, end) bounds of every indexed path strictly below `path`."""
+    prefix = path if path.endswith(os.sep) else path + os.sep
+    return prefix, prefix + "\U0010ffff"
+
+
+def _contains(parent, path):
+    """True if `path` is `parent` or below it (separator-aware, so /ab is not inside /a)."""
+    return path == parent or path.startswith(_under(parent)[0])
+
+
+def _describe(path):
+    """(is_dir, size, mtime) for a directory or a regular file, following links to files only, else None.
+
+    Matches iter_local_files, which does not descend into linked directories.
+    """
+    try:
+        info = os.stat(path, follow_symlinks=False)
+        if stat.S_ISLNK(info.st_mode):
+            info = os.stat(path)
+            if stat.S_ISDIR(info.st_mode):
+                return None
+    except OSError:
+        return None
+    if stat.S_ISDIR(info.st_mode):
+        return True, 0, info.st_mtime
+    if stat.S_ISREG(info.st_mode):
+        return False, info.st_size, info.st_mtime
+    return None
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, index):
+        self.index = index
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        self.index._queue_event(event.src_path)
+        if getattr(event, "dest_path", None):
+            self.index._queue_event(event.dest_path)
+
+
+class LocalIndex:
+    """SQLite index of the files under chosen local folders.
+
+    Each root is scanned once with os.scandir and then kept current from
+    filesystem events (watchdog, which uses inotify on Linux): every path an
+    event names is stat'ed again, and a directory that appears is scanned.
+    Only while a root is watched is it "live", so listings, uploads and
+    syncs trust it instead of walking the disk; without watchdog the index
+    is a snapshot from the last scan and is used for search only.
+
+    Every change is stamped with an increasing sequence number, so
+    changes_since() returns what changed below a root without a rescan.
+    Removed entries are kept as tombstones for the same reason.
+    """
+
+    def __init__(self, db_path=LOCAL_INDEX_PATH, watch=True):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " path TEXT PRIMARY KEY, parent TEXT, name TEXT, is_dir INTEGER, size INTEGER, mtime REAL,"
+            " deleted INTEGER, seq INTEGER) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent, name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_seq ON entries (seq)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, scanned REAL)")
+        self.conn.commit()
+        self.seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM entries").fetchone()[0]
+
+        self.live = set()  # roots scanned and watched since startup
+        self.watches = {}  # root -> watchdog watch
+        self.observer = None
+        if watch and Observer is not None:
+            self.observer = Observer()
+            self.observer.daemon = True
+            self.observer.start()
+        self.pending = set()
+        self.pending_cond = threading.Condition()
+        threading.Thread(target=self._event_loop, daemon=True).start()
+
+    @property
+    def watching(self):
+        return self.observer is not None
+
+    # --- Roots ---
+    def roots(self):
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT path FROM roots ORDER BY path")]
+
+    def add_root(self, path, on_progress=None):
+        """Scan a folder into the index and watch it. Blocks; returns the number of entries seen."""
+        root = os.path.abspath(path)
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO roots VALUES (?, NULL)", (root,))
+            self.conn.commit()
+        # Watch first so changes made during the scan are not missed
+        self._watch(root)
+        count = self._scan(root, on_progress)
+        with self.lock:
+            self.conn.execute("UPDATE roots SET scanned = ? WHERE path = ?", (time.time(), root))
+            self.conn.commit()
+        if root in self.watches:
+            self.live.add(root)
+        return count
+
+    def resume(self, on_progress=None):
+        """Bring every stored root up to date after a restart and watch it again."""
+        for root in self.roots():
+            if os.path.isdir(root):
+                self.add_root(root, on_progress)
+
+    def remove_root(self, path):
+        """Stop indexing a root. Entries still covered by another root (enclosing or nested) are kept."""
+        root = os.path.abspath(path)
+        self.live.discard(root)
+        watch = self.watches.pop(root, None)
+        if watch is not None:
+            self.observer.unschedule(watch)
+        start, end = _under(root)
+        with self.lock:
+            self.conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+            others = [other for other, in self.conn.execute("SELECT path FROM roots")]
+            if not any(_contains(other, root) for other in others):
+                sql, params = "DELETE FROM entries WHERE path >= ? AND path < ?", [start, end]
+                for nested in (other for other in others if _contains(root, other)):
+                    sql += " AND NOT (path >= ? AND path < ?)"
+                    params += _under(nested)
+                self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def root_of(self, path):
+        path = os.path.abspath(path)
+        for root in self.roots():
+            if _contains(root, path):
+                return root
+        return None
+
+    def is_live(self, path):
+        """True if `path` is inside a root that is scanned and watched, so the index can stand in for the disk."""
+        root = self.root_of(path)
+        if root is None or root not in self.live:
+            return False
+        # Linked directories are not indexed
+        path = os.path.abspath(path)
+        while path != root:
+            if os.path.islink(path):
+                return False
+            path = os.path.dirname(path)
+        return True
+
+    def _watch(self, root):
+        if self.observer is None or root in self.watches:
+            return
+        try:
+            self.watches[root] = self.observer.schedule(_EventHandler(self), root, recursive=True)
+        except OSError as e:  # e.g. inotify watch limit reached
+            print(f"Cannot watch {root}: {e}")
+
+    # --- Scanning ---
+    def _scan(self, root, on_progress=None):
+        """Reconcile the index with the disk for everything below `root`."""
+        count = reported = 0
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            subdirs, seen = self._reconcile_dir(directory)
+            stack.extend(subdirs)
+            count += seen
+            if on_progress and count - reported >= INSERT_BATCH:
+                on_progress(count)
+                reported = count
+        return count
+
+    def _reconcile_dir(self, directory):
+        """Make the indexed children of one directory match the disk; returns (subdirectories, child count)."""
+        found = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    values = _describe(entry.path)
+                    if values is not None:
+                        found[entry.name] = values
+        except OSError:
+            pass
+        with self.lock:
+            known = {name: (bool(is_dir), size, mtime) for name, is_dir, size, mtime in self.conn.execute(
+                "SELECT name, is_dir, size, mtime FROM entries WHERE parent = ? AND deleted = 0", (directory,))}
+            rows = []
+            for name, values in found.items():
+                if known.get(name) != values:
+                    if name in known and known[name][0] and not values[0]:
+                        self._mark_deleted(os.path.join(directory, name))
+                    self.seq += 1
+                    rows.append((os.path.join(directory, name), directory, name, *values, 0, self.seq))
+            for start in range(0, len(rows), INSERT_BATCH):
+                self.conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                      rows[start:start + INSERT_BATCH])
+            for name in set(known) - set(found):
+                self._mark_deleted(os.path.join(directory, name))
+            self.conn.commit()
+        return [os.path.join(directory, name) for name, values in found.items() if values[0]], len(found)
+
+    def _mark_deleted(self, path):
+        """Tombstone `path` and everything below it. Call with the lock held."""
+        self.seq += 1
+        start, end = _under(path)
+        self.conn.execute(
+            "UPDATE entries SET deleted = 1, seq = ? WHERE (path = ? OR (path >= ? AND path < ?)) AND deleted = 0",
+            (self.seq, path, start, end),
+        )
+
+    # --- Filesystem events ---
+    def _queue_event(self, path):
+        with self.pending_cond:
+            self.pending.add(os.path.abspath(path))
+            self.pending_cond.notify()
+
+    def _event_loop(self):
+        while True:
+            with self.pending_cond:
+                while not self.pending:
+                    self.pending_cond.wait()
+            # Let a burst of events for the same paths collapse into one update
+            time.sleep(EVENT_DELAY)
+            with self.pending_cond:
+                paths, self.pending = self.pending, set()
+            for path in sorted(paths):
+                try:
+                    self._refresh_path(path)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Index update failed for {path}: {e}")
+
+    def _refresh_path(self, path):
+        if self.root_of(path) is None or path in self.roots():
+            return
+        directory, name = os.path.split(path)
+        values = _describe(path)
+        if values is None:
+            with self.lock:
+                self._mark_deleted(path)
+                self.conn.commit()
+            return
+        is_dir = values[0]
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT is_dir, size, mtime FROM entries WHERE path = ? AND deleted = 0", (path,)).fetchone()
+            known = (bool(row[0]), row[1], row[2]) if row else None
+            if known != values:
+                if known and known[0] and not is_dir:
+                    self._mark_deleted(path)
+                self.seq += 1
+                self.conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                                  (path, directory, name, *values, self.seq))
+                self.conn.commit()
+        if is_dir and (known is None or not known[0]):
+            # A directory created or moved in reports no events for what it already holds
+            self._scan(path)
+
+    # --- Queries ---
+    def list(self, path):
+        """Return (name, is_dir) pairs for the children of an indexed directory, folders first."""
+        with self.lock:
+            return [(name, bool(is_dir)) for name, is_dir in self.conn.execute(
+                "SELECT name, is_dir FROM entries WHERE parent = ? AND deleted = 0 ORDER BY is_dir DESC, name",
+                (os.path.abspath(path),))]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Return (path, is_dir, size, mtime) rows whose name contains `query` (case-insensitive)."""
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self.lock:
+            return self.conn.execute(
+                "SELECT path, is_dir, size, mtime FROM entries WHERE deleted = 0 AND name LIKE ? ESCAPE '\\'"
+                " ORDER BY path LIMIT ?", (f"%{escaped}%", limit)).fetchall()
+
+    def files(self, root):
+        """Yield (relative path, size, mtime) for indexed files below `root`, like iter_local_files."""
+        root = os.path.abspath(root)
+        start, end = _under(root)
+        last = start
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT path, size, mtime FROM entries WHERE path > ? AND path < ? AND is_dir = 0"
+                    " AND deleted = 0 ORDER BY path LIMIT ?", (last, end, INSERT_BATCH)).fetchall()
+            if not rows:
+                return
+            for path, size, mtime in rows:
+                yield path[len(start):].replace(os.sep, "/"), size, mtime
+            last = rows[-1][0]
+
+    def changes_since(self, root, seq):
+        """Return (changed [(relative path, size, mtime)], deleted [relative path], current seq) below `root`.
+
+        Pass the returned seq to the next call to get only newer changes.
+        """
+        root = os.path.abspath(root)
+        start, end = _under(root)
+        with self.lock:
+            current = self.seq
+            rows = self.conn.execute(
+                "SELECT path, size, mtime, deleted FROM entries WHERE seq > ? AND seq <= ? AND path >= ? AND path < ?"
+                " AND is_dir = 0 ORDER BY path", (seq, current, start, end)).fetchall()
+        changed, deleted = [], []
+        for path, size, mtime, gone in rows:
+            relative = path[len(start):].replace(os.sep, "/")
+            if gone:
+                deleted.append(relative)
+            else:
+                changed.append((relative, size, mtime))
+        return changed, deleted, current
+
+    def close(self):
+        if self.observer is not None:
+            self.observer.stop()
+        with self.lock:
+            self.conn.close()
+
+
+def iter_files(root, index=None):
+    """Yield (relative path, size, mtime) below `root` from a live index, else by walking the disk."""
+    if index is not None and index.is_live(root):
+        return index.files(root)
+    return iter_local_files(root)
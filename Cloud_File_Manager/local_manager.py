@@ -3,13 +3,52 @@ import os
 def list_local_items(path):
     """Return folders and files for Treeview display."""
     folders, files = [], []
+    for page in iter_local_items(path):
+        for name, is_dir in page:
+            (folders if is_dir else files).append(name)
+    return sorted(folders), sorted(files)
+
+
+def iter_local_items(path, page_size=1000):
+    """Yield pages of (name, is_dir) for a directory as they are read."""
+    page = []
     try:
         with os.scandir(path) as entries:
             for entry in entries:
-                if entry.is_dir():
-                    folders.append(entry.name)
-                else:
-                    files.append(entry.name)
-    except PermissionError:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                page.append((entry.name, is_dir))
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+    except (PermissionError, FileNotFoundError):
         pass
-    return sorted(folders), sorted(files)
+    if page:
+        yield page
+
+
+def iter_local_files(root):
+    """Yield (relative path, size, mtime) for every file below root.
+
+    Relative paths use "/" separators so they map directly onto S3 keys.
+    The walk streams entries as they are found instead of building a list.
+    """
+    stack = [("", root)]
+    while stack:
+        relative, path = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = relative + entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((name + "/", entry.path))
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            yield name, stat.st_size, stat.st_mtime
+                    except OSError:
+                        continue
+        except (PermissionError, FileNotFoundError):
+            pass
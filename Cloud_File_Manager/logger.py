@@ -1,29 +1,125 @@
+import atexit
 import datetime
+import os
+import queue
 import threading
+import tkinter as tk
+from collections import deque
+
+# Lines the console keeps; older lines are dropped from the top
+MAX_CONSOLE_LINES = 1000
+
+# How often the console pulls new lines on the Tk loop (ms)
+CONSOLE_POLL_MS = 100
+
+# Rotate logs.txt once it grows past this size, keeping this many old files
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Most lines written to the file in one batch
+WRITE_BATCH = 1000
+
 
 class AppLogger:
-    def __init__(self, text_widget=None, log_file="logs.txt"):
+    """Timestamped log to a file and an optional Tk Text console.
+
+    log() is cheap and safe from any thread: it only queues the line. A
+    background writer keeps the log file open, writes queued lines in
+    batches and rotates the file by size. The console pulls new lines on
+    the Tk loop and keeps only the last MAX_CONSOLE_LINES.
+    """
+
+    def __init__(self, text_widget=None, log_file="logs.txt", max_lines=MAX_CONSOLE_LINES,
+                 max_bytes=MAX_LOG_BYTES, backups=LOG_BACKUPS):
         self.text_widget = text_widget
         self.log_file = log_file
-        self.lock = threading.Lock()
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file_queue = queue.Queue()
+        # Lines waiting for the console; a burst larger than the console only keeps its tail
+        self.console_lines = deque(maxlen=max_lines)
+        self.console_lock = threading.Lock()
 
-        # Initialize log file
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(f"\n\n--- Application Started: {datetime.datetime.now()} ---\n")
+        self.file = open(self.log_file, "a", encoding="utf-8")
+        self.file.write(f"\n\n--- Application Started: {datetime.datetime.now()} ---\n")
+        self.file.flush()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+        if self.text_widget:
+            self.text_widget.after(CONSOLE_POLL_MS, self._drain_console)
 
     def log(self, message):
         """Logs a message with timestamp to GUI and file."""
         timestamp = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
         line = f"{timestamp} {message}"
+        self.file_queue.put(line)
+        if self.text_widget:
+            with self.console_lock:
+                self.console_lines.append(line)
 
-        # Write to file
-        with self.lock:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+    def close(self):
+        """Write out everything still queued and close the log file."""
+        if self.writer.is_alive():
+            self.file_queue.put(None)
+            self.writer.join()
 
-        # Write to GUI
-        if self.text_widget:
-            self.text_widget.configure(state="normal")
-            self.text_widget.insert("end", line + "\n")
-            self.text_widget.see("end")
-            self.text_widget.configure(state="disabled")
+    # --- Background writer ---
+    def _write_loop(self):
+        while True:
+            batch = [self.file_queue.get()]
+            while batch[-1] is not None and len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.file_queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            lines = [line for line in batch if line is not None]
+            try:
+                if lines:
+                    if self.file.closed:  # a reopen after rotation failed earlier
+                        self.file = open(self.log_file, "a", encoding="utf-8")
+                    self.file.write("\n".join(lines) + "\n")
+                    self.file.flush()
+                    if self.file.tell() >= self.max_bytes:
+                        self._rotate()
+            except Exception as e:  # the writer must outlive any one failed batch
+                print("Log write failed:", e)
+            if stop:
+                self.file.close()
+                return
+
+    def _rotate(self):
+        """logs.txt -> logs.txt.1 -> ... -> logs.txt.N, dropping the oldest."""
+        self.file.close()
+        try:
+            for index in range(self.backups, 0, -1):
+                source = self.log_file if index == 1 else f"{self.log_file}.{index - 1}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{index}")
+        finally:
+            # Keep logging even when a rename fails (e.g. a viewer holds the file on Windows); the next write retries
+            self.file = open(self.log_file, "a", encoding="utf-8")
+
+    # --- Console (Tk thread) ---
+    def _drain_console(self):
+        with self.console_lock:
+            lines = list(self.console_lines)
+            self.console_lines.clear()
+        try:
+            if lines:
+                widget = self.text_widget
+                widget.configure(state="normal")
+                widget.insert("end", "\n".join(lines) + "\n")
+                # The Text widget always ends with an empty line after the last newline
+                excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+                if excess > 0:
+                    widget.delete("1.0", f"{excess + 1}.0")
+                widget.see("end")
+                widget.configure(state="disabled")
+            self.text_widget.after(CONSOLE_POLL_MS, self._drain_console)
+        except tk.TclError:
+            # Widget destroyed; the file writer keeps running
+            pass
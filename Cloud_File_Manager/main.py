@@ -3,13 +3,51 @@ from tkinter import ttk, messagebox, filedialog, simpledialog
 import os
 import webbrowser
 import threading
+import queue
+import time
+import datetime
+from collections import Counter
+
+from botocore.exceptions import ClientError, BotoCoreError
 
 
 # Keeping your original imports
-from s3_manager import S3Manager
-from local_manager import list_local_items
+from s3_manager import S3Manager, local_target
+from inventory import SEARCH_MODES
+from local_manager import iter_local_items
+from local_index import LocalIndex
 from logger import AppLogger
+from listing_cache import parent_prefix
+from sync_manager import SyncManager
+from progress import TransferProgress
+from tree_model import LazyTreeModel
+from preview import PreviewWindow
+from transfer_queue import TransferScheduler, PRIORITIES
+
+
+# How often the Tk loop runs callbacks queued by background workers (ms)
+UI_POLL_MS = 50
+
+# Number of planned sync actions echoed to the log before asking to apply them
+SYNC_PREVIEW_LINES = 50
+
+# How often the progress panel is redrawn while a transfer runs (ms, 10 Hz)
+PROGRESS_POLL_MS = 100
+
+# Delay after the last keystroke before a tree filter is applied (ms)
+FILTER_DELAY_MS = 200
+
+# How often the transfer queue is summarised in the progress panel (ms)
+TRANSFER_POLL_MS = 500
+
+# Most jobs listed in the Transfers window (running and queued jobs first)
+TRANSFER_LIST_LIMIT = 500
+
+# Heading of the S3 pane while it shows the bucket itself
+S3_HEADING = "S3 Bucket"
 
+# Heading of the local pane while it shows the filesystem
+LOCAL_HEADING = "Local Filesystem"
 
 
 # CHANGED: Inherit from tk.Frame instead of a generic object
@@ -23,6 +61,19 @@ class CloudManagerApp(tk.Frame):
         # controlled by the Main Hub.
 
         self.s3 = S3Manager()
+        self.local_index = LocalIndex()
+        self.s3.local_index = self.local_index
+        self.sync = SyncManager(self.s3)
+        self.listings = {}  # (tree, node) -> cancel Event of its running listing
+        self.ui_queue = queue.Queue()  # callbacks from worker threads, run on the Tk loop
+        self.transfer_progress = None  # TransferProgress shown in the progress panel
+        self.after(UI_POLL_MS, self._drain_ui_queue)
+        self.transfers = TransferScheduler(self.s3, on_change=self._on_transfer_change)
+        self.transfers_window = None
+        self.transfers_busy = False
+        self.transfer_sample = (time.monotonic(), 0)  # (time, done bytes) of the last queue poll
+        self.uploaded_prefixes = set()  # S3 listings to refresh once the queue is idle
+        self.after(TRANSFER_POLL_MS, self._poll_transfers)
 
         # --- Split Panes ---
         # CHANGED: Attached to 'self' (the frame) instead of root
@@ -32,19 +83,32 @@ class CloudManagerApp(tk.Frame):
         # Local Side
         self.local_frame = ttk.Frame(self.paned, padding=5)
         self.local_tree = ttk.Treeview(self.local_frame, selectmode="extended")
+        self.local_model = LazyTreeModel(self.local_tree)
+        self._add_local_search(self.local_frame)
+        self._add_tree_controls(self.local_frame, self.local_tree, self.local_model)
         self.local_tree.pack(fill=tk.BOTH, expand=True)
-        self.local_tree.heading("#0", text="Local Filesystem", anchor="w")
+        self.local_tree.heading("#0", text=LOCAL_HEADING, anchor="w")
         self.populate_local_root()
         self.local_tree.bind("<<TreeviewOpen>>", self.expand_local_node)
+        self.local_tree.bind("<<TreeviewClose>>", self.collapse_local_node)
         self.paned.add(self.local_frame, weight=1)
 
         # S3 Side
         self.s3_frame = ttk.Frame(self.paned, padding=5)
         self.s3_tree = ttk.Treeview(self.s3_frame, selectmode="extended")
+        self.s3_model = LazyTreeModel(self.s3_tree)
+        self._add_s3_search(self.s3_frame)
+        self._add_tree_controls(self.s3_frame, self.s3_tree, self.s3_model)
         self.s3_tree.pack(fill=tk.BOTH, expand=True)
-        self.s3_tree.heading("#0", text="S3 Bucket", anchor="w")
+        self.s3_tree.heading("#0", text=S3_HEADING, anchor="w")
         self.populate_s3_root()
         self.s3_tree.bind("<<TreeviewOpen>>", self.expand_s3_node)
+        self.s3_tree.bind("<<TreeviewClose>>", self.collapse_s3_node)
+        self.s3_drag = None  # rows being dragged inside the S3 pane
+        self.s3_tree.bind("<ButtonPress-1>", self._start_s3_drag, add="+")
+        self.s3_tree.bind("<B1-Motion>", self._drag_s3, add="+")
+        self.s3_tree.bind("<ButtonRelease-1>", self._drop_s3, add="+")
+        self.s3_tree.bind("<Double-1>", self._preview_clicked_object, add="+")
         self.paned.add(self.s3_frame, weight=1)
 
         # --- Bottom Panel ---
@@ -58,9 +122,13 @@ class CloudManagerApp(tk.Frame):
 
         ttk.Button(button_frame, text="Upload → S3", command=self.upload_to_s3).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Download from S3", command=self.download_from_s3).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Sync Folder → S3", command=self.sync_to_s3).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Create S3 Folder", command=self.create_s3_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Delete S3 Object(s)", command=self.delete_s3_objects).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Rename S3 Object", command=self.rename_s3_object).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Preview Object", command=self.preview_s3_object).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="View Object (URL)", command=self.view_object_url).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Transfers...", command=self.open_transfers_window).pack(side=tk.LEFT, padx=5)
 
         # --- Progress Bar ---
         progress_frame = ttk.LabelFrame(self.bottom_frame, text="Progress", padding=5)
@@ -74,6 +142,8 @@ class CloudManagerApp(tk.Frame):
         self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var,
                                             maximum=100, style="green.Horizontal.TProgressbar")
         self.progress_bar.pack(fill=tk.X, padx=5, pady=5)
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.pack(fill=tk.X, padx=5)
 
         # --- Log Console ---
         console_frame = ttk.LabelFrame(self.bottom_frame, text="Activity Log", padding=5)
@@ -89,8 +159,89 @@ class CloudManagerApp(tk.Frame):
         # Initialize logger
         self.logger = AppLogger(self.console)
         self.logger.log("Application started successfully.")
+        if self.local_index.roots():
+            self.threaded_action(self._resume_local_index)
+
+    # ---------------- Tree Panes ----------------
+    def _add_tree_controls(self, frame, tree, model):
+        """Add a name filter above and a scrollbar beside a tree pane."""
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        pending = [None]
+
+        def on_filter_change(*_):
+            if pending[0]:
+                self.after_cancel(pending[0])
+            pending[0] = self.after(FILTER_DELAY_MS, lambda: model.set_filter(filter_var.get()))
+
+        filter_var.trace_add("write", on_filter_change)
+
+        scrollbar = ttk.Scrollbar(frame, command=tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.after_idle(model.load_visible)
+
+        tree.configure(yscrollcommand=on_scroll)
+
+    def _selected_values(self, tree):
+        """Paths or keys of the selected rows, skipping status rows."""
+        values = [tree.item(node, "values") for node in tree.selection()]
+        return [str(v[0]) for v in values if v]
+
+    def start_listing(self, tree, model, node, pages, on_done=None):
+        """Feed `pages` of (text, value, is_folder) entries into `model` from a worker thread."""
+        self.cancel_listing(tree, node)
+        cancel = threading.Event()
+        self.listings[(tree, node)] = cancel
+        model.begin(node)
+
+        def worker():
+            error = None
+            try:
+                for entries in pages:
+                    if cancel.is_set():
+                        return
+                    self.run_on_ui(self._add_listing_page, tree, model, node, cancel, entries)
+            except Exception as e:  # any failure must still close the listing
+                print("Error listing:", e)
+                error = str(e)
+            finally:
+                self.run_on_ui(self._finish_listing, tree, model, node, cancel, on_done, error)
 
-    # ---------------- Local Logic (No Changes) ----------------
+        self.threaded_action(worker)
+
+    def cancel_listing(self, tree, node):
+        cancel = self.listings.pop((tree, node), None)
+        if cancel:
+            cancel.set()
+
+    def _listing_alive(self, tree, node, cancel):
+        if cancel.is_set() or (node and not tree.exists(node)):
+            cancel.set()
+            return False
+        return True
+
+    def _add_listing_page(self, tree, model, node, cancel, entries):
+        if self._listing_alive(tree, node, cancel):
+            model.add(node, entries)
+
+    def _finish_listing(self, tree, model, node, cancel, on_done, error=None):
+        if not self._listing_alive(tree, node, cancel):
+            return
+        if self.listings.get((tree, node)) is cancel:
+            del self.listings[(tree, node)]
+        model.finish(node, error)
+        if error:
+            self.logger.log(f"Listing failed: {error}")
+        elif on_done:
+            on_done(model.count(node))
+
+    # ---------------- Local Logic ----------------
     def populate_local_root(self):
         drives = []
         if os.name == "nt":
@@ -99,42 +250,210 @@ class CloudManagerApp(tk.Frame):
         else:
             drives = ["/"]
 
-        for drive in drives:
-            node = self.local_tree.insert("", tk.END, text=drive, values=[drive], open=False)
-            self.local_tree.insert(node, tk.END, text="Loading...")
+        self.local_model.replace("", [(drive, drive, True) for drive in drives])
 
     def expand_local_node(self, event):
         node = self.local_tree.focus()
-        path = self.local_tree.item(node, "values")[0]
-        self.local_tree.delete(*self.local_tree.get_children(node))
-        folders, files = list_local_items(path)
-        for folder in folders:
-            folder_path = os.path.join(path, folder)
-            child = self.local_tree.insert(node, tk.END, text=folder, values=[folder_path])
-            self.local_tree.insert(child, tk.END, text="Loading...")
-        for file in files:
-            file_path = os.path.join(path, file)
-            self.local_tree.insert(node, tk.END, text=file, values=[file_path])
-
-    # ---------------- S3 Logic (No Changes) ----------------
+        values = self.local_tree.item(node, "values")
+        if not values:
+            return
+        path = str(values[0])
+        # Watched folders are listed from the index instead of the disk
+        listing = [self.local_index.list(path)] if self.local_index.is_live(path) else iter_local_items(path)
+        pages = ([(name, os.path.join(path, name), is_dir) for name, is_dir in page] for page in listing)
+        self.start_listing(self.local_tree, self.local_model, node, pages)
+
+    def collapse_local_node(self, event):
+        self.cancel_listing(self.local_tree, self.local_tree.focus())
+
+    def refresh_local_tree(self):
+        for tree, node in list(self.listings):
+            if tree is self.local_tree:
+                self.cancel_listing(tree, node)
+        self.local_model.clear()
+        self.local_tree.heading("#0", text=LOCAL_HEADING)
+        self.populate_local_root()
+
+    # ---------------- Local Index ----------------
+    def _add_local_search(self, frame):
+        """Search box and index controls for the local folder index."""
+        search_frame = ttk.LabelFrame(frame, text="Search Local Index", padding=5)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+
+        query_row = ttk.Frame(search_frame)
+        query_row.pack(fill=tk.X)
+        self.local_query = tk.StringVar()
+        query_entry = ttk.Entry(query_row, textvariable=self.local_query)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        query_entry.bind("<Return>", lambda event: self.search_local())
+        ttk.Button(query_row, text="Search", command=self.search_local).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(query_row, text="Clear", command=self.refresh_local_tree).pack(side=tk.LEFT, padx=(5, 0))
+
+        index_row = ttk.Frame(search_frame)
+        index_row.pack(fill=tk.X, pady=(5, 0))
+        ttk.Button(index_row, text="Index Folder...", command=self.index_local_folder).pack(side=tk.LEFT)
+        ttk.Button(index_row, text="Remove Index...", command=self.remove_local_index).pack(side=tk.LEFT, padx=5)
+        watching = "watching for changes" if self.local_index.watching else "install watchdog to track changes"
+        ttk.Label(index_row, text=f"({watching})").pack(side=tk.LEFT)
+
+    def search_local(self):
+        query = self.local_query.get().strip()
+        if not query:
+            return
+        self.threaded_action(self._search_local_worker, query)
+
+    def _search_local_worker(self, query):
+        start = time.perf_counter()
+        rows = self.local_index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.run_on_ui(self._show_local_results, rows, elapsed_ms)
+
+    def _show_local_results(self, rows, elapsed_ms):
+        """Replace the local pane with a flat list of matching paths."""
+        for tree, node in list(self.listings):
+            if tree is self.local_tree:
+                self.cancel_listing(tree, node)
+        self.local_model.clear()
+        entries = []
+        for path, is_dir, size, mtime in rows:
+            details = "folder" if is_dir else f"{(size or 0) / 1024:,.1f} KB"
+            details += f", {datetime.datetime.fromtimestamp(mtime):%Y-%m-%d %H:%M}"
+            entries.append((f"{path}   ({details})", path, bool(is_dir)))
+        self.local_model.replace("", entries)
+        self.local_tree.heading("#0", text=f"{LOCAL_HEADING} - {len(rows):,} search result(s), Clear to browse")
+
+        note = "" if self.local_index.roots() else " (no folders indexed yet - use Index Folder)"
+        self.logger.log(f"Local search: {len(rows):,} match(es) in {elapsed_ms:.0f} ms{note}")
+
+    def index_local_folder(self):
+        folder = None
+        for path in self._selected_values(self.local_tree):
+            if os.path.isdir(path):
+                folder = path
+                break
+        folder = filedialog.askdirectory(title="Folder to Index", initialdir=folder) if folder is None else folder
+        if folder:
+            self.threaded_action(self._index_local_folder_worker, folder)
+
+    def _index_local_folder_worker(self, folder):
+        self.logger.log(f"Indexing {folder} ...")
+        start = time.perf_counter()
+        count = self.local_index.add_root(
+            folder, on_progress=lambda n: self.run_on_ui(self._show_local_index_progress, n))
+        self.run_on_ui(self.reset_progress)
+        self.logger.log(f"Indexed {count:,} entries under {folder} in {time.perf_counter() - start:.1f} s.")
+
+    def _resume_local_index(self):
+        """Catch the indexed folders up with changes made while the app was closed."""
+        roots = self.local_index.roots()
+        self.logger.log(f"Updating the local index ({len(roots)} folder(s)) ...")
+        self.local_index.resume(on_progress=lambda n: self.run_on_ui(self._show_local_index_progress, n))
+        self.run_on_ui(self.reset_progress)
+        self.logger.log("Local index is up to date.")
+
+    def _show_local_index_progress(self, count):
+        self.progress_label.config(text=f"Indexing: {count:,} local entries scanned")
+
+    def remove_local_index(self):
+        roots = self.local_index.roots()
+        if not roots:
+            messagebox.showinfo("Local Index", "No folders are indexed.")
+            return
+        root = simpledialog.askstring("Remove Index", "Stop indexing which folder?\n\n" + "\n".join(roots),
+                                      initialvalue=roots[0])
+        if root and root in roots:
+            self.local_index.remove_root(root)
+            self.logger.log(f"Removed {root} from the local index.")
+
+    # ---------------- S3 Logic ----------------
     def populate_s3_root(self):
-        folders, files = self.s3.list_prefix("")
-        for f in folders:
-            node = self.s3_tree.insert("", tk.END, text=f, values=[f])
-            self.s3_tree.insert(node, tk.END, text="Loading...")
-        for file in files:
-            self.s3_tree.insert("", tk.END, text=file, values=[file])
+        self.start_s3_listing("", "")
 
     def expand_s3_node(self, event):
         node = self.s3_tree.focus()
-        prefix = self.s3_tree.item(node, "values")[0]
-        self.s3_tree.delete(*self.s3_tree.get_children(node))
-        folders, files = self.s3.list_prefix(prefix)
-        for f in folders:
-            child = self.s3_tree.insert(node, tk.END, text=f.split("/")[-2], values=[f])
-            self.s3_tree.insert(child, tk.END, text="Loading...")
-        for file in files:
-            self.s3_tree.insert(node, tk.END, text=file.split("/")[-1], values=[file])
+        values = self.s3_tree.item(node, "values")
+        if not values:
+            return
+        self.start_s3_listing(node, str(values[0]))
+
+    def collapse_s3_node(self, event):
+        self.cancel_listing(self.s3_tree, self.s3_tree.focus())
+
+    def start_s3_listing(self, node, prefix):
+        """List a prefix on a worker thread and fill `node` page by page."""
+        pages = (self._s3_entries(folders, files) for folders, files in self.s3.iter_prefix(prefix))
+
+        def on_done(count):
+            if count >= 1000:
+                self.logger.log(f"Listed {count:,} item(s) under s3://{self.s3.bucket}/{prefix}")
+
+        self.start_listing(self.s3_tree, self.s3_model, node, pages, on_done)
+
+    @staticmethod
+    def _s3_entries(folders, files):
+        return ([(f.split("/")[-2], f, True) for f in folders] +
+                [(file.split("/")[-1], file, False) for file in files])
+
+    def _find_s3_node(self, prefix):
+        """Return the tree node showing `prefix`, or None if it is not in the tree."""
+        if not prefix:
+            return ""
+        return self.s3_model.item_for(prefix)
+
+    def refresh_s3_prefixes(self, prefixes):
+        """Update only the tree nodes whose listings changed.
+
+        Open nodes are re-listed (usually straight from the listing cache)
+        and their children patched in place, so expanded sub-folders stay
+        open. Collapsed nodes are reset to re-list when next opened.
+        """
+        for prefix in set(prefixes):
+            node = self._find_s3_node(prefix)
+            if node is None:
+                continue
+            if node and not self.s3_tree.item(node, "open"):
+                self.cancel_listing(self.s3_tree, node)
+                self.s3_model.reset(node)
+                continue
+            if (self.s3_tree, node) in self.listings:
+                # A listing is still streaming in; restart it from scratch
+                self.start_s3_listing(node, prefix)
+                continue
+            self.threaded_action(self._refresh_s3_prefix_worker, node, prefix)
+
+    def _refresh_s3_prefix_worker(self, node, prefix):
+        try:
+            folders, files = self.s3.list_prefix(prefix)
+        except (ClientError, BotoCoreError) as e:
+            print(f"Error refreshing s3://{self.s3.bucket}/{prefix}:", e)
+            return
+        self.run_on_ui(self._patch_s3_children, node, self._s3_entries(folders, files))
+
+    def _patch_s3_children(self, node, entries):
+        if node and not self.s3_tree.exists(node):
+            return
+        self.s3_model.replace(node, entries)
+
+    # ---------------- UI Thread ----------------
+    def run_on_ui(self, func, *args):
+        """Schedule `func(*args)` on the Tk loop; safe to call from any thread."""
+        self.ui_queue.put((func, args))
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                try:
+                    func, args = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    func(*args)
+                except tk.TclError:
+                    pass  # Widget went away while the callback was queued
+                except Exception as e:  # one broken callback must not stop every later UI update
+                    print(f"UI callback {getattr(func, '__name__', func)} failed: {e!r}")
+        finally:
+            self.after(UI_POLL_MS, self._drain_ui_queue)
 
     # ---------------- Progress ----------------
     def update_progress(self, completed, total):
@@ -142,11 +461,160 @@ class CloudManagerApp(tk.Frame):
             return
         percent = (completed / total) * 100
         self.progress_var.set(percent)
-        self.update_idletasks()  # CHANGED: Called on self
 
     def reset_progress(self):
         self.progress_var.set(0)
-        self.update_idletasks()  # CHANGED: Called on self
+        self.progress_label.config(text="")
+
+    def start_transfer_progress(self):
+        """Create a TransferProgress for a worker and poll it from the Tk loop."""
+        progress = TransferProgress()
+        self.run_on_ui(self._show_transfer_progress, progress)
+        return progress
+
+    def _show_transfer_progress(self, progress):
+        self.transfer_progress = progress
+        self._poll_transfer_progress(progress)
+
+    def _poll_transfer_progress(self, progress):
+        if progress is not self.transfer_progress:
+            return  # A newer transfer took over the panel
+        progress.drain()
+        if progress.finished:
+            self.transfer_progress = None
+            self.reset_progress()
+            return
+        self.progress_var.set(progress.percent())
+        self.progress_label.config(text=progress.summary())
+        self.after(PROGRESS_POLL_MS, self._poll_transfer_progress, progress)
+
+    # ---------------- Transfer Queue ----------------
+    def _on_transfer_change(self, job):
+        """Called on a worker thread whenever a job changes status."""
+        self.run_on_ui(self._transfer_changed, job.kind, job.key, job.local_path, job.status, job.error)
+
+    def _transfer_changed(self, kind, key, local_path, status, error):
+        if kind == "upload-folder" and status in ("done", "failed", "paused", "cancelled"):
+            # Key is the prefix the folder went into; part of it may have arrived even if the job stopped
+            folder = f"{key}{os.path.basename(os.path.normpath(local_path))}/"
+            self.uploaded_prefixes.update((key, folder))
+        elif status == "done" and kind == "upload":
+            self.uploaded_prefixes.add(parent_prefix(key))
+        if status == "failed":
+            target = local_path if kind.startswith("upload") else f"s3://{self.s3.bucket}/{key}"
+            self.logger.log(f"{kind.capitalize()} failed: {target}{f' ({error})' if error else ''} "
+                            "- resume it from Transfers")
+
+    def _poll_transfers(self):
+        """Show queue progress in the progress panel and refresh listings once it drains."""
+        counts, done_bytes, total_bytes = self.transfers.summary()
+        busy = counts["queued"] + counts["running"] > 0
+        now = time.monotonic()
+        last_time, last_bytes = self.transfer_sample
+        rate = max(done_bytes - last_bytes, 0) / (now - last_time) if now > last_time else 0
+        self.transfer_sample = (now, done_bytes)
+
+        if busy and self.transfer_progress is None:
+            mb = 1024 * 1024
+            self.progress_var.set(done_bytes / total_bytes * 100 if total_bytes else 0)
+            self.progress_label.config(
+                text=f"Transfers: {counts['running']:,} running, {counts['queued']:,} queued, "
+                     f"{counts['paused']:,} paused, {counts['failed']:,} failed · "
+                     f"{done_bytes / mb:,.1f} / {total_bytes / mb:,.1f} MB · {rate / mb:,.1f} MB/s")
+        if self.transfers_busy and not busy:
+            self.logger.log(f"Transfers idle: {counts['done']:,} done, {counts['failed']:,} failed, "
+                            f"{counts['paused']:,} paused.")
+            self.logger.log(self.s3.pool.describe())
+            if self.transfer_progress is None:
+                self.reset_progress()
+            self.refresh_s3_prefixes(self.uploaded_prefixes)
+            self.uploaded_prefixes = set()
+        self.transfers_busy = busy
+
+        if self.transfers_window is not None:
+            self._refresh_transfers_window()
+        self.after(TRANSFER_POLL_MS, self._poll_transfers)
+
+    def open_transfers_window(self):
+        if self.transfers_window is not None:
+            self.transfers_window.lift()
+            return
+        window = tk.Toplevel(self)
+        window.title("Transfers")
+        window.geometry("900x450")
+        window.protocol("WM_DELETE_WINDOW", self._close_transfers_window)
+
+        columns = ("type", "file", "priority", "status", "progress")
+        tree = ttk.Treeview(window, columns=columns, show="headings", selectmode="extended")
+        for column, width in zip(columns, (100, 420, 70, 80, 170)):
+            tree.heading(column, text=column.capitalize(), anchor="w")
+            tree.column(column, width=width, stretch=column == "file")
+        scrollbar = ttk.Scrollbar(window, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+
+        controls = ttk.Frame(window, padding=5)
+        controls.pack(side=tk.BOTTOM, fill=tk.X)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+
+        def for_selected(action, *args):
+            for item in tree.selection():
+                action(int(item), *args)
+
+        ttk.Button(controls, text="Pause", command=lambda: for_selected(self.transfers.pause)).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Resume",
+                   command=lambda: for_selected(self.transfers.resume)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Cancel", command=lambda: for_selected(self.transfers.cancel)).pack(side=tk.LEFT)
+        priority = tk.StringVar(value="high")
+        ttk.Combobox(controls, textvariable=priority, values=list(PRIORITIES), state="readonly",
+                     width=7).pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Button(controls, text="Set Priority",
+                   command=lambda: for_selected(self.transfers.set_priority, priority.get())).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Clear Finished", command=self.transfers.clear_finished).pack(side=tk.LEFT, padx=15)
+
+        limit = tk.StringVar(value=self._bandwidth_text())
+        ttk.Label(controls, text="Limit MB/s (blank = none):").pack(side=tk.LEFT)
+        ttk.Entry(controls, textvariable=limit, width=7).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Apply", command=lambda: self._apply_bandwidth(limit.get())).pack(side=tk.LEFT)
+
+        self.transfers_window = window
+        self.transfers_tree = tree
+        self._refresh_transfers_window()
+
+    def _close_transfers_window(self):
+        self.transfers_window.destroy()
+        self.transfers_window = None
+
+    def _bandwidth_text(self):
+        rate = self.transfers.bandwidth.rate
+        return f"{rate / (1024 * 1024):g}" if rate else ""
+
+    def _apply_bandwidth(self, text):
+        try:
+            rate = float(text) * 1024 * 1024 if text.strip() else None
+        except ValueError:
+            messagebox.showerror("Bandwidth", "Enter a number of MB/s, or leave it blank for no limit.")
+            return
+        self.transfers.set_bandwidth(rate)
+        self.logger.log(f"Transfer bandwidth limit: {f'{text.strip()} MB/s' if rate else 'none'}")
+
+    def _refresh_transfers_window(self):
+        """Patch the Transfers list in place: running and queued jobs first, then the rest."""
+        jobs = self.transfers.snapshot(TRANSFER_LIST_LIMIT)
+        tree = self.transfers_tree
+        wanted = {str(job.id) for job in jobs}
+        for item in tree.get_children():
+            if item not in wanted:
+                tree.delete(item)
+        for index, job in enumerate(jobs):
+            values = (job.kind, job.local_path if job.kind.startswith("upload") else job.key, job.priority,
+                      job.status, job.progress_text())
+            item = str(job.id)
+            if tree.exists(item):
+                tree.item(item, values=values)
+                tree.move(item, "", index)
+            else:
+                tree.insert("", index, iid=item, values=values)
 
     # ---------------- Actions (No Changes) ----------------
     def threaded_action(self, func, *args):
@@ -159,37 +627,91 @@ class CloudManagerApp(tk.Frame):
     def _upload_to_s3_internal(self):
         selected_local_nodes = self.local_tree.selection()
         if not selected_local_nodes:
-            messagebox.showwarning("Select Files", "Please select one or more local files.")
+            messagebox.showwarning("Select Files", "Please select one or more local files or folders.")
             return
 
-        selected_s3_nodes = self.s3_tree.selection()
-        s3_prefix = ""
-        if selected_s3_nodes:
-            target_node = selected_s3_nodes[0]
-            target_key = self.s3_tree.item(target_node, "values")[0]
-            if target_key.endswith("/"):
-                s3_prefix = target_key
+        s3_prefix = self._selected_s3_prefix()
+        local_paths = self._selected_values(self.local_tree)
+        # A folder is one job that walks and uploads its files as it runs
+        for local_path in local_paths:
+            if os.path.isdir(local_path):
+                self.transfers.add_folder_upload(local_path, s3_prefix)
             else:
-                parent_node = self.s3_tree.parent(target_node)
-                s3_prefix = self.s3_tree.item(parent_node, "values")[0] if parent_node else ""
+                self.transfers.add_upload(local_path, s3_prefix + os.path.basename(local_path),
+                                          os.path.getsize(local_path))
+        self.logger.log(f"Queued {len(local_paths):,} upload(s) to s3://{self.s3.bucket}/{s3_prefix} "
+                        "(see Transfers).")
 
-        total = len(selected_local_nodes)
-        completed = 0
+    def _selected_s3_prefix(self):
+        """Folder prefix of the first selected S3 node ("" for the bucket root)"""
+        selected_s3_nodes = self.s3_tree.selection()
+        if not selected_s3_nodes:
+            return ""
+        target_node = selected_s3_nodes[0]
+        values = self.s3_tree.item(target_node, "values")
+        target_key = str(values[0]) if values else ""
+        if target_key.endswith("/"):
+            return target_key
+        parent_node = self.s3_tree.parent(target_node)
+        return str(self.s3_tree.item(parent_node, "values")[0]) if parent_node else parent_prefix(target_key)
 
-        for node in selected_local_nodes:
-            local_path = self.local_tree.item(node, "values")[0]
-            if os.path.isdir(local_path):
-                continue
-            filename = os.path.basename(local_path)
-            s3_path = f"{s3_prefix}{filename}"
-            self.s3.upload_file(local_path, s3_path)
-            completed += 1
-            self.update_progress(completed, total)
-            self.logger.log(f"Uploaded: {local_path} → s3://{self.s3.bucket}/{s3_path}")
+    def sync_to_s3(self):
+        self.threaded_action(self._sync_to_s3_internal)
 
-        self.logger.log(f"Upload complete: {completed}/{total} file(s).")
-        self.reset_progress()
-        self.refresh_s3_tree()
+    def _sync_to_s3_internal(self):
+        local_root = None
+        for path in self._selected_values(self.local_tree):
+            if os.path.isdir(path):
+                local_root = path
+                break
+        if not local_root:
+            local_root = filedialog.askdirectory(title="Select Local Folder to Sync")
+            if not local_root:
+                return
+
+        name = os.path.basename(os.path.normpath(local_root))
+        prefix = f"{self._selected_s3_prefix()}{name}/"
+        delete = messagebox.askyesno("Sync Options", f"Also delete objects under s3://{self.s3.bucket}/{prefix} "
+                                                     "that no longer exist locally?")
+
+        self.logger.log(f"Comparing {local_root} with s3://{self.s3.bucket}/{prefix} ...")
+        try:
+            actions = self.sync.diff(local_root, prefix, delete=delete)
+        except (ClientError, BotoCoreError) as e:
+            self.logger.log(f"Sync aborted, listing s3://{self.s3.bucket}/{prefix} failed: {e}")
+            return
+        if not actions:
+            self.logger.log("Sync: already up to date.")
+            return
+
+        # Dry run: show the plan before anything is transferred
+        for action in actions[:SYNC_PREVIEW_LINES]:
+            self.logger.log(f"  {action.action}: {action.path} ({action.reason})")
+        if len(actions) > SYNC_PREVIEW_LINES:
+            self.logger.log(f"  ... and {len(actions) - SYNC_PREVIEW_LINES} more")
+        summary = ", ".join(f"{n} {kind}" for kind, n in sorted(Counter(a.action for a in actions).items()))
+        if not messagebox.askyesno("Confirm Sync", f"Apply {len(actions)} change(s)? ({summary})\n"
+                                                   "The planned changes are listed in the Activity Log."):
+            self.logger.log("Sync cancelled; nothing was changed.")
+            return
+
+        progress = self.start_transfer_progress()
+        try:
+            completed, failed = self.sync.apply(actions, local_root, prefix, progress=progress)
+        finally:
+            progress.close()
+        for action in failed:
+            self.logger.log(f"Sync failed: {action.action} {action.path}")
+        self.logger.log(f"Sync complete: {len(completed)} change(s) applied, {len(failed)} failed.")
+        self.logger.log(self.s3.pool.describe())
+
+        changed = set()
+        for action in completed:
+            key = prefix + action.path
+            while key:
+                key = parent_prefix(key)
+                changed.add(key)
+        self.run_on_ui(self.refresh_s3_prefixes, changed)
 
     def download_from_s3(self):
         self.threaded_action(self._download_from_s3_internal)
@@ -204,19 +726,22 @@ class CloudManagerApp(tk.Frame):
         if not folder:
             return
 
-        total = len(selected_nodes)
-        completed = 0
-
-        for node in selected_nodes:
-            s3_key = self.s3_tree.item(node, "values")[0]
-            local_path = os.path.join(folder, os.path.basename(s3_key))
-            self.s3.download_file(s3_key, local_path)
-            completed += 1
-            self.update_progress(completed, total)
-            self.logger.log(f"Downloaded: s3://{self.s3.bucket}/{s3_key} → {local_path}")
-
-        self.logger.log(f"Download complete: {completed}/{total} file(s).")
-        self.reset_progress()
+        keys = self._selected_values(self.s3_tree)
+        queued = 0
+        for key in keys:
+            # A folder is one job that lists and downloads its objects as it runs
+            if key.endswith("/"):
+                self.transfers.add_folder_download(key, folder)
+                queued += 1
+                continue
+            local_path = local_target(folder, os.path.basename(key))
+            if local_path is None:
+                self.logger.log(f"Skipped s3://{self.s3.bucket}/{key}: it would be written outside {folder}")
+                continue
+            head = self.s3.head_object(key)
+            self.transfers.add_download(key, local_path, head["ContentLength"] if head else None)
+            queued += 1
+        self.logger.log(f"Queued {queued:,} download(s) to {folder} (see Transfers).")
 
     def delete_s3_objects(self):
         self.threaded_action(self._delete_s3_objects_internal)
@@ -227,23 +752,111 @@ class CloudManagerApp(tk.Frame):
             messagebox.showwarning("Select Files", "Select one or more S3 objects to delete.")
             return
 
-        keys = [self.s3_tree.item(n, "values")[0] for n in selected_nodes]
-        confirm = messagebox.askyesno("Confirm Delete", f"Delete {len(keys)} object(s)?")
+        keys = self._selected_values(self.s3_tree)
+        confirm = messagebox.askyesno("Confirm Delete", f"Delete {len(keys)} object(s)?\n"
+                                                        "Selected folders are deleted with all their contents.")
         if not confirm:
             return
 
-        total = len(keys)
-        completed = 0
+        def on_progress(finished, discovered):
+            self.run_on_ui(self.update_progress, finished, discovered)
 
-        for k in keys:
-            self.s3.delete_objects([k])
-            completed += 1
-            self.update_progress(completed, total)
-            self.logger.log(f"Deleted: s3://{self.s3.bucket}/{k}")
+        deleted, errors = self.s3.delete_objects(keys, on_progress=on_progress)
+        for key, message in errors:
+            self.logger.log(f"Delete failed: s3://{self.s3.bucket}/{key} ({message})")
 
-        self.logger.log(f"Deletion complete: {completed}/{total} object(s).")
-        self.reset_progress()
-        self.refresh_s3_tree()
+        self.logger.log(f"Deletion complete: {len(deleted)} object(s) deleted, {len(errors)} failed.")
+        self.logger.log(self.s3.pool.describe())
+        self.run_on_ui(self.reset_progress)
+        parents = {parent_prefix(k) for k in keys}
+        # A folder whose last object was deleted disappears from the level above
+        self.run_on_ui(self.refresh_s3_prefixes, parents | {parent_prefix(p) for p in parents if p})
+
+    # ---------------- Server-side Copy / Move ----------------
+    def _start_s3_drag(self, event):
+        # Runs before the Treeview's own binding, so the selection is still the one being dragged
+        item = self.s3_tree.identify_row(event.y)
+        if not item or not self.s3_tree.item(item, "values"):
+            self.s3_drag = None
+            return
+        selection = self.s3_tree.selection()
+        self.s3_drag = {"items": selection if item in selection else (item,), "moved": False}
+
+    def _drag_s3(self, event):
+        if self.s3_drag and not self.s3_drag["moved"]:
+            self.s3_drag["moved"] = True
+            self.s3_tree.configure(cursor="fleur")
+
+    def _drop_s3(self, event):
+        """Move or copy the dragged rows into the folder they were dropped on."""
+        drag, self.s3_drag = self.s3_drag, None
+        if not drag or not drag["moved"]:
+            return
+        self.s3_tree.configure(cursor="")
+        items = [item for item in drag["items"] if self.s3_tree.exists(item)]
+        self.s3_tree.selection_set(items)
+
+        target = self.s3_tree.identify_row(event.y)
+        values = self.s3_tree.item(target, "values") if target else ()
+        if target and not values:
+            return  # dropped on a status row
+        dest = str(values[0]) if values else ""
+        if not dest.endswith("/"):
+            dest = parent_prefix(dest)
+        keys = [str(self.s3_tree.item(item, "values")[0]) for item in items]
+        keys = [key for key in keys if parent_prefix(key) != dest]
+        if not keys:
+            return
+        if any(key.endswith("/") and dest.startswith(key) for key in keys):
+            messagebox.showwarning("Move or Copy", "A folder cannot be moved or copied into itself.")
+            return
+        move = messagebox.askyesnocancel(
+            "Move or Copy", f"Move {len(keys)} item(s) to s3://{self.s3.bucket}/{dest}?\n\nYes = move, No = copy")
+        if move is None:
+            return
+        self.threaded_action(self._copy_s3_internal, self.s3.iter_copy_targets(keys, dest), move,
+                             {dest} | {parent_prefix(key) for key in keys}, f"to s3://{self.s3.bucket}/{dest}")
+
+    def rename_s3_object(self):
+        keys = self._selected_values(self.s3_tree)
+        if len(keys) != 1:
+            messagebox.showwarning("Rename", "Select a single object or folder to rename.")
+            return
+        key = keys[0]
+        is_folder = key.endswith("/")
+        old_name = key.rstrip("/").split("/")[-1]
+        new_name = simpledialog.askstring("Rename", "New name:", initialvalue=old_name)
+        if not new_name or new_name == old_name:
+            return
+        if "/" in new_name:
+            messagebox.showerror("Rename", "Names cannot contain '/'. Drag items onto a folder to move them.")
+            return
+        new_key = parent_prefix(key) + new_name + ("/" if is_folder else "")
+        self.threaded_action(self._rename_s3_internal, key, new_key)
+
+    def _rename_s3_internal(self, key, new_key):
+        if new_key.endswith("/"):
+            taken = any(page for page in self.s3.iter_objects(new_key, page_size=1))
+        else:
+            taken = self.s3.head_object(new_key) is not None
+        if taken:
+            self.logger.log(f"Rename cancelled: s3://{self.s3.bucket}/{new_key} already exists.")
+            return
+        self._copy_s3_internal(self.s3.iter_rename_targets(key, new_key), True, {parent_prefix(key)},
+                               f"to s3://{self.s3.bucket}/{new_key}")
+
+    def _copy_s3_internal(self, targets, move, prefixes, description):
+        """Run a server-side copy or move and refresh the listings it touched."""
+        verb = "Move" if move else "Copy"
+        self.logger.log(f"{verb} {description} started (server-side).")
+        copied, errors = self.s3.copy_objects(
+            targets, move=move, on_progress=lambda done, total: self.run_on_ui(self.update_progress, done, total))
+        for key, message in errors:
+            self.logger.log(f"{verb} failed: s3://{self.s3.bucket}/{key} ({message})")
+        self.logger.log(f"{verb} complete: {len(copied):,} object(s) {description}, {len(errors)} failed.")
+        self.run_on_ui(self.reset_progress)
+        # A moved folder disappears from the level above its old parent
+        self.run_on_ui(self.refresh_s3_prefixes, set(prefixes) | {parent_prefix(p) for p in prefixes if p})
 
     def create_s3_folder(self):
         folder_name = simpledialog.askstring("Folder Name", "Enter new folder name:")
@@ -253,22 +866,164 @@ class CloudManagerApp(tk.Frame):
             folder_name += "/"
         self.s3.create_folder(folder_name)
         self.logger.log(f"Created S3 folder: {folder_name}")
-        self.refresh_s3_tree()
+        self.refresh_s3_prefixes([parent_prefix(folder_name)])
 
     def view_object_url(self):
         selected_nodes = self.s3_tree.selection()
         if not selected_nodes:
             messagebox.showwarning("Select File", "Select a single object to view.")
             return
-        key = self.s3_tree.item(selected_nodes[0], "values")[0]
+        key = self._selected_values(self.s3_tree)[0]
         url = self.s3.get_object_url(key)
         webbrowser.open(url)
         self.logger.log(f"Opened URL: {url}")
 
+    def preview_s3_object(self):
+        keys = [key for key in self._selected_values(self.s3_tree) if not key.endswith("/")]
+        if not keys:
+            messagebox.showwarning("Select File", "Select an object to preview.")
+            return
+        PreviewWindow(self, keys[0])
+
+    def _preview_clicked_object(self, event):
+        item = self.s3_tree.identify_row(event.y)
+        values = self.s3_tree.item(item, "values") if item else ()
+        if values and not str(values[0]).endswith("/"):
+            PreviewWindow(self, str(values[0]))
+
     def refresh_s3_tree(self):
-        self.s3_tree.delete(*self.s3_tree.get_children())
+        for tree, node in list(self.listings):
+            if tree is self.s3_tree:
+                self.cancel_listing(tree, node)
+        self.s3_model.clear()
+        self.s3.listing_cache.clear()
+        self.s3_tree.heading("#0", text=S3_HEADING)
         self.populate_s3_root()
 
+    # ---------------- Bucket Search ----------------
+    def _add_s3_search(self, frame):
+        """Search box and filters that query the local bucket inventory."""
+        search_frame = ttk.LabelFrame(frame, text="Search Bucket Index", padding=5)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+
+        query_row = ttk.Frame(search_frame)
+        query_row.pack(fill=tk.X)
+        self.search_query = tk.StringVar()
+        query_entry = ttk.Entry(query_row, textvariable=self.search_query)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        query_entry.bind("<Return>", lambda event: self.search_s3())
+        self.search_mode = tk.StringVar(value=SEARCH_MODES[0])
+        ttk.Combobox(query_row, textvariable=self.search_mode, values=SEARCH_MODES, state="readonly",
+                     width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(query_row, text="Search", command=self.search_s3).pack(side=tk.LEFT)
+        ttk.Button(query_row, text="Clear", command=self.refresh_s3_tree).pack(side=tk.LEFT, padx=(5, 0))
+
+        filter_row = ttk.Frame(search_frame)
+        filter_row.pack(fill=tk.X, pady=(5, 0))
+        self.search_filters = {}
+        for name, label, width in (("min_mb", "Size MB ≥", 6), ("max_mb", "≤", 6),
+                                   ("after", "Modified from", 10), ("before", "to", 10)):
+            ttk.Label(filter_row, text=label).pack(side=tk.LEFT)
+            var = self.search_filters[name] = tk.StringVar()
+            ttk.Entry(filter_row, textvariable=var, width=width).pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Button(filter_row, text="Import Inventory...", command=self.import_s3_inventory).pack(side=tk.RIGHT)
+        ttk.Button(filter_row, text="Index Bucket", command=self.index_s3_bucket).pack(side=tk.RIGHT, padx=5)
+
+    def _search_filters(self):
+        """Parse the size (MB) and date (YYYY-MM-DD) filters into search() arguments."""
+        values = {name: var.get().strip() for name, var in self.search_filters.items()}
+        mb = 1024 * 1024
+
+        def date(text, days=0):
+            moment = datetime.datetime.strptime(text, "%Y-%m-%d") + datetime.timedelta(days=days)
+            return moment.timestamp()
+
+        return {
+            "min_size": float(values["min_mb"]) * mb if values["min_mb"] else None,
+            "max_size": float(values["max_mb"]) * mb if values["max_mb"] else None,
+            "modified_after": date(values["after"]) if values["after"] else None,
+            # "to" includes the whole day
+            "modified_before": date(values["before"], days=1) if values["before"] else None,
+        }
+
+    def search_s3(self):
+        if not self.s3.inventory:
+            messagebox.showinfo("Search", "The bucket inventory is disabled.")
+            return
+        try:
+            filters = self._search_filters()
+        except ValueError:
+            messagebox.showerror("Search", "Sizes must be numbers (MB) and dates YYYY-MM-DD.")
+            return
+        self.threaded_action(self._search_s3_worker, self.search_query.get().strip(), self.search_mode.get(), filters)
+
+    def _search_s3_worker(self, query, mode, filters):
+        start = time.perf_counter()
+        rows = self.s3.inventory.search(query, mode, **filters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.run_on_ui(self._show_search_results, rows, elapsed_ms)
+
+    def _show_search_results(self, rows, elapsed_ms):
+        """Replace the S3 pane with a flat list of matching keys."""
+        for tree, node in list(self.listings):
+            if tree is self.s3_tree:
+                self.cancel_listing(tree, node)
+        self.s3_model.clear()
+        entries = []
+        for key, size, _, modified in rows:
+            details = f"{(size or 0) / 1024:,.1f} KB"
+            if modified:
+                details += f", {datetime.datetime.fromtimestamp(modified):%Y-%m-%d %H:%M}"
+            entries.append((f"{key}   ({details})", key, key.endswith("/")))
+        self.s3_model.replace("", entries)
+        self.s3_tree.heading("#0", text=f"{S3_HEADING} - {len(rows):,} search result(s), Clear to browse")
+
+        crawled = self.s3.inventory.last_crawl()
+        note = "" if crawled else " (bucket not indexed yet - use Index Bucket)"
+        self.logger.log(f"Search: {len(rows):,} match(es) in {elapsed_ms:.0f} ms{note}")
+
+    def index_s3_bucket(self):
+        if not self.s3.inventory:
+            messagebox.showinfo("Index", "The bucket inventory is disabled.")
+            return
+        self.threaded_action(self._index_s3_bucket_worker)
+
+    def _index_s3_bucket_worker(self):
+        """Crawl the selected prefix (the whole bucket at the root) into the inventory."""
+        prefix = self._selected_s3_prefix()
+        self.logger.log(f"Indexing s3://{self.s3.bucket}/{prefix} ...")
+        try:
+            count = self.s3.inventory.crawl(self.s3, prefix,
+                                            on_progress=lambda n: self.run_on_ui(self._show_index_progress, n))
+        except (ClientError, BotoCoreError) as e:
+            self.logger.log(f"Indexing failed, the index was left as it was: {e}")
+            return
+        finally:
+            self.run_on_ui(self.reset_progress)
+        self.logger.log(f"Indexed {count:,} object(s) under s3://{self.s3.bucket}/{prefix}; "
+                        f"{self.s3.inventory.count():,} in the index.")
+
+    def _show_index_progress(self, count):
+        self.progress_label.config(text=f"Indexing: {count:,} object(s) listed")
+
+    def import_s3_inventory(self):
+        if not self.s3.inventory:
+            messagebox.showinfo("Import", "The bucket inventory is disabled.")
+            return
+        path = filedialog.askopenfilename(title="S3 Inventory manifest",
+                                          filetypes=[("Inventory manifest", "manifest.json"), ("JSON", "*.json")])
+        if path:
+            self.threaded_action(self._import_s3_inventory_worker, path)
+
+    def _import_s3_inventory_worker(self, path):
+        self.logger.log(f"Importing S3 Inventory report {path} ...")
+        try:
+            count = self.s3.inventory.import_manifest(path, self.s3.s3)
+        except (OSError, ValueError, KeyError, RuntimeError, ClientError, BotoCoreError) as e:
+            self.logger.log(f"Inventory import failed: {e}")
+            return
+        self.logger.log(f"Imported {count:,} object(s) into the bucket index.")
+
 
 # Updated execution block
 if __name__ == "__main__":
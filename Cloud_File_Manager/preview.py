@@ -0,0 +1,231 @@
+import base64
+import codecs
+import io
+import mimetypes
+import tkinter as tk
+from tkinter import ttk
+
+from botocore.exceptions import ClientError
+
+from compression import stored_encoding
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = None
+
+# Bytes read when the preview opens, and again each time it is scrolled to the end
+PREVIEW_BYTES = 64 * 1024
+
+# Bytes per line in the hex view
+HEX_WIDTH = 16
+
+# Largest image fetched whole for a thumbnail
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+THUMBNAIL_SIZE = (640, 480)
+
+# Fraction of the text view scrolled past before the next range is read (only when the text overflows the view)
+SCROLL_LOAD_AT = 0.9
+
+
+def hex_dump(data, offset=0):
+    """Format bytes as offset / hex / ASCII lines, HEX_WIDTH bytes per line."""
+    lines = []
+    for start in range(0, len(data), HEX_WIDTH):
+        row = data[start:start + HEX_WIDTH]
+        text = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+        lines.append(f"{offset + start:010x}  {row.hex(' '):<{HEX_WIDTH * 3 - 1}}  {text}\n")
+    return "".join(lines)
+
+
+def looks_binary(data):
+    return b"\0" in data[:8192]
+
+
+def is_image(key, content_type):
+    content_type = content_type or mimetypes.guess_type(key)[0] or ""
+    return content_type.startswith("image/") and not content_type.startswith("image/svg")
+
+
+def thumbnail(data, max_size=THUMBNAIL_SIZE):
+    """Return a PhotoImage of image bytes scaled down to fit `max_size`.
+
+    Pillow reads any format it supports; without it Tk reads PNG and GIF.
+    Raises OSError or tk.TclError for data it cannot read.
+    """
+    if Image is not None:
+        image = Image.open(io.BytesIO(data))
+        image.thumbnail(max_size)
+        return ImageTk.PhotoImage(image)
+    image = tk.PhotoImage(data=base64.b64encode(data))
+    factor = max(1, -(-image.width() // max_size[0]), -(-image.height() // max_size[1]))
+    return image.subsample(factor) if factor > 1 else image
+
+
+class PreviewWindow(tk.Toplevel):
+    """Shows the start of an S3 object as text, hex or an image thumbnail.
+
+    Only the first PREVIEW_BYTES are read when the window opens and the
+    next range is read when the view is scrolled to the end, so looking at
+    the head of a large log costs a few small ranged GETs. Text that fits
+    the view (one long line of minified JSON, say) does not scroll, so it
+    grows only through the "Load more" button. Ranges come from
+    S3Manager.read_range and are kept in its on-disk cache.
+    """
+
+    def __init__(self, app, key):
+        super().__init__(app)
+        self.app = app
+        self.s3 = app.s3
+        self.key = key
+        self.head = None
+        self.data = bytearray()
+        self.complete = False
+        self.loading = False
+        self.closed = False
+        self.image = None  # keeps the PhotoImage alive while shown
+        self.decoder = None
+        self.title(f"Preview - {key}")
+        self.geometry("900x600")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = ttk.Frame(self, padding=5)
+        controls.pack(fill=tk.X)
+        self.mode = tk.StringVar(value="text")
+        for label, value in (("Text", "text"), ("Hex", "hex"), ("Image", "image")):
+            ttk.Radiobutton(controls, text=label, value=value, variable=self.mode,
+                            command=self._mode_changed).pack(side=tk.LEFT)
+        self.more_button = ttk.Button(controls, text="Load more", command=self._load, state="disabled")
+        self.more_button.pack(side=tk.LEFT, padx=(15, 0))
+        self.status = ttk.Label(controls, text="Loading...")
+        self.status.pack(side=tk.LEFT, padx=15)
+
+        self.body = ttk.Frame(self)
+        self.body.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(self.body, wrap="none", font="TkFixedFont", state="disabled")
+        scrollbar = ttk.Scrollbar(self.body, command=self.text.yview)
+        self.text.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(fill=tk.BOTH, expand=True)
+        self.image_label = ttk.Label(self.body, anchor="center")
+
+        self._load()
+
+    def close(self):
+        self.closed = True
+        self.destroy()
+
+    # --- Reading (worker thread) ---
+    def _load(self, whole=False):
+        if self.loading or self.complete:
+            return
+        self.loading = True
+        self.status.configure(text="Loading...")
+        self.app.threaded_action(self._load_worker, self.head, len(self.data), whole)
+
+    def _load_worker(self, head, start, whole):
+        try:
+            if head is None:
+                head = self.s3.head_object(self.key)
+                if head is None:
+                    raise FileNotFoundError(f"s3://{self.s3.bucket}/{self.key} no longer exists")
+            size, etag, encoding = head["ContentLength"], head["ETag"], stored_encoding(head)
+            length = MAX_IMAGE_BYTES if whole else PREVIEW_BYTES
+            if encoding:
+                decoded, complete = self.s3.read_decoded_prefix(self.key, etag, size, encoding, start + length)
+                chunk = decoded[start:]
+            else:
+                chunk = self.s3.read_range(self.key, etag, size, start, length)
+                complete = start + len(chunk) >= size
+            self.app.run_on_ui(self._append, head, chunk, complete)
+        except Exception as e:  # BotoCoreError, decode errors...; anything left uncaught would wedge `loading`
+            self.app.run_on_ui(self._failed, e)
+
+    # --- Display (Tk thread) ---
+    def _append(self, head, chunk, complete):
+        if self.closed:
+            return
+        first = self.head is None
+        self.head = head
+        self.loading = False
+        self.complete = complete
+        start = len(self.data)
+        self.data += chunk
+        if first:
+            if is_image(self.key, head.get("ContentType")) and head["ContentLength"] <= MAX_IMAGE_BYTES:
+                self.mode.set("image")
+            elif looks_binary(self.data):
+                self.mode.set("hex")
+        self._show_status()
+        if self.mode.get() == "image":
+            self._mode_changed()
+        else:
+            self._render(start)
+
+    def _failed(self, error):
+        self.loading = False
+        if self.closed:
+            return
+        if isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") == "PreconditionFailed":
+            message = "The object changed since the preview opened; reopen it to see the new version."
+        else:
+            message = f"Preview failed: {error}"
+        self.status.configure(text=message)
+        self.app.logger.log(f"{message} (s3://{self.s3.bucket}/{self.key})")
+
+    def _show_status(self):
+        size = self.head["ContentLength"]
+        shown = f"{len(self.data):,} bytes" + ("" if self.complete else " so far")
+        encoding = stored_encoding(self.head)
+        stored = f", stored {encoding}-compressed ({size:,} bytes)" if encoding else f" of {size:,}"
+        self.status.configure(text=f"{shown}{stored} - {self.head.get('ContentType', 'unknown type')}")
+        self.more_button.configure(state="disabled" if self.complete else "normal")
+
+    def _mode_changed(self):
+        if self.head is None:
+            return
+        if self.mode.get() != "image":
+            self.image_label.pack_forget()
+            self.text.pack(fill=tk.BOTH, expand=True)
+            self._render(0)
+            return
+        if not self.complete:
+            if self.head["ContentLength"] > MAX_IMAGE_BYTES:
+                self.status.configure(text=f"Image is larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB; "
+                                           "use Text or Hex")
+                self.mode.set("hex")
+                self._render(0)
+                return
+            self._load(whole=True)
+            return
+        try:
+            self.image = thumbnail(bytes(self.data))
+        except (OSError, tk.TclError) as e:
+            self.status.configure(text=f"Cannot show as an image: {e}")
+            self.mode.set("hex")
+            self._render(0)
+            return
+        self.text.pack_forget()
+        self.image_label.configure(image=self.image)
+        self.image_label.pack(fill=tk.BOTH, expand=True)
+
+    def _render(self, start):
+        """Add data from `start` to the text view, or redraw it all when `start` is 0."""
+        self.text.configure(state="normal")
+        if start == 0:
+            self.text.delete("1.0", tk.END)
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        if self.mode.get() == "hex":
+            self.text.insert(tk.END, hex_dump(self.data[start:], start))
+        else:
+            self.text.insert(tk.END, self.decoder.decode(bytes(self.data[start:]), final=self.complete))
+        self.text.configure(state="disabled")
+
+    def _on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        # Text that fits the view reports (0, 1) after every append; loading on that would read the whole object
+        overflows = float(first) > 0 or float(last) < 1
+        if overflows and float(last) >= SCROLL_LOAD_AT and self.head is not None and self.mode.get() != "image":
+            self._load()
+
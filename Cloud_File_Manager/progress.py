@@ -0,0 +1,113 @@
+import queue
+import time
+from collections import OrderedDict, deque
+
+# Seconds of history used for the throughput figure
+RATE_WINDOW = 5.0
+
+
+class TransferProgress:
+    """Byte-level progress for a batch of transfers.
+
+    Worker threads only put events on a queue (boto3-style byte callbacks
+    included), so reporting never blocks a transfer. The Tk loop calls
+    drain() at a fixed rate and reads the aggregated totals, rate and ETA.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.discovered = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = OrderedDict()  # file name -> [bytes done, size]
+        self.finished = False
+        self.samples = deque([(time.monotonic(), 0)])
+
+    # --- Worker side (any thread) ---
+    def expect(self, size, files=1):
+        """Announce files (and their bytes) that will be transferred."""
+        self.events.put(("expect", files, size or 0))
+
+    def start(self, name, size):
+        self.events.put(("start", name, size or 0))
+
+    def callback(self, name):
+        """Return a boto3-style Callback(bytes_amount) for one file."""
+        return lambda bytes_amount: self.events.put(("bytes", name, bytes_amount))
+
+    def finish(self, name, ok=True):
+        self.events.put(("finish", name, ok))
+
+    def close(self):
+        self.events.put(("close", None, None))
+
+    # --- UI side (Tk thread) ---
+    def drain(self):
+        """Apply all queued events and record a throughput sample."""
+        while True:
+            try:
+                kind, name, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "expect":
+                self.discovered += name
+                self.total_bytes += value
+            elif kind == "start":
+                self.started += 1
+                self.active[name] = [0, value]
+            elif kind == "bytes":
+                self.done_bytes += value
+                if name in self.active:
+                    self.active[name][0] += value
+            elif kind == "finish":
+                done, size = self.active.pop(name, [0, 0])
+                if value:
+                    self.completed += 1
+                    self.done_bytes += max(size - done, 0)
+                else:
+                    # Drop a failed file from both sides of the ratio
+                    self.failed += 1
+                    self.done_bytes -= done
+                    self.total_bytes -= size
+            elif kind == "close":
+                self.finished = True
+
+        now = time.monotonic()
+        self.samples.append((now, self.done_bytes))
+        while len(self.samples) > 2 and now - self.samples[0][0] > RATE_WINDOW:
+            self.samples.popleft()
+
+    def percent(self):
+        if self.total_bytes > 0:
+            return min(self.done_bytes / self.total_bytes * 100, 100)
+        if self.discovered:
+            return (self.completed + self.failed) / self.discovered * 100
+        return 0
+
+    def rate(self):
+        """Bytes per second over the last RATE_WINDOW seconds."""
+        (t0, b0), (t1, b1) = self.samples[0], self.samples[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def eta(self):
+        """Seconds left at the current rate, or None if unknown."""
+        rate = self.rate()
+        if rate <= 0 or self.total_bytes <= self.done_bytes:
+            return None
+        return (self.total_bytes - self.done_bytes) / rate
+
+    def summary(self):
+        mb = 1024 * 1024
+        eta = self.eta()
+        eta_text = f"{int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else "--:--"
+        text = (f"{self.done_bytes / mb:,.1f} / {self.total_bytes / mb:,.1f} MB · {self.rate() / mb:,.1f} MB/s · "
+                f"ETA {eta_text} · Files: {self.completed:,} done, {self.discovered - self.started:,} queued, "
+                f"{self.failed:,} failed")
+        if self.active:
+            name, (done, size) = next(reversed(self.active.items()))
+            file_percent = done / size * 100 if size else 0
+            text += f"\n{name}: {done / mb:,.1f} / {size / mb:,.1f} MB ({file_percent:.0f}%)"
+        return text
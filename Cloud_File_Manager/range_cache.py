@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+import time
+
+# Objects are cached in aligned blocks of this many bytes
+BLOCK_SIZE = 64 * 1024
+
+# Cache size on disk before the least recently used blocks are dropped
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Blocks dropped per eviction query
+EVICT_BATCH = 64
+
+
+class RangeCache:
+    """On-disk LRU cache of object byte ranges keyed by key and ETag.
+
+    Objects are cached in aligned BLOCK_SIZE blocks, so any range can be
+    served from the blocks it overlaps. The ETag pins the bytes to one
+    version of the object; storing a block for a new ETag drops the blocks
+    of older versions of the same key.
+    """
+
+    def __init__(self, db_path="preview_cache.db", max_bytes=MAX_CACHE_BYTES, block_size=BLOCK_SIZE):
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " key TEXT, etag TEXT, block INTEGER, data BLOB, used REAL, PRIMARY KEY (key, etag, block))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM blocks").fetchone()[0]
+
+    def get(self, key, etag, first, last):
+        """Return {block number: bytes} for the cached blocks first..last of one object version."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT block, data FROM blocks WHERE key = ? AND etag = ? AND block BETWEEN ? AND ?",
+                (key, etag, first, last),
+            ).fetchall()
+            if rows:
+                self.conn.execute(
+                    "UPDATE blocks SET used = ? WHERE key = ? AND etag = ? AND block BETWEEN ? AND ?",
+                    (time.time(), key, etag, first, last),
+                )
+                self.conn.commit()
+        return dict(rows)
+
+    def put(self, key, etag, block, data):
+        with self.lock:
+            stale = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM blocks WHERE key = ? AND etag != ?", (key, etag)
+            ).fetchone()[0]
+            if stale:
+                self.conn.execute("DELETE FROM blocks WHERE key = ? AND etag != ?", (key, etag))
+            replaced = self.conn.execute(
+                "SELECT LENGTH(data) FROM blocks WHERE key = ? AND etag = ? AND block = ?", (key, etag, block)
+            ).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?)",
+                              (key, etag, block, data, time.time()))
+            self.size += len(data) - stale - (replaced[0] if replaced else 0)
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT rowid, LENGTH(data) FROM blocks ORDER BY used LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            for rowid, length in rows:
+                self.conn.execute("DELETE FROM blocks WHERE rowid = ?", (rowid,))
+                self.size -= length
+                if self.size <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM blocks")
+            self.conn.commit()
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
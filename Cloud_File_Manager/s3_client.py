@@ -0,0 +1,115 @@
+import threading
+
+import boto3
+from botocore.config import Config
+
+import cred
+
+# Connection and retry tuning
+MAX_POOL_CONNECTIONS = 64    # HTTP connections kept open to S3 (botocore defaults to 10)
+RETRY_MODE = "adaptive"      # Client-side rate limiting that backs off when S3 throttles
+MAX_ATTEMPTS = 10            # Attempts per request, including the first
+CONNECT_TIMEOUT = 10         # Seconds to open a connection
+READ_TIMEOUT = 60            # Seconds to wait for data on an open connection
+
+# Error codes S3 (and the retry handler) treat as throttling
+THROTTLE_CODES = {
+    "SlowDown", "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+    "RequestThrottledException", "RequestLimitExceeded", "TooManyRequestsException",
+}
+
+
+class PooledS3Client:
+    """One boto3 S3 client sized for concurrent transfers, with usage stats.
+
+    boto3 clients are thread-safe, so every worker shares this client and
+    its connection pool. The pool should be at least as large as the number
+    of requests that can be in flight at once; otherwise urllib3 opens and
+    throws away extra connections. Client events keep counts of requests in
+    flight, retries and throttling responses so pool pressure is visible.
+    """
+
+    def __init__(self, max_pool_connections=MAX_POOL_CONNECTIONS, retry_mode=RETRY_MODE,
+                 max_attempts=MAX_ATTEMPTS, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 endpoint_url=None):
+        self.max_pool_connections = max_pool_connections
+        self.client = boto3.client(
+            "s3",
+            aws_access_key_id=cred.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=cred.AWS_SECRET_ACCESS_KEY,
+            region_name=cred.AWS_REGION,
+            endpoint_url=endpoint_url,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"mode": retry_mode, "max_attempts": max_attempts},
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                tcp_keepalive=True,
+            ),
+        )
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.requests = 0
+        self.retries = 0
+        self.throttles = 0
+        self.errors = 0
+
+        events = self.client.meta.events
+        events.register("before-call.s3", self._on_before_call)
+        events.register("after-call.s3", self._on_after_call)
+        events.register("after-call-error.s3", self._on_after_call_error)
+        events.register("needs-retry.s3", self._on_attempt)
+
+    def stats(self):
+        """Return a snapshot of the pool counters."""
+        with self.lock:
+            return {
+                "pool_size": self.max_pool_connections,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttles": self.throttles,
+                "errors": self.errors,
+            }
+
+    def describe(self):
+        stats = self.stats()
+        text = (f"S3 pool: {stats['in_use']}/{stats['pool_size']} in use (peak {stats['peak_in_use']}), "
+                f"{stats['requests']:,} requests, {stats['retries']:,} retries, "
+                f"{stats['throttles']:,} throttled, {stats['errors']:,} failed")
+        if stats["peak_in_use"] > stats["pool_size"]:
+            text += " - pool exhausted, raise max_pool_connections"
+        return text
+
+    # --- Client event hooks (called on the requesting thread) ---
+    def _on_before_call(self, **kwargs):
+        with self.lock:
+            self.in_use += 1
+            self.requests += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_after_call(self, http_response=None, parsed=None, **kwargs):
+        retries = (parsed or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        failed = http_response is not None and http_response.status_code >= 300
+        with self.lock:
+            self.in_use -= 1
+            self.retries += retries
+            self.errors += failed
+
+    def _on_after_call_error(self, **kwargs):
+        with self.lock:
+            self.in_use -= 1
+            self.errors += 1
+
+    def _on_attempt(self, response=None, **kwargs):
+        """Count throttling responses on every attempt, retried or not."""
+        if response is None:
+            return None
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_CODES or getattr(http_response, "status_code", None) == 429:
+            with self.lock:
+                self.throttles += 1
+        return None
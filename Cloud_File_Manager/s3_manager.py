@@ -1,76 +1,1153 @@
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, BotoCoreError
 import cred
 import os
 import mimetypes
 import hashlib
+import base64
+import tempfile
+import threading
+import queue
+import itertools
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+
+from listing_cache import ListingCache, parent_prefix
+from hash_cache import HashCache
+from local_index import iter_files
+from inventory import BucketInventory
+from range_cache import RangeCache, BLOCK_SIZE
+from compression import (available_encoding, is_compressible, compress_stream, decompress_stream, stored_encoding,
+                         META_ORIGINAL_SIZE, META_ORIGINAL_SHA256, MIN_COMPRESS_SIZE)
+from s3_client import PooledS3Client, MAX_POOL_CONNECTIONS
+
+# Transfer tuning
+MULTIPART_THRESHOLD = 64 * 1024 * 1024   # Files at or above this size use multipart upload
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024   # Part size for multipart uploads
+MAX_CONCURRENCY = 8                      # Parts uploaded in parallel per file
+MAX_PARTS = 10000                        # S3 hard limit on parts per upload
+MIN_PART_SIZE = 5 * 1024 * 1024          # S3 minimum size for every part but the last
+DELETE_BATCH_SIZE = 1000                 # S3 limit on keys per DeleteObjects call
+UPLOAD_QUEUE_SIZE = 1000                 # Files buffered between the folder walker and upload workers
+UPLOAD_BUFFER_BYTES = 256 * 1024 * 1024  # File and part buffers held by all uploads together
+RESUME_SUFFIX = ".part"                  # Resumable downloads are assembled in <local path>.part
+MAX_COPY_SIZE = 5 * 1024 ** 3            # S3 limit for a single CopyObject; larger objects use UploadPartCopy
+COPY_PART_SIZE = 512 * 1024 * 1024       # Part size for multipart copies (server-side, so large parts are cheap)
+
+# Listing cache
+LISTING_CACHE_SIZE = 512                 # Prefixes kept in the listing cache
+LISTING_CACHE_TTL = 300                  # Seconds before a cached listing is re-fetched
+
+# Local checksum index (None disables it)
+HASH_CACHE_PATH = "hash_cache.db"
+
+# Compress text-like files on upload: "gzip", "zstd" (needs zstandard) or None to send them as they are
+COMPRESSION = None
+
+# Local bucket inventory for search (None disables it)
+INVENTORY_PATH = "inventory.db"
+
+# On-disk cache of byte ranges read for previews (None disables it)
+PREVIEW_CACHE_PATH = "preview_cache.db"
+
+# Process umask, read once at import; mkstemp files are 0600 and get the usual mode before the rename
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class BufferBudget:
+    """Caps the bytes all uploads hold in memory at once.
+
+    Each upload reserves its worst case up front (the whole file for a
+    single PUT, one part per concurrent part plus the one being read for a
+    multipart upload) and waits while the budget is spent. A reservation
+    larger than the whole budget goes ahead once nothing else is held.
+    """
+
+    def __init__(self, limit=UPLOAD_BUFFER_BYTES):
+        self.limit = limit
+        self.used = 0
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def hold(self, nbytes):
+        with self.cond:
+            while self.used and self.used + nbytes > self.limit:
+                self.cond.wait()
+            self.used += nbytes
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.used -= nbytes
+                self.cond.notify_all()
+
+
+def local_target(folder, relative_path):
+    """Local path for an S3-relative path below `folder`, or None if it would land outside it.
+
+    Keys are untrusted: `..`, `.` and empty segments are rejected, and the
+    resolved path must stay under the resolved folder.
+    """
+    parts = relative_path.split("/")
+    # A folder key ends in "/", which leaves one trailing empty segment
+    segments = parts[:-1] if len(parts) > 1 and parts[-1] == "" else parts
+    if any(segment in ("", ".", "..") for segment in segments):
+        return None
+    path = os.path.normpath(os.path.join(folder, *parts))
+    root = os.path.realpath(folder)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        return None
+    return path
+
 
 class S3Manager:
-    def __init__(self):
-        self.s3 = boto3.client(
-            "s3",
-            aws_access_key_id=cred.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=cred.AWS_SECRET_ACCESS_KEY,
-            region_name=cred.AWS_REGION,
-        )
+    def __init__(self, multipart_threshold=MULTIPART_THRESHOLD, part_size=MULTIPART_CHUNKSIZE,
+                 max_concurrency=MAX_CONCURRENCY, cache_size=LISTING_CACHE_SIZE,
+                 cache_ttl=LISTING_CACHE_TTL, hash_cache_path=HASH_CACHE_PATH, max_pool_connections=None,
+                 endpoint_url=None, inventory_path=INVENTORY_PATH, compression=COMPRESSION,
+                 preview_cache_path=PREVIEW_CACHE_PATH):
         self.bucket = cred.S3_BUCKET
+        self.multipart_threshold = multipart_threshold
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max(1, max_concurrency)
+        self.buffers = BufferBudget()
+        self.compression = available_encoding(compression)
+        if max_pool_connections is None:
+            # Each file worker can run its own max_concurrency part or range requests
+            max_pool_connections = max(MAX_POOL_CONNECTIONS, self.max_concurrency * (self.max_concurrency + 1))
+        self.pool = PooledS3Client(max_pool_connections=max_pool_connections, endpoint_url=endpoint_url)
+        self.s3 = self.pool.client
+        self.listing_cache = ListingCache(max_entries=cache_size, ttl=cache_ttl)
+        self.hash_cache = HashCache(hash_cache_path) if hash_cache_path else None
+        self.inventory = BucketInventory(inventory_path, self.bucket) if inventory_path else None
+        self.range_cache = RangeCache(preview_cache_path) if preview_cache_path else None
+        self.local_index = None  # optional LocalIndex that replaces folder walks for watched roots
 
     def list_prefix(self, prefix=""):
         """Return folders and files under a prefix"""
         folders, files = set(), []
-        try:
-            response = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=prefix, Delimiter="/")
-            if "CommonPrefixes" in response:
-                folders = {p["Prefix"] for p in response["CommonPrefixes"]}
-            if "Contents" in response:
-                files = [obj["Key"] for obj in response["Contents"] if not obj["Key"].endswith("/")]
-        except ClientError as e:
-            print("Error listing prefix:", e)
+        for page_folders, page_files in self.iter_prefix(prefix):
+            folders.update(page_folders)
+            files.extend(page_files)
         return sorted(folders), sorted(files)
 
-    def upload_file(self, local_path, s3_path):
-        """Upload one file with correct MIME type and SHA256 checksum"""
+    def iter_prefix(self, prefix="", page_size=1000):
+        """Yield (folders, files) one listing page at a time.
+
+        Follows continuation tokens so prefixes with more than 1000 keys are
+        listed in full, while callers can start using the first page as soon
+        as it arrives. A cached listing is yielded as a single page; a full
+        listing is stored in the cache once the last page has been read.
+        Listing errors (ClientError, BotoCoreError) propagate and nothing is
+        cached.
+        """
+        cached = self.listing_cache.get(prefix)
+        if cached is not None:
+            yield cached
+            return
+
+        stamp = self.listing_cache.stamp()
+        all_folders, all_files = [], []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket,
+            Prefix=prefix,
+            Delimiter="/",
+            PaginationConfig={"PageSize": page_size},
+        )
+        for response in pages:
+            folders = [p["Prefix"] for p in response.get("CommonPrefixes", [])]
+            files = [obj["Key"] for obj in response.get("Contents", []) if not obj["Key"].endswith("/")]
+            all_folders.extend(folders)
+            all_files.extend(files)
+            yield folders, files
+        self.listing_cache.put(prefix, all_folders, all_files, stamp)
+
+    def upload_file(self, local_path, s3_path, callback=None, control=None):
+        """Upload one file with correct MIME type and SHA256 checksum.
+
+        Small files go through a single PUT; large files are split into parts
+        that are uploaded concurrently. The file is read exactly once and the
+        SHA256 is computed from the same buffers that are sent. With
+        compression on, text-like files are compressed on the way instead
+        (see _put_compressed). The buffers count against the manager's
+        BufferBudget, so concurrent uploads share one memory cap.
+        `callback` is a boto3-style Callback(bytes_amount) called as data
+        is sent.
+
+        `control` is an optional transfer job (see transfer_queue) that can
+        pause, cancel and throttle the upload and that journals multipart
+        progress, so an interrupted upload resumes with the parts it had
+        not sent yet. Returns the hex digest, or None if the upload failed.
+        """
         content_type, _ = mimetypes.guess_type(local_path)
         if not content_type:
             content_type = "application/octet-stream"
 
-        # Calculate SHA256 hash (optional, just for logging)
-        sha256_hash = hashlib.sha256()
-        with open(local_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        checksum_sha256 = sha256_hash.hexdigest()
-
         try:
-            with open(local_path, "rb") as f:
-                self.s3.put_object(
-                    Bucket=self.bucket,
-                    Key=s3_path,
-                    Body=f,
-                    ContentType=content_type,
-                    ChecksumAlgorithm="SHA256",
-                )
+            stat = os.stat(local_path)
+            cached = self.hash_cache.get(local_path, stat) if self.hash_cache else None
+            # Only the multipart path computes a composite; the others keep whatever the cache already had
+            part_size, composite = (cached[1], cached[2]) if cached else (None, None)
+            if self.compression and is_compressible(local_path, content_type, stat.st_size):
+                need = min(stat.st_size, self.part_size_for(stat.st_size) * (self.max_concurrency + 2))
+                with self.buffers.hold(need):
+                    digest = self._put_compressed(local_path, s3_path, content_type, stat, callback, control)
+            elif stat.st_size < self.multipart_threshold:
+                if control:
+                    control.checkpoint()
+                    control.throttle(stat.st_size)
+                with self.buffers.hold(stat.st_size):
+                    digest = self._put_single(local_path, s3_path, content_type, cached[0] if cached else None)
+                if callback:
+                    callback(stat.st_size)
+            else:
+                part_size = self.part_size_for(stat.st_size)
+                with self.buffers.hold(part_size * (self.max_concurrency + 1)):
+                    digest, composite = self._put_multipart(local_path, s3_path, content_type, part_size,
+                                                            callback, control)
+            if self.hash_cache:
+                self.hash_cache.put(local_path, stat, digest, part_size, composite)
+            self.listing_cache.add_key(s3_path)
+            if self.inventory:
+                self.inventory.put(s3_path, stat.st_size)
+            checksum_sha256 = digest.hex()
             print(f"Uploaded {local_path} → s3://{self.bucket}/{s3_path} with SHA256 {checksum_sha256}")
-        except ClientError as e:
+            return checksum_sha256
+        except (ClientError, BotoCoreError, OSError) as e:
             print("Upload failed:", e)
+            return None
+
+    def _put_single(self, local_path, s3_path, content_type, digest=None):
+        """Read a small file once, hash it (unless already known) and send it in one PUT."""
+        with open(local_path, "rb") as f:
+            data = f.read()
+        digest = digest or hashlib.sha256(data).digest()
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=s3_path,
+            Body=data,
+            ContentType=content_type,
+            ChecksumSHA256=base64.b64encode(digest).decode(),
+        )
+        return digest
+
+    def _put_multipart(self, local_path, s3_path, content_type, part_size, callback=None, control=None):
+        """Stream a large file through a multipart upload with parallel parts.
+
+        Parts are read sequentially into part-sized buffers, fed to the
+        running SHA256 and handed to the worker pool. At most
+        ``max_concurrency`` parts are in flight, so memory stays bounded at
+        roughly ``max_concurrency * part_size``. Returns the SHA256 digest
+        and the composite checksum S3 stores for the object.
+
+        With a `control`, parts already journaled for the same file are
+        read for the checksum but not sent again, and a failed upload is
+        left open to be resumed instead of aborted (unless it was cancelled).
+        """
+        upload_id, sent = self._resume_multipart(local_path, s3_path, part_size, control)
+        if upload_id is None:
+            upload_id = self._create_multipart(local_path, s3_path, part_size, control, ContentType=content_type)
+
+        sha256_hash = hashlib.sha256()
+
+        def chunks():
+            with open(local_path, "rb") as f:
+                for chunk in iter(lambda: f.read(part_size), b""):
+                    sha256_hash.update(chunk)
+                    yield chunk
+
+        parts = self._send_parts(s3_path, upload_id, chunks(), sent, callback, control)
+        combined = hashlib.sha256(b"".join(base64.b64decode(p["ChecksumSHA256"]) for p in parts))
+        composite = f"{base64.b64encode(combined.digest()).decode()}-{len(parts)}"
+        return sha256_hash.digest(), composite
+
+    def _put_compressed(self, local_path, s3_path, content_type, stat, callback=None, control=None):
+        """Compress a file while uploading it; returns the SHA256 digest of the original bytes.
+
+        Output that fits in one part goes up as a single PUT. Larger output
+        is sent as a multipart upload as soon as the first parts are ready.
+        Its metadata is set when the upload starts, so the original checksum
+        comes from the hash cache; on a miss it is hashed in the same pass
+        and written afterwards with a server-side copy. `callback` counts
+        original bytes as they are compressed.
+        """
+        encoding = self.compression
+        part_size = self.part_size_for(stat.st_size)
+        sha256_hash = hashlib.sha256()
+        stored = [0]  # compressed bytes produced
+
+        def raw_chunks():
+            with open(local_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    if control:
+                        control.checkpoint()
+                    sha256_hash.update(chunk)
+                    if callback:
+                        callback(len(chunk))
+                    yield chunk
+
+        def compressed_parts():
+            buffer = bytearray()
+            for out in compress_stream(encoding, raw_chunks()):
+                stored[0] += len(out)
+                buffer += out
+                while len(buffer) > part_size:
+                    yield bytes(buffer[:part_size])
+                    del buffer[:part_size]
+            if buffer:
+                yield bytes(buffer)
+
+        parts = compressed_parts()
+        first = next(parts, b"")
+        second = next(parts, None)
+        if second is None:
+            if control:
+                control.throttle(len(first))
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=s3_path,
+                Body=first,
+                ContentType=content_type,
+                ContentEncoding=encoding,
+                Metadata=self._original_metadata(stat.st_size, sha256_hash.digest()),
+                ChecksumSHA256=base64.b64encode(hashlib.sha256(first).digest()).decode(),
+            )
+            return sha256_hash.digest()
+
+        upload_id, sent = self._resume_multipart(local_path, s3_path, part_size, control, encoding)
+        if upload_id is None:
+            cached = self.hash_cache.get(local_path, stat) if self.hash_cache else None
+            metadata = ({META_ORIGINAL_SIZE: str(stat.st_size)} if cached is None
+                        else self._original_metadata(stat.st_size, cached[0]))
+            upload_id = self._create_multipart(local_path, s3_path, part_size, control, encoding,
+                                               ContentType=content_type, ContentEncoding=encoding, Metadata=metadata)
+            missing_digest = cached is None
+            if control:
+                control.state["missing_digest"] = missing_digest
+                control.save()
+        else:
+            missing_digest = control.state.get("missing_digest", False)
+        self._send_parts(s3_path, upload_id, itertools.chain([first, second], parts), sent, None, control)
+        if missing_digest:
+            self._replace_headers(s3_path, stored[0], ContentType=content_type, ContentEncoding=encoding,
+                                  Metadata=self._original_metadata(stat.st_size, sha256_hash.digest()))
+        return sha256_hash.digest()
 
-    def download_file(self, s3_key, local_path):
-        """Download a single S3 file"""
+    def _replace_headers(self, key, size, **headers):
+        """Rewrite an object's content headers and metadata in place with a server-side copy."""
+        copy_source = {"Bucket": self.bucket, "Key": key}
+        if size <= MAX_COPY_SIZE:
+            self.s3.copy_object(Bucket=self.bucket, Key=key, CopySource=copy_source, MetadataDirective="REPLACE",
+                                ChecksumAlgorithm="SHA256", **headers)
+        else:
+            self._copy_multipart(copy_source, key, size, extra_args=headers)
+
+    @staticmethod
+    def _original_metadata(size, digest):
+        return {META_ORIGINAL_SIZE: str(size), META_ORIGINAL_SHA256: base64.b64encode(digest).decode()}
+
+    def _create_multipart(self, local_path, s3_path, part_size, control=None, encoding=None, **extra):
+        """Start a multipart upload and journal it on `control` so it can be resumed."""
+        upload_id = self.s3.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=s3_path,
+            ChecksumAlgorithm="SHA256",
+            **extra,
+        )["UploadId"]
+        if control:
+            stat = os.stat(local_path)
+            control.state.clear()
+            control.state.update(upload_id=upload_id, part_size=part_size, size=stat.st_size,
+                                 mtime_ns=stat.st_mtime_ns, encoding=encoding, parts={})
+            control.save()
+        return upload_id
+
+    def _send_parts(self, s3_path, upload_id, chunks, sent, callback=None, control=None):
+        """Upload part-sized `chunks` concurrently and complete the upload; returns the part list.
+
+        Part numbers in `sent` were uploaded by an earlier attempt and are
+        skipped. On failure the upload is aborted, unless `control` can
+        resume it later.
+        """
+        parts = []
         try:
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            self.s3.download_file(self.bucket, s3_key, local_path)
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                pending = set()
+                for part_number, chunk in enumerate(chunks, start=1):
+                    if control:
+                        control.checkpoint()
+                    if part_number in sent:
+                        parts.append(sent[part_number])
+                        if callback:
+                            callback(len(chunk))
+                        continue
+                    if control:
+                        control.throttle(len(chunk))
+                    if len(pending) >= self.max_concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        parts.extend(fut.result() for fut in done)
+                    pending.add(pool.submit(self._upload_part, s3_path, upload_id, part_number, chunk, callback,
+                                            control))
+                parts.extend(fut.result() for fut in pending)
+
+            parts.sort(key=lambda p: p["PartNumber"])
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=s3_path,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            if control is None or control.cancelled:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=s3_path, UploadId=upload_id)
+                if control:
+                    control.state.clear()
+                    control.save()
+            raise
+        if control:
+            control.state.clear()
+            control.save()
+        return parts
+
+    def _resume_multipart(self, local_path, s3_path, part_size, control, encoding=None):
+        """Return (upload id, {part number: part entry}) of a journaled upload to continue.
+
+        The journal is only trusted while the file is unchanged and S3 still
+        has the upload; parts S3 does not list are sent again.
+        """
+        state = control.state if control else {}
+        upload_id = state.get("upload_id")
+        if not upload_id:
+            return None, {}
+        stat = os.stat(local_path)
+        journaled = (state.get("part_size"), state.get("size"), state.get("mtime_ns"), state.get("encoding"))
+        if journaled != (part_size, stat.st_size, stat.st_mtime_ns, encoding):
+            try:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=s3_path, UploadId=upload_id)
+            except ClientError:
+                pass
+            return None, {}
+        try:
+            listed = set()
+            paginator = self.s3.get_paginator("list_parts")
+            for page in paginator.paginate(Bucket=self.bucket, Key=s3_path, UploadId=upload_id):
+                listed.update(part["PartNumber"] for part in page.get("Parts", []))
+        except ClientError:
+            return None, {}  # The upload expired or was aborted elsewhere
+        sent = {int(number): part for number, part in state.get("parts", {}).items() if int(number) in listed}
+        print(f"Resuming upload of {local_path}: {len(sent)} part(s) already sent")
+        return upload_id, sent
+
+    def part_size_for(self, size):
+        """Part size used for a multipart upload of `size` bytes"""
+        if size > self.part_size * MAX_PARTS:
+            return -(-size // MAX_PARTS)
+        return self.part_size
+
+    def _upload_part(self, s3_path, upload_id, part_number, data, callback=None, control=None):
+        """Upload one part and return its entry for CompleteMultipartUpload."""
+        checksum = base64.b64encode(hashlib.sha256(data).digest()).decode()
+        response = self.s3.upload_part(
+            Bucket=self.bucket,
+            Key=s3_path,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+            ChecksumSHA256=checksum,
+        )
+        if callback:
+            callback(len(data))
+        part = {"PartNumber": part_number, "ETag": response["ETag"], "ChecksumSHA256": checksum}
+        if control:
+            control.record_part(part)
+        return part
+
+    def iter_upload_targets(self, local_paths, prefix=""):
+        """Yield (local path, S3 key, size) for files and, recursively, folders.
+
+        A selected folder keeps its name and layout under `prefix`. Folders
+        are walked lazily, so the first files are yielded right away.
+        """
+        for local_path in local_paths:
+            if os.path.isdir(local_path):
+                base = f"{prefix}{os.path.basename(os.path.normpath(local_path))}/"
+                for relative, size, _ in iter_files(local_path, self.local_index):
+                    yield os.path.join(local_path, *relative.split("/")), base + relative, size
+            else:
+                yield local_path, prefix + os.path.basename(local_path), os.path.getsize(local_path)
+
+    def upload_many(self, items, progress=None, control=None):
+        """Upload (local path, S3 key, size) items through a bounded queue and worker pool.
+
+        `items` is consumed on the calling thread while workers upload, so
+        transfers start before a folder walk finishes and at most
+        UPLOAD_QUEUE_SIZE pending files are held in memory; file buffers are
+        capped by the shared BufferBudget however many workers run. A file
+        that fails for any reason is recorded and the worker moves on. File
+        and byte progress is reported to an optional TransferProgress.
+
+        `control` is an optional folder job (see transfer_queue): it is
+        checked before each file and hands each upload its own file control.
+        Once it is paused or cancelled the remaining files are skipped and
+        the exception that stopped it is raised when the workers are done.
+        Returns (completed count, failed paths).
+        """
+        work = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        lock = threading.Lock()
+        completed = [0]
+        failed = []
+        stopped = []  # the exception that paused or cancelled `control`
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                if stopped:
+                    continue  # drain the queue so the walker never blocks
+                local_path, s3_key, size = item
+                callback = None
+                if progress:
+                    progress.start(local_path, size)
+                    callback = progress.callback(local_path)
+                try:
+                    if control:
+                        control.checkpoint()
+                    ok = self.upload_file(local_path, s3_key, callback,
+                                          control.for_file() if control else None) is not None
+                except Exception as e:  # keep the worker alive, or the walker blocks on a full queue
+                    if control is not None and control.stopping:
+                        stopped.append(e)
+                        continue
+                    print("Upload failed:", e)
+                    ok = False
+                if progress:
+                    progress.finish(local_path, ok)
+                with lock:
+                    if ok:
+                        completed[0] += 1
+                    else:
+                        failed.append(local_path)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.max_concurrency)]
+        for thread in workers:
+            thread.start()
+        try:
+            for item in items:
+                if control and not stopped:
+                    try:
+                        control.checkpoint()
+                    except Exception as e:
+                        stopped.append(e)
+                if stopped:
+                    break
+                if progress:
+                    progress.expect(item[2])
+                work.put(item)
+        finally:
+            for _ in workers:
+                work.put(None)
+            for thread in workers:
+                thread.join()
+        if stopped:
+            raise stopped[0]
+        return completed[0], failed
+
+    def download_file(self, s3_key, local_path, size=None, callback=None, control=None):
+        """Download a single S3 file atomically.
+
+        The object is written to a temporary file next to `local_path` and
+        renamed into place once complete. Objects at or above the multipart
+        threshold are fetched as parallel byte-range GETs into a preallocated
+        file. Objects this app stored compressed are decompressed on the
+        way. `callback` is a boto3-style Callback(bytes_amount) called as
+        (stored) bytes arrive. With a `control` (see upload_file) the
+        download is resumable instead. Returns True on success.
+        """
+        if control:
+            return self._download_resumable(s3_key, local_path, callback, control)
+        directory = os.path.dirname(local_path) or "."
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            encoding = None
+            etag = None
+            if size is None or size >= self.multipart_threshold:
+                head = self.s3.head_object(Bucket=self.bucket, Key=s3_key)
+                size, encoding, etag = head["ContentLength"], stored_encoding(head), head["ETag"]
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(local_path)}.", suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                if size < self.multipart_threshold:
+                    response = self.s3.get_object(Bucket=self.bucket, Key=s3_key)
+                    chunks = self._read_body(response["Body"], callback)
+                    encoding = stored_encoding(response)
+                    for chunk in decompress_stream(encoding, chunks) if encoding else chunks:
+                        f.write(chunk)
+                    encoding = None  # already decompressed
+                else:
+                    f.truncate(size)
+            if size >= self.multipart_threshold:
+                # Pin every range to the version the size came from, so an overwrite mid-download fails
+                self._get_ranges(s3_key, tmp_path, size, callback, etag=etag)
+
+            self._finish_download(tmp_path, local_path, encoding)
             print(f"Downloaded s3://{self.bucket}/{s3_key} → {local_path}")
-        except ClientError as e:
+            return True
+        except (ClientError, BotoCoreError, OSError) as e:
             print("Download failed:", e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _download_resumable(self, s3_key, local_path, callback, control):
+        """Download into <local path>.part in journaled ranges, then rename it into place.
+
+        Ranges finished by an earlier attempt are skipped while the object's
+        ETag is unchanged; every GET is pinned to that ETag with IfMatch.
+        """
+        tmp_path = local_path + RESUME_SUFFIX
+        try:
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+            head = self.s3.head_object(Bucket=self.bucket, Key=s3_key)
+            size, etag = head["ContentLength"], head["ETag"]
+            state = control.state
+            if (state.get("etag"), state.get("size")) != (etag, size) or not os.path.exists(tmp_path):
+                state.clear()
+                state.update(etag=etag, size=size, ranges=[])
+                control.save()
+                with open(tmp_path, "wb") as f:
+                    f.truncate(size)
+            elif state["ranges"]:
+                print(f"Resuming download of s3://{self.bucket}/{s3_key}: {len(state['ranges'])} range(s) done")
+            self._get_ranges(s3_key, tmp_path, size, callback, control, etag)
+            self._finish_download(tmp_path, local_path, stored_encoding(head))
+            control.state.clear()
+            control.save()
+            print(f"Downloaded s3://{self.bucket}/{s3_key} → {local_path}")
+            return True
+        except (ClientError, BotoCoreError, OSError) as e:
+            print("Download failed:", e)
+            return False
+        finally:
+            if control.cancelled and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _read_body(body, callback=None):
+        for chunk in iter(lambda: body.read(1024 * 1024), b""):
+            if callback:
+                callback(len(chunk))
+            yield chunk
+
+    @staticmethod
+    def _finish_download(tmp_path, local_path, encoding=None):
+        """Move a completed download into place, decompressing it first if it was stored compressed.
+
+        The file gets the mode a plain open() would have given it, not mkstemp's 0600.
+        """
+        if encoding:
+            directory = os.path.dirname(local_path) or "."
+            fd, plain_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(local_path)}.")
+            try:
+                with open(tmp_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                    for chunk in decompress_stream(encoding, iter(lambda: src.read(1024 * 1024), b"")):
+                        dst.write(chunk)
+            except Exception:
+                os.remove(plain_path)
+                raise
+            os.remove(tmp_path)
+            tmp_path = plain_path
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, local_path)
+
+    def _get_ranges(self, s3_key, path, size, callback=None, control=None, etag=None):
+        """Fill a preallocated file with concurrent byte-range GETs."""
+        ranges = [(start, min(start + self.part_size, size) - 1) for start in range(0, size, self.part_size)]
+        if control:
+            done = set(control.state["ranges"])
+            for start, end in ranges:
+                if start in done and callback:
+                    callback(end - start + 1)
+            ranges = [(start, end) for start, end in ranges if start not in done]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = [pool.submit(self._get_range, s3_key, path, start, end, callback, control, etag)
+                       for start, end in ranges]
+            for fut in futures:
+                fut.result()
 
-    def delete_objects(self, keys):
-        """Delete multiple objects"""
+    def _get_range(self, s3_key, path, start, end, callback=None, control=None, etag=None):
+        extra = {"IfMatch": etag} if etag else {}
+        body = self.s3.get_object(Bucket=self.bucket, Key=s3_key, Range=f"bytes={start}-{end}", **extra)["Body"]
+        with open(path, "r+b") as f:
+            f.seek(start)
+            for chunk in iter(lambda: body.read(1024 * 1024), b""):
+                if control:
+                    control.checkpoint()
+                    control.throttle(len(chunk))
+                f.write(chunk)
+                if callback:
+                    callback(len(chunk))
+        if control:
+            control.record_range(start)
+
+    def read_range(self, s3_key, etag, size, start, length):
+        """Return up to `length` bytes of the object version `etag` starting at `start`.
+
+        Reads go through the range cache in whole blocks; each run of
+        missing blocks is fetched with one ranged GET conditioned on the
+        ETag, so a ClientError (PreconditionFailed) means the object changed.
+        """
+        end = min(start + length, size)
+        if start >= end:
+            return b""
+        block_size = self.range_cache.block_size if self.range_cache else BLOCK_SIZE
+        first, last = start // block_size, (end - 1) // block_size
+        blocks = self.range_cache.get(s3_key, etag, first, last) if self.range_cache else {}
+        missing = [block for block in range(first, last + 1) if block not in blocks]
+        for _, group in itertools.groupby(enumerate(missing), lambda pair: pair[1] - pair[0]):
+            run = [block for _, block in group]
+            run_start, run_end = run[0] * block_size, min((run[-1] + 1) * block_size, size)
+            data = self.s3.get_object(Bucket=self.bucket, Key=s3_key, Range=f"bytes={run_start}-{run_end - 1}",
+                                      IfMatch=etag)["Body"].read()
+            for index, block in enumerate(run):
+                blocks[block] = data[index * block_size:(index + 1) * block_size]
+                if self.range_cache:
+                    self.range_cache.put(s3_key, etag, block, blocks[block])
+        data = b"".join(blocks[block] for block in range(first, last + 1))
+        offset = start - first * block_size
+        return data[offset:offset + end - start]
+
+    def read_decoded_prefix(self, s3_key, etag, size, encoding, length):
+        """Return (first `length` decoded bytes, whether that is the whole object) for a compressed object.
+
+        A compressed stream cannot be entered mid-way, so stored bytes are
+        read from the start, doubling the span until enough is decoded.
+        """
+        span = BLOCK_SIZE
+        while True:
+            data = b"".join(decompress_stream(encoding, [self.read_range(s3_key, etag, size, 0, span)]))
+            if len(data) >= length or span >= size:
+                return data[:length], span >= size and len(data) <= length
+            span *= 2
+
+    def download_objects(self, keys, folder, progress=None, control=None, skip=None):
+        """Download keys into `folder` with a bounded pool of workers.
+
+        Folder keys are expanded recursively and keep their layout below the
+        selected folder; plain keys land directly in `folder`. File and byte
+        progress is reported to an optional TransferProgress. `control` is
+        an optional folder job, as for upload_many, and `skip(key, size,
+        local path)` can leave out files, e.g. ones a resumed job already has.
+        Returns (downloaded (key, path) pairs, failed keys).
+        """
+        downloaded, failed = [], []
+        stopped = []
+
+        def collect(done):
+            for fut in done:
+                key, local_path, ok = fut.result()
+                if ok:
+                    downloaded.append((key, local_path))
+                elif ok is not None:  # None: stopped by `control`
+                    failed.append(key)
+
+        def run(key, local_path, size):
+            try:
+                if control:
+                    control.checkpoint()
+                return self._download_one(key, local_path, size, progress, control.for_file() if control else None)
+            except Exception as e:
+                if control is not None and control.stopping:
+                    stopped.append(e)
+                    return key, local_path, None
+                print("Download failed:", e)
+                if progress:
+                    progress.finish(key, False)
+                return key, local_path, False
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            pending = set()
+            for key, size, relative_path in self.iter_download_targets(keys):
+                if stopped:
+                    break
+                local_path = local_target(folder, relative_path)
+                if local_path is None:
+                    print(f"Skipping {key}: it would be written outside {folder}")
+                    failed.append(key)
+                    continue
+                if key.endswith("/"):
+                    os.makedirs(local_path, exist_ok=True)
+                    continue
+                if skip and skip(key, size, local_path):
+                    continue
+                if progress:
+                    progress.expect(size)
+                if len(pending) >= self.max_concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(run, key, local_path, size))
+            for fut in as_completed(pending):
+                collect([fut])
+        if stopped:
+            raise stopped[0]
+        return downloaded, failed
+
+    def _download_one(self, key, local_path, size, progress, control=None):
+        if progress is None:
+            return key, local_path, self.download_file(key, local_path, size, control=control)
+        if size is None:
+            head = self.head_object(key)
+            if head is None:
+                progress.start(key, 0)
+                progress.finish(key, False)
+                return key, local_path, False
+            size = head["ContentLength"]
+            progress.expect(size, files=0)
+        progress.start(key, size)
+        ok = self.download_file(key, local_path, size, progress.callback(key), control)
+        progress.finish(key, ok)
+        return key, local_path, ok
+
+    def iter_download_targets(self, keys):
+        """Yield (key, size or None, path relative to the download folder)"""
+        for key in keys:
+            if key.endswith("/"):
+                base = parent_prefix(key)
+                for page in self.iter_objects(key):
+                    for obj in page:
+                        yield obj["Key"], obj["Size"], obj["Key"][len(base):]
+            else:
+                yield key, None, os.path.basename(key)
+
+    def head_object(self, s3_key):
+        """Return object metadata including its stored checksum, or None if missing"""
         try:
-            delete_keys = [{"Key": key} for key in keys]
-            self.s3.delete_objects(Bucket=self.bucket, Delete={"Objects": delete_keys})
-            print(f"Deleted {len(keys)} objects from {self.bucket}")
+            return self.s3.head_object(Bucket=self.bucket, Key=s3_key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey"):
+                print("Head failed:", e)
+            return None
+
+    def matches_remote(self, local_path, s3_key, obj=None):
+        """True if the object at `s3_key` provably holds the same bytes as the local file.
+
+        Uses the stored ChecksumSHA256 (full, or multipart composite built
+        with our part size) and falls back to a plain MD5 ETag. Local
+        SHA256 checksums come from the hash cache when it is enabled.
+        """
+        head = self.head_object(s3_key)
+        if head is None:
+            return False
+        if stored_encoding(head):
+            return self._matches_original(local_path, head["Metadata"])
+        size = head["ContentLength"]
+        remote_sha = head.get("ChecksumSHA256")
+        etag = (obj or head).get("ETag", "").strip('"')
+        try:
+            if os.path.getsize(local_path) != size:
+                return False
+            if remote_sha and "-" in remote_sha:
+                part_size = self.part_size_for(size)
+                if self.hash_cache:
+                    _, composite = self.hash_cache.checksums(local_path, part_size)
+                else:
+                    _, composite = HashCache.compute(local_path, part_size)
+                return composite == remote_sha
+            if remote_sha:
+                if self.hash_cache:
+                    digest = self.hash_cache.sha256(local_path)
+                else:
+                    digest, _ = HashCache.compute(local_path, 1024 * 1024)
+                return base64.b64encode(digest).decode() == remote_sha
+            if etag and "-" not in etag:
+                md5 = hashlib.md5()
+                with open(local_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        md5.update(chunk)
+                return md5.hexdigest() == etag
+        except OSError:
+            pass
+        return False
+
+    def _matches_original(self, local_path, metadata):
+        """Compare a local file with the original size and SHA256 recorded on a compressed object."""
+        try:
+            if os.path.getsize(local_path) != int(metadata[META_ORIGINAL_SIZE]):
+                return False
+            if self.hash_cache:
+                digest = self.hash_cache.sha256(local_path)
+            else:
+                digest, _ = HashCache.compute(local_path, 1024 * 1024)
+        except (OSError, KeyError, ValueError):
+            return False
+        return base64.b64encode(digest).decode() == metadata.get(META_ORIGINAL_SHA256)
+
+    def may_be_compressed(self, local_path):
+        """True if uploading `local_path` now would compress it, so its stored size can differ."""
+        content_type = mimetypes.guess_type(local_path)[0] or "application/octet-stream"
+        return bool(self.compression) and is_compressible(local_path, content_type, MIN_COMPRESS_SIZE)
+
+    def iter_objects(self, prefix="", page_size=1000):
+        """Yield pages of object dicts for every key under a prefix (recursive).
+
+        A failed listing raises (ClientError or BotoCoreError) instead of
+        ending early, so callers never mistake a partial listing for the
+        whole prefix.
+        """
+        paginator = self.s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket,
+            Prefix=prefix,
+            PaginationConfig={"PageSize": page_size},
+        )
+        for response in pages:
+            yield response.get("Contents", [])
+
+    def expand_keys(self, keys, errors=None):
+        """Yield keys to act on, with folder keys expanded to everything under them.
+
+        A folder whose listing fails raises, or with an `errors` list is
+        recorded there as (folder key, error message) and skipped.
+        """
+        for key in keys:
+            if not key.endswith("/"):
+                yield key
+                continue
+            try:
+                for page in self.iter_objects(key):
+                    for obj in page:
+                        yield obj["Key"]
+            except (ClientError, BotoCoreError) as e:
+                if errors is None:
+                    raise
+                print(f"Error listing {key}:", e)
+                errors.append((key, str(e)))
+
+    def delete_objects(self, keys, on_progress=None, expand=True):
+        """Delete multiple objects, including the contents of folder keys.
+
+        Keys are streamed from the (paginated) folder expansion into batches
+        of 1000, and up to ``max_concurrency`` DeleteObjects calls run at
+        once. ``on_progress(finished, discovered)`` is called as batches
+        complete. With `expand` off, folder keys are deleted as plain
+        markers. A key reached through several selected folders is deleted
+        once; a folder that cannot be listed is reported as an error.
+        Returns (deleted keys, [(key, error message), ...]).
+        """
+        deleted, errors = [], []
+        discovered = 0
+        seen = set()
+
+        def collect(done):
+            for fut in done:
+                batch_deleted, batch_errors = fut.result()
+                deleted.extend(batch_deleted)
+                errors.extend(batch_errors)
+            if on_progress:
+                on_progress(len(deleted) + len(errors), discovered)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            pending = set()
+            batch = []
+
+            def submit(batch_keys):
+                nonlocal pending
+                if len(pending) >= self.max_concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(self._delete_batch, batch_keys))
+
+            for key in self.expand_keys(keys, errors) if expand else keys:
+                if key in seen:
+                    continue
+                seen.add(key)
+                batch.append(key)
+                if len(batch) == DELETE_BATCH_SIZE:
+                    discovered += len(batch)
+                    submit(batch)
+                    batch = []
+            if batch:
+                discovered += len(batch)
+                submit(batch)
+            for fut in as_completed(pending):
+                collect([fut])
+
+        for key in keys:
+            if key.endswith("/"):
+                self.listing_cache.invalidate_tree(key)
+        for key in deleted:
+            self.listing_cache.remove_key(key)
+        if self.inventory:
+            self.inventory.remove(deleted)
+        print(f"Deleted {len(deleted)} objects from {self.bucket} ({len(errors)} failed)")
+        return deleted, errors
+
+    def _delete_batch(self, keys):
+        """Send one DeleteObjects call and split the result into deleted and failed keys"""
+        try:
+            response = self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
         except ClientError as e:
             print("Deletion failed:", e)
+            return [], [(key, str(e)) for key in keys]
+        errors = [(err["Key"], f"{err.get('Code')}: {err.get('Message')}") for err in response.get("Errors", [])]
+        failed = {key for key, _ in errors}
+        return [key for key in keys if key not in failed], errors
+
+    def iter_copy_targets(self, keys, dest_prefix):
+        """Yield (source key, destination key, size or None) to copy `keys` into `dest_prefix`.
+
+        A folder key keeps its name and layout below `dest_prefix`, like an
+        upload of a local folder; plain keys land directly in it.
+        """
+        for key in keys:
+            base = parent_prefix(key)
+            if key.endswith("/"):
+                for page in self.iter_objects(key):
+                    for obj in page:
+                        yield obj["Key"], dest_prefix + obj["Key"][len(base):], obj["Size"]
+            else:
+                yield key, dest_prefix + key[len(base):], None
+
+    def iter_rename_targets(self, key, new_key):
+        """Yield (source key, destination key, size or None) to rename a key or a whole folder."""
+        if key.endswith("/"):
+            for page in self.iter_objects(key):
+                for obj in page:
+                    yield obj["Key"], new_key + obj["Key"][len(key):], obj["Size"]
+        else:
+            yield key, new_key, None
+
+    def copy_objects(self, targets, move=False, on_progress=None):
+        """Copy (source, destination, size) targets server-side; with `move`, delete the sources afterwards.
+
+        No object data passes through this machine. Up to
+        ``max_concurrency`` copies run at once, sources of a move are only
+        deleted once their copy succeeded, and they are deleted in batches.
+        ``on_progress(finished, discovered)`` is called as copies complete.
+        If listing the targets fails part-way, the copies already started
+        still finish (and their sources are still deleted on a move) and the
+        failure is reported against the last source listed.
+        Returns (copied (source, destination) pairs, [(source key, error message), ...]).
+        """
+        copied, errors = [], []
+        discovered = 0
+
+        def collect(done):
+            for fut in done:
+                source, destination, error = fut.result()
+                if error is not None:
+                    errors.append((source, error))
+                else:
+                    copied.append((source, destination))
+            if on_progress:
+                on_progress(len(copied) + len(errors), discovered)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            pending = set()
+            source = ""
+            try:
+                for source, destination, size in targets:
+                    if source == destination:
+                        continue
+                    discovered += 1
+                    if len(pending) >= self.max_concurrency * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(pool.submit(self._copy_one, source, destination, size))
+            except (ClientError, BotoCoreError) as e:
+                print("Listing copy targets failed:", e)
+                errors.append((source, f"listing stopped after this key: {e}"))
+            for fut in as_completed(pending):
+                collect([fut])
+
+        if move and copied:
+            # Delete exactly what was copied; expanding folder markers could remove uncopied objects
+            _, delete_errors = self.delete_objects([source for source, _ in copied], expand=False)
+            errors.extend(delete_errors)
+        print(f"{'Moved' if move else 'Copied'} {len(copied)} objects in {self.bucket} ({len(errors)} failed)")
+        return copied, errors
+
+    def _copy_one(self, source, destination, size):
+        try:
+            self.copy_object(source, destination, size)
+            return source, destination, None
+        except Exception as e:  # BotoCoreError and the like; anything raised here would abort the whole batch
+            print("Copy failed:", e)
+            return source, destination, str(e) or repr(e)
+
+    def copy_object(self, source, destination, size=None):
+        """Copy one object inside the bucket, keeping its metadata and encoding.
+
+        Objects up to 5 GB use a single CopyObject; larger ones are copied as
+        parallel UploadPartCopy ranges. Raises ClientError on failure.
+        """
+        copy_source = {"Bucket": self.bucket, "Key": source}
+        head = None
+        if size is None:
+            head = self.s3.head_object(Bucket=self.bucket, Key=source)
+            size = head["ContentLength"]
+        if size <= MAX_COPY_SIZE:
+            self.s3.copy_object(Bucket=self.bucket, Key=destination, CopySource=copy_source,
+                                MetadataDirective="COPY")
+        else:
+            self._copy_multipart(copy_source, destination, size, head)
+        self.listing_cache.add_key(destination)
+        if self.inventory:
+            self.inventory.put(destination, size)
+
+    def _copy_multipart(self, copy_source, destination, size, head=None, extra_args=None):
+        """Copy an object over 5 GB as concurrent UploadPartCopy ranges.
+
+        The copy gets `extra_args` as its content headers and metadata when
+        given, otherwise the source's (from `head`, fetched if not passed).
+        """
+        extra = extra_args
+        if extra is None:
+            head = head or self.s3.head_object(Bucket=self.bucket, Key=copy_source["Key"])
+            # A multipart upload does not inherit the source's headers, so carry them over
+            extra = {name: head[name] for name in ("ContentType", "ContentEncoding", "Metadata") if head.get(name)}
+        part_size = max(COPY_PART_SIZE, -(-size // MAX_PARTS))
+        upload_id = self.s3.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=destination,
+            ChecksumAlgorithm="SHA256",
+            **extra,
+        )["UploadId"]
+
+        def copy_part(part_number, start):
+            end = min(start + part_size, size) - 1
+            result = self.s3.upload_part_copy(
+                Bucket=self.bucket,
+                Key=destination,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                CopySource=copy_source,
+                CopySourceRange=f"bytes={start}-{end}",
+            )["CopyPartResult"]
+            part = {"PartNumber": part_number, "ETag": result["ETag"]}
+            if result.get("ChecksumSHA256"):
+                part["ChecksumSHA256"] = result["ChecksumSHA256"]
+            return part
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                futures = [pool.submit(copy_part, number, start)
+                           for number, start in enumerate(range(0, size, part_size), start=1)]
+                parts = [fut.result() for fut in futures]
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=destination,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=destination, UploadId=upload_id)
+            raise
 
     def create_folder(self, folder_name):
         """Create an empty folder"""
@@ -78,6 +1155,9 @@ class S3Manager:
             folder_name += "/"
         try:
             self.s3.put_object(Bucket=self.bucket, Key=folder_name)
+            self.listing_cache.add_key(folder_name)
+            if self.inventory:
+                self.inventory.put(folder_name, 0)
             print(f"Created folder {folder_name}")
         except ClientError as e:
             print("Folder creation failed:", e)
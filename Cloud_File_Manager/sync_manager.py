@@ -0,0 +1,153 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from botocore.exceptions import ClientError, BotoCoreError
+
+from local_index import iter_files
+from s3_manager import local_target
+
+# Local files at most this many seconds newer than the remote copy count as unchanged
+MTIME_TOLERANCE = 2
+
+SyncAction = namedtuple("SyncAction", "action path reason size", defaults=(0,))
+
+
+class SyncManager:
+    """Incremental sync between a local folder and an S3 prefix.
+
+    Files are compared by size first, then by modification time against
+    LastModified. Same-size files that look newer are confirmed against the
+    remote checksum (see S3Manager.matches_remote), so rebuilt-but-identical
+    files are not transferred again. Folders watched by the S3Manager's
+    LocalIndex are read from the index instead of being walked.
+    """
+
+    def __init__(self, s3_manager):
+        self.s3 = s3_manager
+
+    def diff(self, local_root, prefix, direction="upload", delete=False, checksum=False):
+        """Return the SyncActions needed to make the target match the source.
+
+        With `checksum` set, same-size files are always compared by content
+        instead of trusting modification times. A failed listing raises
+        (ClientError or BotoCoreError): planning against a partial remote
+        view would delete or re-transfer files that are in fact there.
+        """
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        local = {rel: (size, mtime) for rel, size, mtime in iter_files(local_root, self.s3.local_index)}
+        remote = {}
+        for page in self.s3.iter_objects(prefix):
+            for obj in page:
+                if obj["Key"].endswith("/"):
+                    continue
+                rel = obj["Key"][len(prefix):]
+                if direction == "download" and local_target(local_root, rel) is None:
+                    print(f"Skipping {obj['Key']}: it would be written outside {local_root}")
+                    continue
+                remote[rel] = obj
+
+        source, target = (local, remote) if direction == "upload" else (remote, local)
+        transfer = "upload" if direction == "upload" else "download"
+        actions, to_verify = [], []
+        for rel in sorted(source):
+            size = local[rel][0] if direction == "upload" else remote[rel]["Size"]
+            if rel not in target:
+                actions.append(SyncAction(transfer, rel, "new", size))
+                continue
+            local_size, local_mtime = local[rel]
+            obj = remote[rel]
+            if local_size != obj["Size"]:
+                # A compressed object's stored size never matches; compare its recorded original instead
+                if self.s3.may_be_compressed(rel):
+                    to_verify.append(rel)
+                else:
+                    actions.append(SyncAction(transfer, rel, "size changed", size))
+                continue
+            remote_mtime = obj["LastModified"].timestamp()
+            if direction == "upload":
+                newer = local_mtime > remote_mtime + MTIME_TOLERANCE
+            else:
+                newer = remote_mtime > local_mtime + MTIME_TOLERANCE
+            if checksum or newer:
+                to_verify.append(rel)
+
+        actions.extend(self._verify(local_root, prefix, remote, to_verify, transfer))
+
+        if delete:
+            removal = "delete-remote" if direction == "upload" else "delete-local"
+            actions.extend(SyncAction(removal, rel, "not in source") for rel in sorted(set(target) - set(source)))
+        return actions
+
+    def _verify(self, local_root, prefix, remote, paths, transfer):
+        """Compare checksums of same-size candidates in parallel"""
+        changed = []
+        with ThreadPoolExecutor(max_workers=self.s3.max_concurrency) as pool:
+            futures = {pool.submit(self.s3.matches_remote, os.path.join(local_root, *rel.split("/")),
+                                   prefix + rel, remote[rel]): rel for rel in paths}
+            for fut in as_completed(futures):
+                if not fut.result():
+                    rel = futures[fut]
+                    changed.append(SyncAction(transfer, rel, "content changed", remote[rel]["Size"]))
+        return sorted(changed)
+
+    def apply(self, actions, local_root, prefix, progress=None):
+        """Carry out a diff, reporting to an optional TransferProgress.
+
+        Returns (completed actions, failed actions).
+        """
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        completed, failed = [], []
+
+        def local_path(rel):
+            return os.path.join(local_root, *rel.split("/"))
+
+        def run(action):
+            callback = progress.callback(action.path) if progress else None
+            if progress:
+                progress.start(action.path, action.size)
+            if action.action == "upload":
+                return self.s3.upload_file(local_path(action.path), prefix + action.path, callback) is not None
+            if action.action == "download":
+                path = local_path(action.path)
+                if not self.s3.download_file(prefix + action.path, path, action.size, callback):
+                    return False
+                # Match the remote timestamp so the next diff sees the file as unchanged
+                head = self.s3.head_object(prefix + action.path)
+                if head:
+                    mtime = head["LastModified"].timestamp()
+                    os.utime(path, (mtime, mtime))
+                return True
+            os.remove(local_path(action.path))
+            return True
+
+        if progress:
+            for action in actions:
+                progress.expect(action.size)
+
+        transfers = [a for a in actions if a.action != "delete-remote"]
+        with ThreadPoolExecutor(max_workers=self.s3.max_concurrency) as pool:
+            futures = {pool.submit(run, action): action for action in transfers}
+            for fut in as_completed(futures):
+                try:
+                    ok = fut.result()
+                except (ClientError, BotoCoreError, OSError) as e:
+                    print("Sync action failed:", e)
+                    ok = False
+                (completed if ok else failed).append(futures[fut])
+                if progress:
+                    progress.finish(futures[fut].path, ok)
+
+        removals = [a for a in actions if a.action == "delete-remote"]
+        if removals:
+            _, errors = self.s3.delete_objects([prefix + a.path for a in removals])
+            failed_keys = {key for key, _ in errors}
+            for action in removals:
+                ok = prefix + action.path not in failed_keys
+                (completed if ok else failed).append(action)
+                if progress:
+                    progress.start(action.path, 0)
+                    progress.finish(action.path, ok)
+        return completed, failed
@@ -0,0 +1,68 @@
+import gzip
+import os
+
+import pytest
+
+import compression
+from compression import (META_ORIGINAL_SIZE, available_encoding, compress_stream, decompress_stream,
+                         is_compressible, stored_encoding)
+
+DATA = b"".join(b"line %d of a fairly repetitive log file\n" % n for n in range(20000))
+
+
+def chunks(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+def round_trip(encoding, data, chunk_size=7000):
+    compressed = b"".join(compress_stream(encoding, chunks(data, chunk_size)))
+    return compressed, b"".join(decompress_stream(encoding, chunks(compressed, chunk_size // 3)))
+
+
+def test_gzip_round_trip():
+    compressed, restored = round_trip("gzip", DATA)
+    assert restored == DATA
+    assert len(compressed) < len(DATA) // 5
+    assert gzip.decompress(compressed) == DATA  # a real gzip container, readable by any client
+
+
+def test_empty_round_trip():
+    assert round_trip("gzip", b"")[1] == b""
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    assert round_trip("zstd", DATA)[1] == DATA
+
+
+def test_corrupt_data_raises_oserror():
+    compressed = b"".join(compress_stream("gzip", [DATA]))
+    damaged = compressed[:20] + bytes(b ^ 0xFF for b in compressed[20:40]) + compressed[40:]
+    with pytest.raises(OSError):
+        b"".join(decompress_stream("gzip", [damaged]))
+
+
+def test_available_encoding(monkeypatch):
+    assert available_encoding(None) is None
+    assert available_encoding("gzip") == "gzip"
+    with pytest.raises(ValueError):
+        available_encoding("brotli")
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert available_encoding("zstd") == "gzip"
+
+
+def test_is_compressible():
+    big = compression.MIN_COMPRESS_SIZE
+    assert is_compressible("notes.txt", "text/plain", big)
+    assert is_compressible("data.json", "application/json", big)
+    assert is_compressible("app.log", "application/octet-stream", big)
+    assert not is_compressible("notes.txt", "text/plain", big - 1)
+    assert not is_compressible("photo.jpg", "image/jpeg", big)
+    assert not is_compressible("data.csv.gz", "text/csv", big)
+    assert not is_compressible(os.path.join("a", "dump.sql.zst"), "application/sql", big)
+
+
+def test_stored_encoding_needs_the_apps_metadata():
+    assert stored_encoding({"ContentEncoding": "gzip", "Metadata": {META_ORIGINAL_SIZE: "10"}}) == "gzip"
+    assert stored_encoding({"ContentEncoding": "gzip", "Metadata": {}}) is None
+    assert stored_encoding({"Metadata": {META_ORIGINAL_SIZE: "10"}}) is None
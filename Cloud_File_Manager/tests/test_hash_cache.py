@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import os
+
+from hash_cache import HashCache
+
+
+def make_cache(tmp_path):
+    return HashCache(str(tmp_path / "hashes.db"))
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_sha256_is_computed_once_for_an_unchanged_file(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    path = write(tmp_path / "a.bin", b"hello")
+    assert cache.get(path) is None
+    assert cache.sha256(path) == hashlib.sha256(b"hello").digest()
+
+    monkeypatch.setattr("builtins.open", None)  # a hit must not read the file
+    assert cache.sha256(path) == hashlib.sha256(b"hello").digest()
+
+
+def test_changed_file_is_a_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    path = write(tmp_path / "a.bin", b"hello")
+    cache.sha256(path)
+    write(tmp_path / "a.bin", b"hello, world")
+    assert cache.get(path) is None
+    assert cache.sha256(path) == hashlib.sha256(b"hello, world").digest()
+
+
+def test_touched_file_is_a_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    path = write(tmp_path / "a.bin", b"hello")
+    cache.sha256(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path) is None
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = write(tmp_path / "a.bin", b"hello")
+    cache = make_cache(tmp_path)
+    cache.sha256(path)
+    cache.close()
+    assert make_cache(tmp_path).get(path)[0] == hashlib.sha256(b"hello").digest()
+
+
+def test_compute_returns_full_and_composite_checksums(tmp_path):
+    data = b"a" * 10 + b"b" * 10 + b"c" * 5
+    path = write(tmp_path / "a.bin", data)
+    full, composite = HashCache.compute(path, 10)
+    parts = [data[:10], data[10:20], data[20:]]
+    combined = hashlib.sha256(b"".join(hashlib.sha256(part).digest() for part in parts)).digest()
+    assert full == hashlib.sha256(data).digest()
+    assert composite == f"{base64.b64encode(combined).decode()}-3"
+
+
+def test_checksums_recompute_for_another_part_size(tmp_path):
+    cache = make_cache(tmp_path)
+    path = write(tmp_path / "a.bin", b"x" * 25)
+    assert cache.checksums(path, 10)[1].endswith("-3")
+    assert cache.get(path)[1:] == (10, cache.checksums(path, 10)[1])
+    assert cache.checksums(path, 5)[1].endswith("-5")
+    assert cache.get(path)[1] == 5
@@ -0,0 +1,111 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+from inventory import BucketInventory
+
+KEYS = {
+    "logs/2024/app.log": 100,
+    "logs/2024/app_1.log": 200,
+    "logs/2025/App.LOG": 300,
+    "photos/cat.jpg": 5000,
+    "photos/dog.jpg": 7000,
+    "readme.md": 10,
+}
+
+
+class FakeS3Manager:
+    """Lists `keys` in pages of two, like S3Manager.iter_objects."""
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def iter_objects(self, prefix=""):
+        modified = datetime.datetime(2024, 6, 1, tzinfo=datetime.timezone.utc)
+        objects = [{"Key": key, "Size": size, "ETag": '"etag"', "LastModified": modified}
+                   for key, size in sorted(self.keys.items()) if key.startswith(prefix)]
+        for start in range(0, len(objects), 2):
+            yield objects[start:start + 2]
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    inventory = BucketInventory(str(tmp_path / "inventory.db"), bucket="bucket")
+    inventory.crawl(FakeS3Manager(KEYS))
+    yield inventory
+    inventory.close()
+
+
+def keys(rows):
+    return [row[0] for row in rows]
+
+
+def test_crawl_indexes_every_key(inventory):
+    assert inventory.count() == len(KEYS)
+    assert inventory.last_crawl("photos/") is not None
+
+
+def test_substring_search_is_case_insensitive(inventory):
+    assert keys(inventory.search("app.log")) == ["logs/2024/app.log", "logs/2025/App.LOG"]
+
+
+def test_substring_search_treats_wildcards_literally(inventory):
+    assert keys(inventory.search("app_")) == ["logs/2024/app_1.log"]
+    assert keys(inventory.search("%")) == []
+
+
+def test_prefix_search(inventory):
+    assert keys(inventory.search("photos/", mode="prefix")) == ["photos/cat.jpg", "photos/dog.jpg"]
+    assert keys(inventory.search("Photos/", mode="prefix")) == []
+
+
+def test_glob_search(inventory):
+    assert keys(inventory.search("logs/*/app*.log", mode="glob")) == ["logs/2024/app.log", "logs/2024/app_1.log"]
+    assert keys(inventory.search("*.jpg", mode="glob")) == ["photos/cat.jpg", "photos/dog.jpg"]
+
+
+def test_size_filters_and_limit(inventory):
+    assert keys(inventory.search(min_size=200, max_size=5000)) == [
+        "logs/2024/app_1.log", "logs/2025/App.LOG", "photos/cat.jpg"]
+    assert len(inventory.search(limit=2)) == 2
+
+
+def test_unknown_mode_is_refused(inventory):
+    with pytest.raises(ValueError):
+        inventory.search("x", mode="regex")
+
+
+def test_put_and_remove_keep_the_index_current(inventory):
+    inventory.put("photos/bird.jpg", 42)
+    assert keys(inventory.search("photos/", mode="prefix"))[0] == "photos/bird.jpg"
+    inventory.remove(["photos/bird.jpg", "readme.md"])
+    assert keys(inventory.search("bird")) == []
+    assert keys(inventory.search("readme")) == []
+
+
+def test_recrawl_of_a_prefix_sweeps_only_that_prefix(inventory):
+    remaining = {key: size for key, size in KEYS.items() if key != "photos/dog.jpg"}
+    remaining.pop("readme.md")  # outside the recrawled prefix, so its row must stay
+    assert inventory.crawl(FakeS3Manager(remaining), "photos/") == 1
+    assert keys(inventory.search("photos/", mode="prefix")) == ["photos/cat.jpg"]
+    assert keys(inventory.search("readme")) == ["readme.md"]
+
+
+def test_import_manifest_replaces_the_index(inventory, tmp_path):
+    data = b'"bucket","new%2Ffile.txt","12","2024-01-31T12:00:00.000Z"\n'
+    (tmp_path / "part-0.csv.gz").write_bytes(gzip.compress(data))
+    manifest = {"sourceBucket": "bucket", "destinationBucket": "arn:aws:s3:::reports",
+                "fileFormat": "CSV", "fileSchema": "Bucket, Key, Size, LastModifiedDate",
+                "files": [{"key": "reports/data/part-0.csv.gz"}]}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+    assert inventory.import_manifest(str(tmp_path / "manifest.json")) == 1
+    assert inventory.search() == [("new/file.txt", 12, None, 1706702400.0)]
+
+
+def test_manifest_for_another_bucket_is_refused(inventory, tmp_path):
+    (tmp_path / "manifest.json").write_text(json.dumps({"sourceBucket": "other", "files": []}))
+    with pytest.raises(ValueError):
+        inventory.import_manifest(str(tmp_path / "manifest.json"))
+    assert inventory.count() == len(KEYS)
@@ -0,0 +1,92 @@
+from listing_cache import ListingCache, parent_prefix
+
+
+def test_parent_prefix():
+    assert parent_prefix("a/b/c.txt") == "a/b/"
+    assert parent_prefix("a/b/") == "a/"
+    assert parent_prefix("a.txt") == ""
+    assert parent_prefix("a/") == ""
+
+
+def test_get_returns_sorted_listing():
+    cache = ListingCache()
+    cache.put("a/", {"a/z/", "a/b/"}, {"a/2.txt", "a/1.txt"})
+    assert cache.get("a/") == (["a/b/", "a/z/"], ["a/1.txt", "a/2.txt"])
+    assert cache.get("b/") is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = ListingCache(ttl=-1)
+    cache.put("a/", [], ["a/1.txt"])
+    assert cache.get("a/") is None
+    assert "a/" not in cache.entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ListingCache(max_entries=2)
+    cache.put("a/", [], [])
+    cache.put("b/", [], [])
+    cache.get("a/")
+    cache.put("c/", [], [])
+    assert cache.get("a/") is not None
+    assert cache.get("b/") is None
+    assert cache.get("c/") is not None
+
+
+def test_listing_started_before_a_mutation_is_not_stored():
+    cache = ListingCache()
+    stamp = cache.stamp()
+    cache.invalidate("a/")
+    cache.put("a/", [], ["a/old.txt"], stamp)
+    assert cache.get("a/") is None
+    cache.put("a/", [], ["a/new.txt"], cache.stamp())
+    assert cache.get("a/") == ([], ["a/new.txt"])
+
+
+def test_invalidate_tree_drops_prefix_and_descendants_only():
+    cache = ListingCache()
+    for prefix in ("", "a/", "a/b/", "a/b/c/", "ab/"):
+        cache.put(prefix, [], [])
+    cache.invalidate_tree("a/")
+    assert cache.get("a/") is None
+    assert cache.get("a/b/") is None
+    assert cache.get("a/b/c/") is None
+    assert cache.get("") is not None
+    assert cache.get("ab/") is not None
+
+
+def test_add_key_patches_parent_and_missing_folders():
+    cache = ListingCache()
+    cache.put("", [], [])
+    cache.put("a/b/", [], ["a/b/old.txt"])
+    cache.add_key("a/b/c/new.txt")
+    assert cache.get("") == (["a/"], [])
+    assert cache.get("a/b/") == (["a/b/c/"], ["a/b/old.txt"])
+    assert cache.get("a/b/c/") is None  # never listed, so nothing to patch
+
+
+def test_remove_key_keeps_a_folder_that_still_has_files():
+    cache = ListingCache()
+    cache.put("", ["a/"], [])
+    cache.put("a/", [], ["a/1.txt", "a/2.txt"])
+    cache.remove_key("a/1.txt")
+    assert cache.get("a/") == ([], ["a/2.txt"])
+    assert cache.get("") == (["a/"], [])
+
+
+def test_remove_key_drops_listings_of_an_emptied_folder():
+    cache = ListingCache()
+    cache.put("", ["a/"], [])
+    cache.put("a/", [], ["a/1.txt"])
+    cache.remove_key("a/1.txt")
+    assert cache.get("a/") is None
+    assert cache.get("") is None
+
+
+def test_remove_folder_marker_drops_its_parent_listing():
+    cache = ListingCache()
+    cache.put("a/", ["a/b/"], [])
+    cache.put("a/b/", [], ["a/b/1.txt"])
+    cache.remove_key("a/b/")
+    assert cache.get("a/") is None
+    assert cache.get("a/b/") == ([], ["a/b/1.txt"])
@@ -0,0 +1,529 @@
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from s3_manager import RESUME_SUFFIX
+from sync_manager import MTIME_TOLERANCE
+
+# Jobs running at once; each one still uses S3Manager's part/range concurrency
+TRANSFER_WORKERS = 4
+
+# Priority lanes, served strictly in this order
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# Seconds of traffic the bandwidth limit lets through in one burst
+BURST_SECONDS = 1.0
+
+JOURNAL_PATH = "transfers.db"
+
+STATUSES = ("running", "queued", "paused", "failed", "done", "cancelled")  # also the display order
+
+# A whole local folder or S3 folder queued as one job
+FOLDER_KINDS = ("upload-folder", "download-folder")
+
+
+class TransferPaused(Exception):
+    pass
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+class TokenBucket:
+    """Global bandwidth limit shared by every transfer.
+
+    consume() blocks until the caller may send `nbytes`. Tokens refill at
+    `rate` bytes per second up to BURST_SECONDS worth; a request larger than
+    the bucket is let through and paid back before the next one.
+    """
+
+    def __init__(self, rate=None):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Bytes per second, or None/0 for no limit."""
+        with self.lock:
+            self.rate = rate or None
+            self.tokens = min(self.tokens, self.rate * BURST_SECONDS) if self.rate else 0.0
+            self.updated = time.monotonic()
+
+    def consume(self, nbytes):
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.rate * BURST_SECONDS)
+                self.updated = now
+                if self.tokens >= 0:
+                    self.tokens -= nbytes
+                    return
+                wait = -self.tokens / self.rate
+            # Wake up regularly so a raised or removed limit applies quickly
+            time.sleep(min(wait, 0.25))
+
+
+class TransferJob:
+    """One queued upload or download, and the control handle S3Manager uses while running it.
+
+    `state` holds what is needed to resume (multipart upload id and sent
+    parts, or finished download ranges) and is journaled on every change.
+    A folder job streams its files through S3Manager.upload_many or
+    download_objects; its `state` only records when it first started, and
+    its size and file counts grow as the folder is walked.
+    """
+
+    def __init__(self, scheduler, job_id, kind, local_path, key, size, priority, status="queued", state=None):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.kind = kind
+        self.local_path = local_path
+        self.key = key
+        self.size = size or 0
+        self.priority = priority
+        self.status = status
+        self.state = state or {}
+        self.error = None
+        self.done_bytes = 0
+        self.counted_size = self.size  # size included in the scheduler's per-status totals
+        self.files = self.files_done = self.files_failed = 0  # folder jobs only
+        self.pause_requested = False
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_folder(self):
+        return self.kind in FOLDER_KINDS
+
+    @property
+    def stopping(self):
+        return self.cancelled or self.pause_requested
+
+    def for_file(self):
+        """Control handle for one file of a folder job."""
+        return FileControl(self)
+
+    # --- Called by S3Manager while the job runs ---
+    def checkpoint(self):
+        if self.cancelled:
+            raise TransferCancelled()
+        if self.pause_requested:
+            raise TransferPaused()
+
+    def throttle(self, nbytes):
+        self.scheduler.bandwidth.consume(nbytes)
+
+    def callback(self, bytes_amount):
+        with self.lock:
+            self.done_bytes += bytes_amount
+
+    def record_part(self, part):
+        with self.lock:
+            self.state.setdefault("parts", {})[str(part["PartNumber"])] = part
+        self.save()
+
+    def record_range(self, start):
+        with self.lock:
+            self.state.setdefault("ranges", []).append(start)
+        self.save()
+
+    def save(self):
+        self.scheduler._save(self)
+
+    @property
+    def percent(self):
+        return min(self.done_bytes / self.size * 100, 100) if self.size else (100 if self.status == "done" else 0)
+
+    def progress_text(self):
+        if not self.is_folder:
+            return f"{self.percent:.0f}%"
+        failed = f", {self.files_failed:,} failed" if self.files_failed else ""
+        return f"{self.percent:.0f}% ({self.files_done:,}/{self.files:,} files{failed})"
+
+
+class FileControl:
+    """Control handle for one file of a folder job.
+
+    Pause, cancel and the bandwidth limit come from the folder job. Parts
+    and ranges are not journaled per file, so a file stopped half-way is
+    cleaned up like a cancelled one and sent again when the job resumes.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.state = {}
+
+    @property
+    def cancelled(self):
+        return self.job.stopping
+
+    def checkpoint(self):
+        self.job.checkpoint()
+
+    def throttle(self, nbytes):
+        self.job.throttle(nbytes)
+
+    def record_part(self, part):
+        self.state.setdefault("parts", {})[str(part["PartNumber"])] = part
+
+    def record_range(self, start):
+        self.state.setdefault("ranges", []).append(start)
+
+    def save(self):
+        pass
+
+
+class FolderProgress:
+    """TransferProgress-style sink that adds up a folder job's files and bytes."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def expect(self, size, files=1):
+        with self.job.lock:
+            self.job.size += size or 0
+            self.job.files += files
+
+    def start(self, name, size):
+        pass
+
+    def callback(self, name):
+        return self.job.callback
+
+    def finish(self, name, ok=True):
+        with self.job.lock:
+            if ok:
+                self.job.files_done += 1
+            else:
+                self.job.files_failed += 1
+
+
+class TransferScheduler:
+    """Persistent queue of uploads and downloads built on S3Manager.
+
+    Jobs are journaled in SQLite, so queued and interrupted transfers are
+    picked up again when the app restarts. Workers take jobs from priority
+    lanes (high, normal, low; oldest first within a lane). Jobs can be
+    paused, resumed and cancelled individually; a paused or failed job keeps
+    its multipart upload or partial download and continues from there.
+    A selected folder is one job, so queueing it costs one journal row and
+    its files stream through S3Manager's bounded pipelines; a resumed
+    folder job skips files it already transferred. Counts and bytes per
+    status are kept as running totals, so summary() does not scan the jobs.
+    All jobs share one token-bucket bandwidth limit.
+    """
+
+    def __init__(self, s3_manager, journal_path=JOURNAL_PATH, workers=TRANSFER_WORKERS, bandwidth=None,
+                 on_change=None):
+        self.s3 = s3_manager
+        self.bandwidth = TokenBucket(bandwidth)
+        self.on_change = on_change  # called with a job (on a worker thread) when its status changes
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(journal_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY, kind TEXT, local_path TEXT, key TEXT, size INTEGER,"
+            " priority TEXT, status TEXT, state TEXT, created REAL)"
+        )
+        self.conn.commit()
+
+        self.cond = threading.Condition()
+        self.lanes = []  # heap of (priority rank, sequence, job id)
+        self.sequence = itertools.count()
+        self.jobs = {}  # job id -> TransferJob
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.status_bytes = dict.fromkeys(STATUSES, 0)  # sizes of jobs per status, as of their last change
+        self.running = set()
+        self._load()
+        for _ in range(max(1, workers)):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    # --- Adding jobs ---
+    def add_upload(self, local_path, key, size=None, priority="normal"):
+        return self._add("upload", local_path, key, size, priority)
+
+    def add_download(self, key, local_path, size=None, priority="normal"):
+        return self._add("download", local_path, key, size, priority)
+
+    def add_folder_upload(self, folder, prefix, priority="normal"):
+        """Queue a local folder to be uploaded (keeping its name) below `prefix`, as one job."""
+        return self._add("upload-folder", folder, prefix, 0, priority)
+
+    def add_folder_download(self, key, folder, priority="normal"):
+        """Queue an S3 folder key to be downloaded (keeping its name) into `folder`, as one job."""
+        return self._add("download-folder", folder, key, 0, priority)
+
+    def _add(self, kind, local_path, key, size, priority):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        with self.db_lock:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (kind, local_path, key, size, priority, status, state, created)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', '{}', ?)",
+                (kind, local_path, key, size or 0, priority, time.time()),
+            )
+            self.conn.commit()
+        job = TransferJob(self, cursor.lastrowid, kind, local_path, key, size, priority)
+        with self.cond:
+            self._track(job)
+            self._push(job)
+        return job
+
+    def _load(self):
+        """Re-queue unfinished jobs from the journal; jobs cut off mid-transfer resume."""
+        with self.db_lock:
+            self.conn.execute("DELETE FROM jobs WHERE status IN ('done', 'cancelled')")
+            self.conn.commit()
+            rows = self.conn.execute(
+                "SELECT id, kind, local_path, key, size, priority, status, state FROM jobs ORDER BY id"
+            ).fetchall()
+        for job_id, kind, local_path, key, size, priority, status, state in rows:
+            status = "queued" if status == "running" else status
+            job = TransferJob(self, job_id, kind, local_path, key, size, priority, status, json.loads(state))
+            with self.cond:
+                self._track(job)
+                if status == "queued":
+                    self._push(job)
+
+    # --- Controlling jobs ---
+    def pause(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return
+            job.pause_requested = True
+            if job.status == "queued":
+                self._set_status(job, "paused")  # its lane entry is skipped when popped
+        self._changed(job)
+
+    def resume(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            if job.status == "running":
+                # Withdraw a pause the worker has not acted on yet; if it already
+                # stopped, the worker sees the cleared request and queues the job again
+                job.pause_requested = False
+                return
+            if job.status not in ("paused", "failed"):
+                return
+            job.pause_requested = False
+            self._set_status(job, "queued")
+            job.error = None
+            self._push(job)
+        self._changed(job)
+
+    def cancel(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in ("done", "cancelled"):
+                return
+            job.cancelled = True
+            if job.status == "running":
+                return  # the worker cleans up when the transfer stops
+            self._set_status(job, "cancelled")
+        self._discard(job)
+        self._changed(job)
+
+    def set_priority(self, job_id, priority):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.priority = priority
+            if job.status == "queued":
+                self._push(job)  # the old lane entry is skipped as stale
+        job.save()
+
+    def set_bandwidth(self, rate):
+        """Limit all transfers together to `rate` bytes per second (None for unlimited)."""
+        self.bandwidth.set_rate(rate)
+
+    def clear_finished(self):
+        with self.cond:
+            for job_id in [i for i, job in self.jobs.items() if job.status in ("done", "cancelled")]:
+                job = self.jobs.pop(job_id)
+                self.counts[job.status] -= 1
+                self.status_bytes[job.status] -= job.counted_size
+        with self.db_lock:
+            self.conn.execute("DELETE FROM jobs WHERE status IN ('done', 'cancelled')")
+            self.conn.commit()
+
+    def snapshot(self, limit=None):
+        """Up to `limit` jobs for display: running first, then queued, paused, failed, done and cancelled."""
+        order = {status: rank for rank, status in enumerate(STATUSES)}
+        with self.cond:
+            jobs = list(self.jobs.values())
+        return heapq.nsmallest(limit or len(jobs), jobs, key=lambda job: (order[job.status], job.id))
+
+    def summary(self):
+        """Counts per status plus (done bytes, total bytes) of jobs not cancelled.
+
+        Built from the running totals plus the live progress of running jobs.
+        """
+        with self.cond:
+            counts = dict(self.counts)
+            live = [(job.size, job.done_bytes) for job in self.running]
+            settled = sum(size for status, size in self.status_bytes.items() if status not in ("running", "cancelled"))
+            finished = self.status_bytes["done"]
+        total_bytes = settled + sum(size for size, _ in live)
+        done_bytes = finished + sum(min(done, size) for size, done in live)
+        return counts, done_bytes, total_bytes
+
+    # --- Workers ---
+    def _track(self, job):
+        """Add a new or loaded job to the totals. Call with the condition held."""
+        self.jobs[job.id] = job
+        self.counts[job.status] += 1
+        job.counted_size = job.size
+        self.status_bytes[job.status] += job.size
+
+    def _set_status(self, job, status):
+        """Move a job to `status`, keeping the totals current. Call with the condition held."""
+        self.counts[job.status] -= 1
+        self.status_bytes[job.status] -= job.counted_size
+        job.status = status
+        job.counted_size = job.size
+        self.counts[status] += 1
+        self.status_bytes[status] += job.size
+        if status == "running":
+            self.running.add(job)
+        else:
+            self.running.discard(job)
+
+    def _push(self, job):
+        heapq.heappush(self.lanes, (PRIORITIES[job.priority], next(self.sequence), job.id))
+        self.cond.notify()
+
+    def _next_job(self):
+        with self.cond:
+            while True:
+                while not self.lanes:
+                    self.cond.wait()
+                rank, _, job_id = heapq.heappop(self.lanes)
+                job = self.jobs.get(job_id)
+                # Skip entries left behind by pause, cancel or a priority change
+                if job and job.status == "queued" and rank == PRIORITIES[job.priority]:
+                    job.done_bytes = 0
+                    if job.is_folder:
+                        job.size = job.files = job.files_done = job.files_failed = 0
+                    self._set_status(job, "running")
+                    return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            self._changed(job)
+            try:
+                if job.is_folder:
+                    ok = self._run_folder(job)
+                elif job.kind == "upload":
+                    ok = self.s3.upload_file(job.local_path, job.key, job.callback, control=job) is not None
+                else:
+                    ok = self.s3.download_file(job.key, job.local_path, job.size or None, job.callback, control=job)
+                status = "done" if ok else "failed"
+            except TransferPaused:
+                status = "paused"
+            except TransferCancelled:
+                status = "cancelled"
+            except Exception as e:  # keep the worker alive; the job can be resumed
+                print("Transfer failed:", e)
+                job.error = str(e)
+                status = "failed"
+            with self.cond:
+                if job.cancelled and status != "done":
+                    status = "cancelled"
+                elif status == "paused" and not job.pause_requested:
+                    status = "queued"  # resumed before the pause took effect
+                self._set_status(job, status)
+                if status == "queued":
+                    self._push(job)
+            if job.status == "cancelled":
+                self._discard(job)
+            self._changed(job)
+
+    def _run_folder(self, job):
+        """Transfer a folder job's files; returns True if every file made it."""
+        started = job.state.get("started")
+        if started is None:
+            job.state["started"] = time.time()
+            job.save()
+        progress = FolderProgress(job)
+        if job.kind == "upload-folder":
+            targets = self.s3.iter_upload_targets([job.local_path], job.key)
+            if started:
+                targets = self._not_uploaded_since(job, targets, started)
+            _, failed = self.s3.upload_many(targets, progress, control=job)
+        else:
+            skip = None
+            if started:
+                def skip(key, size, local_path):
+                    return _written_since(local_path, size, started)
+            _, failed = self.s3.download_objects([job.key], job.local_path, progress, control=job, skip=skip)
+        if failed:
+            job.error = f"{len(failed):,} file(s) failed"
+        return not failed
+
+    def _not_uploaded_since(self, job, targets, started):
+        """Drop upload targets that an earlier run of `job` already put in the bucket unchanged."""
+        base = f"{job.key}{os.path.basename(os.path.normpath(job.local_path))}/"
+        remote = {obj["Key"]: (obj["Size"], obj["LastModified"].timestamp())
+                  for page in self.s3.iter_objects(base) for obj in page}
+        for local_path, key, size in targets:
+            if key in remote:
+                remote_size, uploaded = remote[key]
+                if (uploaded >= started - MTIME_TOLERANCE
+                        and os.path.getmtime(local_path) <= uploaded + MTIME_TOLERANCE
+                        and (remote_size == size or self.s3.may_be_compressed(local_path))):
+                    continue
+            yield local_path, key, size
+
+    def _discard(self, job):
+        """Drop what a cancelled job left behind: an open multipart upload or a partial file."""
+        upload_id = job.state.get("upload_id")
+        if job.kind == "upload" and upload_id:
+            try:
+                self.s3.s3.abort_multipart_upload(Bucket=self.s3.bucket, Key=job.key, UploadId=upload_id)
+            except ClientError:
+                pass
+        elif job.kind == "download" and os.path.exists(job.local_path + RESUME_SUFFIX):
+            os.remove(job.local_path + RESUME_SUFFIX)
+        job.state.clear()
+
+    def _changed(self, job):
+        job.save()
+        if self.on_change:
+            self.on_change(job)
+
+    def _save(self, job):
+        with job.lock:
+            state = json.dumps(job.state)
+        with self.db_lock:
+            self.conn.execute("UPDATE jobs SET status = ?, priority = ?, state = ? WHERE id = ?",
+                              (job.status, job.priority, state, job.id))
+            self.conn.commit()
+
+
+def _written_since(path, size, started):
+    """True if a local file has the expected size and was written after `started`."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    return info.st_size == size and info.st_mtime >= started - MTIME_TOLERANCE
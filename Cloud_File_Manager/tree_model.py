@@ -0,0 +1,207 @@
+import tkinter as tk
+
+# Rows of one node's children inserted into the Treeview at a time
+CHUNK_SIZE = 500
+
+
+class _NodeState:
+    def __init__(self, chunk_size):
+        self.entries = []        # (text, value, is_folder) for every known child
+        self.view = []           # entries that pass the current filter
+        self.limit = chunk_size  # how many rows of `view` to materialize
+        self.rows = []           # materialized item ids, in view order
+        self.more = None         # "... N more" row while part of `view` is hidden
+        self.status = None       # "Loading..." row while a listing runs
+        self.error = None        # row explaining why the last listing stopped early
+
+
+class LazyTreeModel:
+    """Chunked, filterable view of large listings in a ttk.Treeview.
+
+    Full listings are kept in plain lists; only a window of each node's
+    children is inserted into the widget. The window grows by CHUNK_SIZE
+    rows when its "... N more" row scrolls into view or is double-clicked.
+    Rows carry their path or key as values[0], like the rest of the app.
+    """
+
+    def __init__(self, tree, chunk_size=CHUNK_SIZE):
+        self.tree = tree
+        self.chunk_size = chunk_size
+        self.states = {}  # parent item -> _NodeState
+        self.items = {}   # value -> item id of its materialized row
+        self.filter_text = ""
+        tree.bind("<Double-1>", self._on_double_click, add="+")
+
+    # --- Listing lifecycle ---
+    def begin(self, node):
+        """Start a fresh listing under `node`, dropping its current children."""
+        self.tree.delete(*self.tree.get_children(node))
+        state = self.states[node] = _NodeState(self.chunk_size)
+        state.status = self.tree.insert(node, tk.END, text="Loading...")
+
+    def add(self, node, entries):
+        """Append a page of (text, value, is_folder) entries to a listing."""
+        state = self.states.get(node)
+        if state is None:
+            return
+        state.entries.extend(entries)
+        matched = [entry for entry in entries if self._matches(entry)]
+        state.view.extend(matched)
+        for entry in matched:
+            if len(state.rows) >= state.limit:
+                break
+            state.rows.append(self._insert_row(node, len(state.rows), entry))
+        self._update_tail(node, state)
+
+    def finish(self, node, error=None):
+        """Close a listing: drop its status row and sort folders first.
+
+        With `error`, the entries read so far stay and a row below them says
+        the listing failed.
+        """
+        state = self.states.get(node)
+        if state is None:
+            return
+        if state.status and self.tree.exists(state.status):
+            self.tree.delete(state.status)
+        state.status = None
+        self.replace(node, state.entries)
+        if error:
+            state.error = self.tree.insert(node, tk.END, text=f"\u26a0 Listing failed: {error}")
+
+    def replace(self, node, entries):
+        """Swap in a complete listing, patching rows in place so open folders stay open."""
+        state = self.states.get(node)
+        if state is None:
+            state = self.states[node] = _NodeState(self.chunk_size)
+            state.rows = [item for item in self.tree.get_children(node) if self.tree.item(item, "values")]
+            self.tree.delete(*[item for item in self.tree.get_children(node) if item not in state.rows])
+            for item in state.rows:
+                self.items[str(self.tree.item(item, "values")[0])] = item
+        if state.error and self.tree.exists(state.error):
+            self.tree.delete(state.error)
+        state.error = None
+        state.entries = sorted(entries, key=lambda entry: (not entry[2], entry[0].lower()))
+        state.view = [entry for entry in state.entries if self._matches(entry) or self._is_open(entry)]
+        self._render(node, state)
+
+    def reset(self, node):
+        """Forget a node's listing so it is read again when next opened."""
+        self.states.pop(node, None)
+        self.tree.delete(*self.tree.get_children(node))
+        self.tree.insert(node, tk.END, text="Loading...")
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.states.clear()
+        self.items.clear()
+
+    def count(self, node):
+        state = self.states.get(node)
+        return len(state.entries) if state else 0
+
+    # --- Windowing and filtering ---
+    def show_more(self, node):
+        state = self.states.get(node)
+        if state is None:
+            return
+        state.limit += self.chunk_size
+        for entry in state.view[len(state.rows):state.limit]:
+            state.rows.append(self._insert_row(node, len(state.rows), entry))
+        self._update_tail(node, state)
+
+    def load_visible(self):
+        """Grow the window of every node whose "... N more" row is on screen."""
+        for node, state in list(self.states.items()):
+            if state.more and self.tree.exists(state.more) and self.tree.bbox(state.more):
+                self.show_more(node)
+
+    def set_filter(self, text):
+        """Show only entries whose name contains `text` (case-insensitive).
+
+        Narrowing an existing filter only rescans the entries that already
+        matched. Open folders stay visible so their contents can be filtered too.
+        """
+        text = text.strip().lower()
+        narrowing = text.startswith(self.filter_text)
+        self.filter_text = text
+        for node, state in list(self.states.items()):
+            if node and not self.tree.exists(node):
+                del self.states[node]
+                continue
+            source = state.view if narrowing else state.entries
+            state.view = [entry for entry in source if self._matches(entry) or self._is_open(entry)]
+            state.limit = self.chunk_size
+            self._render(node, state)
+
+    def item_for(self, value):
+        """Return the materialized row for a path or key, or None."""
+        item = self.items.get(value)
+        if item and self.tree.exists(item):
+            return item
+        self.items.pop(value, None)
+        return None
+
+    # --- Internals ---
+    def _matches(self, entry):
+        return not self.filter_text or self.filter_text in entry[0].lower()
+
+    def _is_open(self, entry):
+        if not entry[2]:
+            return False
+        item = self.item_for(entry[1])
+        return bool(item and self.tree.item(item, "open"))
+
+    def _insert_row(self, node, index, entry):
+        text, value, is_folder = entry
+        item = self.tree.insert(node, index, text=text, values=[value])
+        if is_folder:
+            self.tree.insert(item, tk.END, text="Loading...")
+        self.items[value] = item
+        return item
+
+    def _render(self, node, state):
+        window = state.view[:state.limit]
+        wanted = {entry[1] for entry in window}
+        for item in state.rows:
+            if not self.tree.exists(item):
+                continue
+            value = str(self.tree.item(item, "values")[0])  # Tk may hand back numbers
+            if value not in wanted:
+                self.tree.delete(item)
+                self.items.pop(value, None)
+                self.states.pop(item, None)
+        rows = []
+        for index, entry in enumerate(window):
+            item = self.item_for(entry[1])
+            if item and self.tree.parent(item) == node:
+                self.tree.move(item, node, index)
+            else:
+                item = self._insert_row(node, index, entry)
+            rows.append(item)
+        state.rows = rows
+        self._update_tail(node, state)
+
+    def _update_tail(self, node, state):
+        remaining = len(state.view) - len(state.rows)
+        if remaining > 0:
+            text = f"... {remaining:,} more (scroll down or double-click)"
+            if state.more and self.tree.exists(state.more):
+                self.tree.item(state.more, text=text)
+                self.tree.move(state.more, node, tk.END)
+            else:
+                state.more = self.tree.insert(node, tk.END, text=text)
+        elif state.more:
+            if self.tree.exists(state.more):
+                self.tree.delete(state.more)
+            state.more = None
+        if state.status and self.tree.exists(state.status):
+            self.tree.item(state.status, text=f"Loading... ({len(state.entries):,} items)")
+            self.tree.move(state.status, node, tk.END)
+
+    def _on_double_click(self, event):
+        item = self.tree.identify_row(event.y)
+        node = self.tree.parent(item) if item else None
+        state = self.states.get(node)
+        if state and item == state.more:
+            self.show_more(node)
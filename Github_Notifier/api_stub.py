@@ -0,0 +1,189 @@
+"""Local stand-in for the parts of the GitHub API the notifier uses.
+
+Serves the repo hooks endpoints and the repo/org events feeds with ETags,
+304s, X-Poll-Interval and rate-limit headers, so GitHubClient and
+EventPoller can be exercised without a token or network:
+
+    stub = GitHubAPIStub().start()
+    client = GitHubClient("", base_url=stub.url)
+
+Run this file to register and remove hooks on many repos and poll their
+events against a fresh stub.
+"""
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_RATE_LIMIT = 5000     # Requests per window, like an authenticated token
+STUB_POLL_INTERVAL = 60    # X-Poll-Interval sent with events responses
+
+HOOKS_PATH = re.compile(r"^/repos/([^/]+/[^/]+)/hooks(?:/(\d+))?$")
+EVENTS_PATH = re.compile(r"^/(?:repos/([^/]+/[^/]+)|orgs/([^/]+))/events$")
+
+
+class GitHubAPIStub:
+    """Threaded HTTP server holding hooks and events in memory.
+
+    `faults` is a list of (method, status) or (method, status, headers)
+    answered instead of the next matching request, e.g. ("GET", 429,
+    {"Retry-After": "1"}); a faulted POST still creates its hook, like a
+    response lost after GitHub acted on it. `requests` counts requests by
+    method for checks.
+    """
+
+    def __init__(self, port=0, poll_interval=STUB_POLL_INTERVAL, rate_limit=STUB_RATE_LIMIT):
+        self.poll_interval = poll_interval
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.lock = threading.Lock()
+        self.hooks = {}   # repo -> {hook id: hook}
+        self.events = {}  # "owner/repo" or "org:name" -> events, newest first
+        self.ids = itertools.count(1)
+        self.faults = []
+        self.requests = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the pooled client expects
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def do_DELETE(self):
+                stub._handle(self, "DELETE")
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 128  # room for every worker of a concurrent register/remove
+
+        self.server = Server(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_event(self, source, event_type, payload, actor="stub-user"):
+        """Publish an event on a feed ("owner/repo" or "org:name") and return its id."""
+        with self.lock:
+            event_id = str(next(self.ids))
+            repo = source if "/" in source else f"{source[4:]}/unknown"
+            created = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.events.setdefault(source, []).insert(0, {
+                "id": event_id, "type": event_type, "actor": {"login": actor},
+                "repo": {"name": repo}, "payload": payload, "created_at": created,
+            })
+        return event_id
+
+    # --- Request handling ---
+    def _handle(self, handler, method):
+        path = handler.path.split("?", 1)[0]
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"null") if length else None
+        with self.lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            fault = next((f for f in self.faults if f[0] == method), None)
+            if fault:
+                self.faults.remove(fault)
+            status, payload, headers = self._route(method, path, body, handler.headers.get("If-None-Match"))
+            if status != 304:
+                self.remaining = max(0, self.remaining - 1)
+            headers.update({"X-RateLimit-Limit": str(self.rate_limit),
+                            "X-RateLimit-Remaining": str(self.remaining),
+                            "X-RateLimit-Reset": str(int(time.time()) + 3600)})
+        if fault:
+            status, payload = fault[1], {"message": "Stub fault"}
+            headers.update(fault[2] if len(fault) > 2 else {})
+        self._send(handler, status, payload, headers)
+
+    def _route(self, method, path, body, if_none_match=None):
+        """Call with the lock held; returns (status, JSON payload or None, headers)."""
+        match = HOOKS_PATH.match(path)
+        if match:
+            repo, hook_id = match.group(1), match.group(2)
+            hooks = self.hooks.setdefault(repo, {})
+            if method == "GET" and hook_id is None:
+                return self._conditional(list(hooks.values()), {}, if_none_match)
+            if method == "POST" and hook_id is None:
+                hook = {"id": next(self.ids), "name": "web", "active": True,
+                        "events": body.get("events", []), "config": body.get("config", {})}
+                hooks[hook["id"]] = hook
+                return 201, hook, {}
+            if method == "DELETE" and hook_id is not None:
+                return (204, None, {}) if hooks.pop(int(hook_id), None) else (404, {"message": "Not Found"}, {})
+            return 405, {"message": "Method Not Allowed"}, {}
+        match = EVENTS_PATH.match(path)
+        if match and method == "GET":
+            source = match.group(1) or f"org:{match.group(2)}"
+            return self._conditional(self.events.get(source, []), {"X-Poll-Interval": str(self.poll_interval)},
+                                     if_none_match)
+        return 404, {"message": "Not Found"}, {}
+
+    @staticmethod
+    def _conditional(payload, headers, if_none_match):
+        etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        headers["ETag"] = etag
+        if if_none_match == etag:
+            return 304, None, headers
+        return 200, payload, headers
+
+    @staticmethod
+    def _send(handler, status, payload, headers):
+        data = json.dumps(payload).encode() if payload is not None and status != 304 else b""
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        if data:
+            handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+if __name__ == "__main__":
+    from github_api import GitHubClient
+    from poller import EventPoller
+
+    repos = [f"stub-owner/repo-{n}" for n in range(150)]
+    stub = GitHubAPIStub(poll_interval=1).start()
+    client = GitHubClient("", base_url=stub.url)
+
+    started = time.monotonic()
+    hook_ids, errors = client.register_hooks(repos, "https://example.invalid/github-webhook", "secret")
+    print(f"Registered {len(hook_ids)} hooks ({len(errors)} failed) in {time.monotonic() - started:.2f}s")
+    stub.faults.append(("POST", 502))
+    client.ensure_hook("stub-owner/extra", "https://example.invalid/github-webhook", "secret")
+    print(f"Create answered 502 but made the hook; retry found it: {len(stub.hooks['stub-owner/extra']) == 1}")
+
+    delivered = []
+    poller = EventPoller(client, repos[:20], lambda event, delivery, body: delivered.append(delivery))
+    for source in poller.sources:
+        source.interval = stub.poll_interval  # every second instead of the default minute
+    poller.start()
+    time.sleep(2)
+    stub.add_event(repos[0], "PushEvent", {"ref": "refs/heads/main", "commits": []})
+    time.sleep(3)
+    poller.stop()
+    print(f"Polling delivered {delivered}; rate limit left {stub.remaining} of {stub.rate_limit}")
+
+    started = time.monotonic()
+    errors = client.remove_hooks(hook_ids)
+    print(f"Removed {len(hook_ids) - len(errors)} hooks in {time.monotonic() - started:.2f}s")
+    stub.stop()
@@ -0,0 +1,152 @@
+import threading
+import time
+
+COALESCE_WINDOW = 10       # Seconds pushes to the same repo and branch are collected into one notification
+NOTIFY_RATE = 6            # Notifications (wscript processes) allowed per minute, across all repos
+NOTIFY_BURST = 3           # Notifications that may be shown back to back after a quiet period
+OVERFLOW_GROUPS = 5        # When more groups than this are waiting for the limit, they are shown as one
+LISTED_COMMITS = 10        # Commit messages kept per notification
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` actions on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate_per_minute=NOTIFY_RATE, burst=NOTIFY_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self):
+        """Seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class PushGroup:
+    def __init__(self, repo, branch, due):
+        self.repo = repo
+        self.branch = branch
+        self.due = due
+        self.pushes = 0
+        self.commits = 0
+        self.authors = set()
+        self.pushers = set()
+        self.messages = []
+
+    def add(self, pusher, commits):
+        self.pushes += 1
+        self.commits += len(commits)
+        self.pushers.add(pusher)
+        for commit in commits:
+            self.authors.add(commit.get('author', {}).get('name') or pusher)
+            self.messages.append(commit.get('message', '').strip())
+        del self.messages[:-LISTED_COMMITS]
+
+    def notification(self):
+        title = f"GitHub: {self.repo} ({self.branch})"
+        lines = "\n".join(f"- {message}" for message in self.messages)
+        if self.pushes == 1:
+            return title, f"Pusher: {', '.join(self.pushers)}\nCommits:\n{lines}"
+        summary = (f"{self.pushes} pushes, {self.commits} commits by {len(self.authors or self.pushers)} "
+                   f"author{'s' if len(self.authors or self.pushers) != 1 else ''}")
+        latest = "Latest commits" if self.commits > len(self.messages) else "Commits"
+        return title, f"{summary}\n{latest}:\n{lines}"
+
+
+class NotificationCoalescer:
+    """Merges push notifications per repo and branch and caps how many are shown.
+
+    The first push to a repo/branch opens a group that collects further
+    pushes for COALESCE_WINDOW seconds and is then shown as one summary.
+    Shown notifications share one token bucket; groups that are due while
+    it is empty keep absorbing pushes, and when more than OVERFLOW_GROUPS
+    are waiting they are merged into a single overview. However fast pushes
+    arrive, at most NOTIFY_RATE processes are started per minute.
+    """
+
+    def __init__(self, notify, window=COALESCE_WINDOW, bucket=None):
+        self.notify = notify  # notify(title, message), e.g. show_vbs_notification
+        self.window = window
+        self.bucket = bucket or TokenBucket()
+        self.groups = {}  # (repo, branch) -> PushGroup
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def add(self, repo, branch, pusher, commits):
+        with self.cond:
+            key = (repo, branch)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = PushGroup(repo, branch, time.monotonic() + self.window)
+                self.cond.notify()
+            group.add(pusher, commits)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def flush(self):
+        """Show every waiting group now, ignoring its window and the rate limit.
+
+        Deliveries are marked done once their push joins a group, so this
+        runs on shutdown to keep queued pushes from being dropped unseen.
+        """
+        with self.cond:
+            groups = sorted(self.groups.values(), key=lambda g: g.due)
+            self.groups.clear()
+        if len(groups) > OVERFLOW_GROUPS:
+            self.notify(*self._overview(groups))
+        else:
+            for group in groups:
+                self.notify(*group.notification())
+        return len(groups)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                title_message = self._next_notification()
+            if title_message:
+                self.notify(*title_message)
+
+    def _next_notification(self):
+        """Wait (holding the condition) until something may be shown, and return it as (title, message)."""
+        while True:
+            now = time.monotonic()
+            due = sorted((g for g in self.groups.values() if g.due <= now), key=lambda g: g.due)
+            if not due:
+                next_due = min((g.due for g in self.groups.values()), default=None)
+                self.cond.wait(None if next_due is None else next_due - now)
+                continue
+            if not self.bucket.try_take():
+                self.cond.wait(self.bucket.wait_time())
+                continue
+            if len(due) > OVERFLOW_GROUPS:
+                for group in due:
+                    del self.groups[(group.repo, group.branch)]
+                return self._overview(due)
+            group = due[0]
+            del self.groups[(group.repo, group.branch)]
+            return group.notification()
+
+    @staticmethod
+    def _overview(groups):
+        pushes = sum(g.pushes for g in groups)
+        commits = sum(g.commits for g in groups)
+        repos = sorted({g.repo for g in groups})
+        lines = "\n".join(f"- {g.repo} ({g.branch}): {g.pushes} push(es), {g.commits} commit(s)"
+                          for g in groups[:LISTED_COMMITS])
+        more = f"\n... and {len(groups) - LISTED_COMMITS} more" if len(groups) > LISTED_COMMITS else ""
+        return (f"GitHub: {pushes} pushes in {len(repos)} repos",
+                f"{pushes} pushes, {commits} commits across {len(groups)} branches\n{lines}{more}")
@@ -9,3 +9,6 @@ GITHUB_TOKEN = ""
 # Your GitHub repo info
 GITHUB_OWNER = ""
 GITHUB_REPO = "Tic_Tac_Toe"
+
+# Repos to watch as "owner/name" (in polling mode also "org:name"); empty means just GITHUB_OWNER/GITHUB_REPO
+GITHUB_REPOS = []
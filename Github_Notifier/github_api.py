@@ -0,0 +1,197 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.github.com"
+API_WORKERS = 16           # Repos registered or cleaned up at once
+POOL_SIZE = 32             # Keep-alive connections shared by all workers
+REQUEST_TIMEOUT = 15       # Seconds per request
+MAX_RETRIES = 5            # Retries on rate limiting and server errors
+RATE_LIMIT_RESERVE = 10    # Remaining requests at which every worker waits for the limit to reset
+BACKOFF_BASE = 1.0         # Seconds before the first retry of a server error; doubles each time
+
+# Methods safe to send again after a dropped connection or a server error; a POST may already have
+# taken effect, so only throttled POSTs (which GitHub rejected unprocessed) are retried
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class GitHubAPIError(Exception):
+    def __init__(self, response):
+        self.status_code = response.status_code
+        try:
+            detail = response.json().get("message", "")
+        except ValueError:
+            detail = response.text[:200]
+        super().__init__(f"{response.request.method} {response.url}: {response.status_code} {detail}")
+
+
+class GitHubClient:
+    """GitHub REST client shared by every repo and thread.
+
+    One requests.Session keeps a pool of keep-alive connections. Every
+    response updates a shared view of the rate limit: when few requests
+    remain, or GitHub sends Retry-After, all workers pause until the
+    limit allows more. GETs are sent with If-None-Match, and a 304 is
+    answered from the cached body (304s do not count against the limit).
+    `base_url` can point at a local stub of the API for testing (see api_stub.py).
+    """
+
+    def __init__(self, token, base_url=API_URL, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/vnd.github+json", "User-Agent": "github-notifier"})
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+        self.lock = threading.Lock()
+        self.etags = {}  # url -> (etag, parsed body) of the last 200 response
+        self.paused_until = 0.0
+        self.rate_remaining = None
+
+    # --- Requests ---
+    def request(self, method, path, headers=None, **kwargs):
+        """Send a request, waiting out rate limits and retrying throttled or failed attempts.
+
+        Connection errors and server errors are only retried for
+        IDEMPOTENT_METHODS; callers of other methods decide themselves
+        (see ensure_hook).
+        """
+        url = self._url(path)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(MAX_RETRIES + 1):
+            self._wait_for_rate_limit()
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except requests.ConnectionError:
+                if attempt == MAX_RETRIES or not idempotent:
+                    raise
+                time.sleep(BACKOFF_BASE * 2 ** attempt)
+                continue
+            delay = self._note_rate_limit(response)
+            if delay is None and response.status_code >= 500 and idempotent:
+                delay = BACKOFF_BASE * 2 ** attempt
+            if delay is None or attempt == MAX_RETRIES:
+                return response
+            print(f"GitHub API: {response.status_code} for {method} {url}, retrying in {delay:.0f}s")
+            time.sleep(delay)
+        return response
+
+    def get(self, path, params=None):
+        """GET JSON, revalidating a cached copy with its ETag. Returns (body, from_cache)."""
+        url = self._url(path, params)
+        with self.lock:
+            cached = self.etags.get(url)
+        response = self.conditional_get(url, cached[0] if cached else None)
+        if response.status_code == 304:
+            return cached[1], True
+        body = response.json()
+        if response.headers.get("ETag"):
+            with self.lock:
+                self.etags[url] = (response.headers["ETag"], body)
+        return body, False
+
+    def conditional_get(self, path, etag=None, params=None):
+        """GET with If-None-Match: `etag`; returns the 200 or 304 response and raises on anything else."""
+        response = self.request("GET", self._url(path, params), headers={"If-None-Match": etag} if etag else None)
+        if response.status_code != 304 and not response.ok:
+            raise GitHubAPIError(response)
+        return response
+
+    def _url(self, path, params=None):
+        url = path if path.startswith("http") else self.base_url + path
+        return requests.Request("GET", url, params=params).prepare().url if params else url
+
+    def _wait_for_rate_limit(self):
+        with self.lock:
+            wait = self.paused_until - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _note_rate_limit(self, response):
+        """Record rate-limit headers; return seconds to wait before retrying this response, or None."""
+        headers = response.headers
+        now = time.time()
+        delay = None
+        with self.lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.rate_remaining = int(headers["X-RateLimit-Remaining"])
+                if self.rate_remaining <= RATE_LIMIT_RESERVE:
+                    reset = float(headers.get("X-RateLimit-Reset", now + 60))
+                    self.paused_until = max(self.paused_until, reset)
+            if response.status_code in (403, 429):
+                if "Retry-After" in headers:
+                    delay = float(headers["Retry-After"])
+                elif self.rate_remaining == 0:
+                    delay = max(1.0, float(headers.get("X-RateLimit-Reset", now + 60)) - now)
+                if delay is not None:
+                    self.paused_until = max(self.paused_until, now + delay)
+        return delay
+
+    # --- Hooks ---
+    def list_hooks(self, repo):
+        hooks, _ = self.get(f"/repos/{repo}/hooks", {"per_page": 100})
+        return hooks
+
+    def create_hook(self, repo, url, secret, events=("*",)):
+        payload = {
+            "name": "web", "active": True, "events": list(events),
+            "config": {"url": url, "content_type": "json", "secret": secret, "insecure_ssl": "0"},
+        }
+        response = self.request("POST", f"/repos/{repo}/hooks", json=payload)
+        if not response.ok:
+            raise GitHubAPIError(response)
+        return response.json().get("id")
+
+    def delete_hook(self, repo, hook_id):
+        response = self.request("DELETE", f"/repos/{repo}/hooks/{hook_id}")
+        if not response.ok and response.status_code != 404:  # already gone is fine
+            raise GitHubAPIError(response)
+
+    def ensure_hook(self, repo, url, secret):
+        """Return the id of a hook delivering to `url`, creating it if the repo has none.
+
+        A create that fails on a dropped connection or a server error may
+        still have made the hook, so the repo's hooks are listed again
+        before the next try instead of posting blindly.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            for hook in self.list_hooks(repo):
+                if hook.get("config", {}).get("url") == url:
+                    return hook["id"]
+            try:
+                return self.create_hook(repo, url, secret)
+            except (requests.ConnectionError, GitHubAPIError) as e:
+                if attempt == MAX_RETRIES or getattr(e, "status_code", 500) < 500:
+                    raise
+                print(f"GitHub API: creating a hook on {repo} failed ({e}), checking again")
+                time.sleep(BACKOFF_BASE * 2 ** attempt)
+
+    def register_hooks(self, repos, url, secret, workers=API_WORKERS):
+        """Ensure a hook on every repo ("owner/name") concurrently. Returns ({repo: hook id}, {repo: error})."""
+        return self._for_each(repos, lambda repo: self.ensure_hook(repo, url, secret), workers)
+
+    def remove_hooks(self, hook_ids, workers=API_WORKERS):
+        """Delete hooks given as {repo: hook id} concurrently. Returns {repo: error} for failures."""
+        _, errors = self._for_each(list(hook_ids), lambda repo: self.delete_hook(repo, hook_ids[repo]), workers)
+        return errors
+
+    @staticmethod
+    def _for_each(repos, func, workers):
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(repos) or 1))) as pool:
+            futures = {pool.submit(func, repo): repo for repo in repos}
+            for fut in as_completed(futures):
+                try:
+                    results[futures[fut]] = fut.result()
+                except (requests.RequestException, GitHubAPIError, ValueError) as e:  # ValueError: a body that is not JSON
+                    errors[futures[fut]] = e
+        return results, errors
+
+    def close(self):
+        self.session.close()
@@ -1,23 +1,44 @@
 from flask import Flask, request, abort
 import hmac
-import hashlib
 import json
 import subprocess
 import os
 
 from creds import GITHUB_WEBHOOK_SECRET
+from ingest_queue import DeliveryQueue
+from coalescer import NotificationCoalescer
+from webhook_event import Signer, WebhookEvent, PayloadTooLarge, parse_signature
+
+# GitHub caps webhook payloads at 25 MB; larger bodies are refused with 413
+MAX_PAYLOAD_BYTES = 25 * 1024 * 1024
 
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_PAYLOAD_BYTES
+
+# Events that are queued for processing; others are acknowledged and dropped
+HANDLED_EVENTS = {'push'}
+
+# Verified deliveries wait here until a consumer processes them (started by the GUI)
+delivery_queue = DeliveryQueue()
 
-def verify_signature(secret, request):
-    signature = request.headers.get('X-Hub-Signature-256')
-    if signature is None:
-        return False
-    sha_name, signature = signature.split('=')
-    if sha_name != 'sha256':
-        return False
-    mac = hmac.new(secret.encode(), msg=request.data, digestmod=hashlib.sha256)
-    return hmac.compare_digest(mac.hexdigest(), signature)
+signer = Signer(GITHUB_WEBHOOK_SECRET)
+
+def read_verified_body(request, limit=MAX_PAYLOAD_BYTES):
+    """Read the body once, checking its size and signature as it streams in.
+
+    Returns the raw body, or None if the signature header is missing,
+    malformed or wrong. Bodies over `limit` are refused with 413.
+    """
+    expected = parse_signature(request.headers.get('X-Hub-Signature-256'))
+    if expected is None:
+        return None
+    if request.content_length is not None and request.content_length > limit:
+        abort(413)
+    try:
+        body, digest = signer.read(request.stream, limit)
+    except PayloadTooLarge:
+        abort(413)
+    return body if hmac.compare_digest(digest, expected) else None
 
 def show_vbs_notification(title: str, message: str):
     try:
@@ -34,29 +55,41 @@ def show_vbs_notification(title: str, message: str):
     except Exception as e:
         print(f"Failed to launch VBS notification: {e}")
 
+# Pushes are merged per repo/branch and rate-limited before a notification is shown
+notifications = NotificationCoalescer(show_vbs_notification)
+
 @app.route('/github-webhook', methods=['POST'])
 def github_webhook():
-    if not verify_signature(GITHUB_WEBHOOK_SECRET, request):
+    body = read_verified_body(request)
+    if body is None:
         abort(403)
 
     event = request.headers.get('X-GitHub-Event', 'ping')
     if event == 'ping':
         return json.dumps({'msg': 'pong'})
 
-    if event != 'push':
-        return '', 204  # We only handle push events
+    if event not in HANDLED_EVENTS:
+        return '', 204
+
+    # Answer as soon as the delivery is stored; a redelivery of a stored one is a no-op
+    delivery_queue.enqueue(request.headers.get('X-GitHub-Delivery'), event, body)
+    return '', 202
+
+
+def submit_polled_event(event, delivery_id, body):
+    """EventPoller sink: polled events join the same queue as webhook deliveries."""
+    if event in HANDLED_EVENTS:
+        delivery_queue.enqueue(delivery_id, event, body)
+
 
-    payload = request.json
-    repo_name = payload.get('repository', {}).get('full_name', 'unknown repo')
-    pusher = payload.get('pusher', {}).get('name', 'unknown pusher')
-    ref = payload.get('ref', '')
-    branch = ref.split('/')[-1] if ref else 'unknown branch'
-    commits = payload.get('commits', [])
+def process_delivery(event, body):
+    """Queue consumer: handle one stored delivery."""
+    handle_event(WebhookEvent(event, body))
 
-    commit_msgs = "\n".join([f"- {c.get('message', '').strip()}" for c in commits])
 
-    title = f"GitHub: {repo_name} ({branch})"
-    message = f"Pusher: {pusher}\nCommits:\n{commit_msgs}"
+def handle_event(event):
+    """Act on a WebhookEvent; its payload is parsed on first field access."""
+    if event.name != 'push':
+        return
 
-    show_vbs_notification(title, message)
-    return '', 200
+    notifications.add(event.repo_name, event.branch, event.pusher, event.commits)
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Next to this module, so the web server and its gunicorn/waitress workers share one queue whatever their cwd
+QUEUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webhook_queue.db")
+
+CONSUMER_WORKERS = 4       # Deliveries processed at once
+MAX_ATTEMPTS = 5           # Tries per delivery before it is parked as failed
+RETRY_DELAY = 5            # Seconds before the first retry; doubles on each further attempt
+POLL_INTERVAL = 1.0        # Seconds idle consumers wait before checking for work written by other processes
+KEEP_DONE_SECONDS = 7 * 24 * 3600  # Processed deliveries kept for dedup and replay
+
+
+class DeliveryQueue:
+    """Durable queue of verified webhook deliveries, stored in SQLite (WAL).
+
+    The endpoint only appends the raw body and answers; consumer threads
+    process deliveries in arrival order. X-GitHub-Delivery is unique, so a
+    redelivery of something already queued is dropped. Deliveries that
+    were being processed when the app stopped are picked up again on the
+    next start, failures are retried with backoff, and replay() re-queues
+    processed or failed deliveries.
+    """
+
+    def __init__(self, db_path=QUEUE_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # A delivery is only acknowledged once it is on disk
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS deliveries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, delivery_id TEXT UNIQUE, event TEXT, body BLOB,"
+            " received REAL, status TEXT, attempts INTEGER, not_before REAL, error TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS deliveries_status ON deliveries (status, id)")
+        self.conn.commit()
+        self.cond = threading.Condition()
+        self.threads = []
+        self.stopping = False
+
+    # --- Producer side (request threads) ---
+    def enqueue(self, delivery_id, event, body):
+        """Store a delivery; returns False if this delivery id was seen before."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO deliveries (delivery_id, event, body, received, status, attempts, not_before)"
+                " VALUES (?, ?, ?, ?, 'pending', 0, 0)",
+                (delivery_id or str(uuid.uuid4()), event, body, time.time()),
+            )
+            self.conn.commit()
+        if not cursor.rowcount:
+            return False
+        with self.cond:
+            self.cond.notify()
+        return True
+
+    # --- Consumers ---
+    def start(self, handler, workers=CONSUMER_WORKERS):
+        """Process deliveries with `handler(event, body)` on a pool of threads."""
+        if self.threads:
+            return
+        self.stopping = False
+        with self.lock:
+            # Deliveries cut off by a crash or shutdown run again
+            self.conn.execute("UPDATE deliveries SET status = 'pending' WHERE status = 'processing'")
+            self.conn.execute("DELETE FROM deliveries WHERE status = 'done' AND received < ?",
+                              (time.time() - KEEP_DONE_SECONDS,))
+            self.conn.commit()
+        self.threads = [threading.Thread(target=self._consume, args=(handler,), daemon=True)
+                        for _ in range(max(1, workers))]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=10):
+        """Stop the consumers once they finish their current delivery."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        self.threads = []
+
+    def _claim(self):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, event, body, attempts FROM deliveries WHERE status = 'pending' AND not_before <= ?"
+                " ORDER BY id LIMIT 1", (time.time(),)
+            ).fetchone()
+            if row:
+                self.conn.execute("UPDATE deliveries SET status = 'processing' WHERE id = ?", (row[0],))
+                self.conn.commit()
+        return row
+
+    def _consume(self, handler):
+        while not self.stopping:
+            row = self._claim()
+            if row is None:
+                with self.cond:
+                    if not self.stopping:
+                        self.cond.wait(POLL_INTERVAL)
+                continue
+            row_id, event, body, attempts = row
+            try:
+                handler(event, body)
+            except Exception as e:  # keep the consumer alive; the delivery is retried
+                print(f"Processing delivery {row_id} failed: {e}")
+                attempts += 1
+                status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+                with self.lock:
+                    self.conn.execute(
+                        "UPDATE deliveries SET status = ?, attempts = ?, not_before = ?, error = ? WHERE id = ?",
+                        (status, attempts, time.time() + RETRY_DELAY * 2 ** (attempts - 1), str(e), row_id),
+                    )
+                    self.conn.commit()
+                continue
+            with self.lock:
+                self.conn.execute("UPDATE deliveries SET status = 'done', error = NULL WHERE id = ?", (row_id,))
+                self.conn.commit()
+
+    # --- Maintenance ---
+    def replay(self, status="failed", since=None):
+        """Queue deliveries with `status` ("failed", "done" or None for both) again; returns how many.
+
+        `since` limits the replay to deliveries received after that Unix time.
+        """
+        clauses, params = ["status IN ('failed', 'done')"], []
+        if status:
+            clauses, params = ["status = ?"], [status]
+        if since is not None:
+            clauses.append("received >= ?")
+            params.append(since)
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE deliveries SET status = 'pending', attempts = 0, not_before = 0, error = NULL WHERE "
+                + " AND ".join(clauses), params)
+            self.conn.commit()
+        with self.cond:
+            self.cond.notify_all()
+        return cursor.rowcount
+
+    def stats(self):
+        """Number of deliveries per status."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status").fetchall())
+
+    def close(self):
+        self.stop()
+        with self.lock:
+            self.conn.close()
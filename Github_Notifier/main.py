@@ -3,7 +3,6 @@ from tkinter import ttk, messagebox
 import subprocess
 import threading
 import re
-import requests
 import sys
 import os  # Added for path handling
 import time
@@ -11,13 +10,18 @@ import urllib.parse
 import io
 
 # Keeping your original imports
-from creds import GITHUB_TOKEN, GITHUB_WEBHOOK_SECRET, GITHUB_OWNER, GITHUB_REPO
-from github_webhook_server import app  # Flask app
+from creds import GITHUB_TOKEN, GITHUB_WEBHOOK_SECRET, GITHUB_OWNER, GITHUB_REPO, GITHUB_REPOS
+from github_api import GitHubClient
+from github_webhook_server import app, delivery_queue, notifications, process_delivery, submit_polled_event  # Flask app
+from poller import EventPoller
+from server_backends import create_server, SERVER_BACKEND
 
 # Constants
 LOCAL_PORT = 5000
 ENDPOINT_PATH = "/github-webhook"
 CLOUDFLARED_START_TIMEOUT = 30
+# Poll the events API instead of opening a tunnel (for hosts that cannot run cloudflared)
+POLL_MODE = False
 
 
 class GithubNotifierApp(tk.Frame):
@@ -26,7 +30,11 @@ class GithubNotifierApp(tk.Frame):
         self.parent = parent
         self.running = False
         self.proc = None
-        self.hook_id = None
+        self.hook_ids = {}  # repo -> id of the hook registered for this session
+        self.github = GitHubClient(GITHUB_TOKEN)
+        self.server = None
+        self.poller = None
+        self.poll_mode = tk.BooleanVar(value=POLL_MODE)
 
         self.setup_gui()
 
@@ -42,6 +50,12 @@ class GithubNotifierApp(tk.Frame):
                                     font=("Arial", 10, "bold"), command=self.toggle_service, width=20)
         self.toggle_btn.pack(side=tk.RIGHT, padx=20)
 
+        tk.Button(header, text="REPLAY FAILED", font=("Arial", 10, "bold"), command=self.replay_failed,
+                  width=14).pack(side=tk.RIGHT)
+
+        self.poll_check = tk.Checkbutton(header, text="Poll (no tunnel)", variable=self.poll_mode)
+        self.poll_check.pack(side=tk.RIGHT, padx=10)
+
         # --- Terminal Area ---
         terminal_frame = tk.LabelFrame(self, text="Tunnel & Webhook Log", padx=5, pady=5)
         terminal_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -61,6 +75,10 @@ class GithubNotifierApp(tk.Frame):
         self.console.see(tk.END)
         self.console.config(state="disabled")
 
+    def replay_failed(self):
+        count = delivery_queue.replay("failed")
+        self.log(f"🔁 {count} failed deliveries queued again." if count else "No failed deliveries to replay.")
+
     def toggle_service(self):
         if not self.running:
             self.start_service()
@@ -70,18 +88,42 @@ class GithubNotifierApp(tk.Frame):
     def start_service(self):
         self.running = True
         self.toggle_btn.config(text="DEACTIVATE", bg="#c0392b")
+        self.poll_check.config(state="disabled")
         self.status_label.config(text="Status: STARTING...", fg="orange")
         self.log("🚀 Initializing system...")
 
         # Run core logic in a separate thread
-        threading.Thread(target=self.core_logic_thread, daemon=True).start()
+        target = self.poll_logic_thread if self.poll_mode.get() else self.core_logic_thread
+        threading.Thread(target=target, daemon=True).start()
 
     def stop_service(self):
+        # Deleting hooks on many repos and draining the queue take a while; keep the window responsive
+        self.toggle_btn.config(state="disabled")
+        self.status_label.config(text="Status: STOPPING...", fg="orange")
+        threading.Thread(target=self.shutdown_thread, daemon=True).start()
+
+    def shutdown_thread(self):
         self.log("\n🛑 Shutting down...")
         try:
-            if self.hook_id:
-                delete_github_webhook(GITHUB_OWNER, GITHUB_REPO, GITHUB_TOKEN, self.hook_id)
-                self.log("✅ Webhook deleted from GitHub.")
+            if self.hook_ids:
+                errors = self.github.remove_hooks(self.hook_ids)
+                for repo, error in errors.items():
+                    self.log(f"⚠️ Could not delete webhook on {repo}: {error}")
+                self.log(f"✅ Webhooks deleted from {len(self.hook_ids) - len(errors)} repo(s).")
+                self.hook_ids = {}
+            if self.poller:
+                self.poller.stop()
+                self.poller = None
+                self.log("🔌 Polling stopped.")
+            # No new deliveries now; let in-flight ones finish before the tunnel goes away
+            if self.server:
+                self.server.shutdown()
+                self.server = None
+                self.log("🔌 Webhook server stopped.")
+            delivery_queue.stop()
+            # Handled pushes may still be waiting out their coalescing window
+            if notifications.flush():
+                self.log("📣 Pending notifications shown.")
             if self.proc:
                 self.proc.terminate()
                 self.log("🔌 Tunnel closed.")
@@ -89,9 +131,23 @@ class GithubNotifierApp(tk.Frame):
             self.log(f"⚠️ Shutdown error: {e}")
 
         self.running = False
-        self.toggle_btn.config(text="ACTIVATE TUNNEL", bg="#27ae60")
+        self.toggle_btn.config(text="ACTIVATE TUNNEL", bg="#27ae60", state="normal")
+        self.poll_check.config(state="normal")
         self.status_label.config(text="Status: INACTIVE", fg="red")
 
+    def poll_logic_thread(self):
+        """Polling mode: no tunnel, hooks or server; the events API feeds the delivery queue."""
+        try:
+            delivery_queue.start(process_delivery)
+            repos = watched_repos()
+            self.poller = EventPoller(self.github, repos, submit_polled_event)
+            self.poller.start()
+            self.status_label.config(text="Status: ACTIVE (Polling)", fg="#27ae60")
+            self.log(f"🟢 System online. Polling events of {len(repos)} repo(s)...")
+        except Exception as e:
+            self.log(f"❌ CRITICAL ERROR: {e}")
+            self.stop_service()
+
     def core_logic_thread(self):
         try:
             # 1. Start Tunnel
@@ -99,16 +155,25 @@ class GithubNotifierApp(tk.Frame):
             self.proc, public_url = start_cloudflared_and_get_public_url(self.log)
             self.log(f"✅ Public URL: {public_url}")
 
-            # 2. Create Webhook
+            # 2. Create Webhooks
             full_webhook_url = public_url + ENDPOINT_PATH
-            self.hook_id = create_github_webhook(GITHUB_OWNER, GITHUB_REPO, GITHUB_TOKEN, full_webhook_url,
-                                                 GITHUB_WEBHOOK_SECRET)
-            self.log(f"✅ Webhook created (ID: {self.hook_id})")
-
-            # 3. Start Flask
+            repos = watched_repos()
+            self.hook_ids, errors = self.github.register_hooks(repos, full_webhook_url, GITHUB_WEBHOOK_SECRET)
+            for repo, error in errors.items():
+                self.log(f"⚠️ Webhook not created on {repo}: {error}")
+            if not self.hook_ids:
+                raise RuntimeError("No webhook could be created.")
+            self.log(f"✅ Webhooks created on {len(self.hook_ids)} of {len(repos)} repo(s).")
+
+            # 3. Start the webhook server and the consumers of its delivery queue
+            delivery_queue.start(process_delivery)
+            backlog = delivery_queue.stats().get("pending", 0)
+            if backlog:
+                self.log(f"📥 Resuming {backlog} queued deliveries.")
+            backend, self.server = create_server(app, LOCAL_PORT, SERVER_BACKEND)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
             self.status_label.config(text="Status: ACTIVE (Listening)", fg="#27ae60")
-            threading.Thread(target=run_flask, daemon=True).start()
-            self.log("🟢 System online. Listening for events...")
+            self.log(f"🟢 System online ({backend} server). Listening for events...")
 
             # OPTIONAL: Test notification on startup
             # self.run_vb_notify("System Active", "GitHub Notifier is now monitoring your repo.")
@@ -174,26 +239,9 @@ def _sanitize_url_candidate(raw_url: str) -> str:
     return urllib.parse.urlunparse(parsed._replace(path="", params="", query="", fragment=""))
 
 
-def create_github_webhook(owner, repo, token, webhook_url, secret):
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/hooks"
-    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
-    payload = {
-        "name": "web", "active": True, "events": ["*"],
-        "config": {"url": webhook_url, "content_type": "json", "secret": secret, "insecure_ssl": "0"}
-    }
-    resp = requests.post(api_url, json=payload, headers=headers)
-    resp.raise_for_status()
-    return resp.json().get("id")
-
-
-def delete_github_webhook(owner, repo, token, hook_id):
-    url = f"https://api.github.com/repos/{owner}/{repo}/hooks/{hook_id}"
-    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
-    requests.delete(url, headers=headers).raise_for_status()
-
-
-def run_flask():
-    app.run(host="0.0.0.0", port=LOCAL_PORT, debug=False, use_reloader=False)
+def watched_repos():
+    """Repos ("owner/name") to register hooks on or poll."""
+    return list(GITHUB_REPOS) or [f"{GITHUB_OWNER}/{GITHUB_REPO}"]
 
 
 if __name__ == "__main__":
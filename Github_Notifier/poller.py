@@ -0,0 +1,151 @@
+import heapq
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from github_api import GitHubAPIError
+
+POLL_WORKERS = 8           # Sources polled at once
+DEFAULT_POLL_INTERVAL = 60 # Seconds, when GitHub sends no X-Poll-Interval
+MAX_POLL_INTERVAL = 300    # Idle sources slow down to this
+IDLE_BACKOFF = 1.5         # Interval growth per unchanged (304) poll
+ERROR_BACKOFF = 2          # Interval growth per failed poll
+EVENTS_PER_PAGE = 100
+
+
+def webhook_name(event_type):
+    """Events API type ("PushEvent") to webhook event name ("push")."""
+    name = event_type[:-len("Event")] if event_type.endswith("Event") else event_type
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def webhook_payload(event):
+    """Reshape an events API item like the webhook payload handle_event reads."""
+    payload = dict(event.get("payload") or {})
+    payload.setdefault("repository", {"full_name": event.get("repo", {}).get("name", "unknown repo")})
+    actor = event.get("actor", {}).get("login", "unknown pusher")
+    payload.setdefault("sender", {"login": actor})
+    if event.get("type") == "PushEvent":
+        payload.setdefault("pusher", {"name": actor})
+    return payload
+
+
+class PollSource:
+    def __init__(self, name):
+        self.name = name
+        # "org:name" polls an organization's public events, "owner/repo" a repository's
+        self.path = f"/orgs/{name[4:]}/events" if name.startswith("org:") else f"/repos/{name}/events"
+        self.etag = None
+        self.interval = DEFAULT_POLL_INTERVAL
+        self.seen = set()  # event ids in the last changed response
+
+
+class EventPoller:
+    """Polls the GitHub events API for many repos as an alternative to tunnel + webhooks.
+
+    Every poll sends the last ETag, so an unchanged feed costs a 304 that
+    does not count against the rate limit. Sources are polled no faster
+    than GitHub's X-Poll-Interval; each unchanged poll stretches a source's
+    interval towards MAX_POLL_INTERVAL and any new event resets it, so idle
+    repos cost almost nothing. A single scheduler thread sleeps until the
+    next source is due and hands it to a small worker pool.
+
+    Events newer than the poller's start that were not in the previous
+    response are passed to `submit(event name, delivery id, body)` with a
+    webhook-shaped JSON body and "event-<id>" as delivery id, so they take
+    the same queue and handlers as webhook deliveries.
+    """
+
+    def __init__(self, client, sources, submit, workers=POLL_WORKERS):
+        self.client = client
+        self.submit = submit
+        self.sources = [PollSource(name) for name in sources]
+        self.workers = workers
+        self.cond = threading.Condition()
+        self.schedule = []  # heap of (next poll time, sequence, source)
+        self.sequence = 0
+        self.stopping = False
+        self.started = None
+        self.pool = None
+        self.thread = None
+
+    def start(self):
+        self.started = int(time.time())  # created_at has whole seconds; an event in the start second counts as new
+        self.stopping = False
+        self.pool = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(self.sources))))
+        now = time.monotonic()
+        with self.cond:
+            for index, source in enumerate(self.sources):
+                # Spread the first round over a few seconds instead of firing everything at once
+                self._schedule(source, now + index * 5.0 / max(1, len(self.sources)))
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(5)
+        if self.pool:
+            self.pool.shutdown(wait=True)
+
+    def _schedule(self, source, when):
+        """Call with the condition held."""
+        self.sequence += 1
+        heapq.heappush(self.schedule, (when, self.sequence, source))
+        self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopping:
+                    now = time.monotonic()
+                    if self.schedule and self.schedule[0][0] <= now:
+                        break
+                    self.cond.wait(self.schedule[0][0] - now if self.schedule else None)
+                if self.stopping:
+                    return
+                _, _, source = heapq.heappop(self.schedule)
+            self.pool.submit(self._poll, source)
+
+    def _poll(self, source):
+        try:
+            delay = self._poll_once(source)
+        except (requests.RequestException, GitHubAPIError, ValueError) as e:
+            print(f"Polling {source.name} failed: {e}")
+            delay = source.interval = min(source.interval * ERROR_BACKOFF, MAX_POLL_INTERVAL)
+        with self.cond:
+            if not self.stopping:
+                self._schedule(source, time.monotonic() + delay)
+
+    def _poll_once(self, source):
+        """Poll one source; returns seconds until it should be polled again."""
+        response = self.client.conditional_get(source.path, source.etag, {"per_page": EVENTS_PER_PAGE})
+        minimum = int(response.headers.get("X-Poll-Interval", DEFAULT_POLL_INTERVAL))
+        if response.status_code == 304:
+            source.interval = min(max(source.interval * IDLE_BACKOFF, minimum), max(MAX_POLL_INTERVAL, minimum))
+            return source.interval
+
+        source.etag = response.headers.get("ETag")
+        events = response.json()
+        fresh = [event for event in events if event["id"] not in source.seen and self._is_new(event)]
+        source.seen = {event["id"] for event in events}
+        # The feed is newest first; deliver in the order things happened
+        for event in reversed(fresh):
+            body = json.dumps(webhook_payload(event)).encode()
+            self.submit(webhook_name(event["type"]), f"event-{event['id']}", body)
+        source.interval = minimum if fresh else min(max(source.interval, minimum), max(MAX_POLL_INTERVAL, minimum))
+        return source.interval
+
+    def _is_new(self, event):
+        """True for events created after the poller started; older history is not replayed."""
+        created = event.get("created_at")
+        if not created:
+            return True
+        return datetime.fromisoformat(created.replace("Z", "+00:00")).timestamp() >= self.started
@@ -0,0 +1,142 @@
+import importlib.util
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+from github_webhook_server import MAX_PAYLOAD_BYTES
+
+# Serving backend: "waitress" (threaded WSGI), "gunicorn" (pre-fork, Linux/macOS only),
+# "uvicorn" (async ASGI server around the WSGI app, needs a2wsgi) or "werkzeug" (Flask's dev server)
+SERVER_BACKEND = "waitress"
+
+HOST = "0.0.0.0"
+SERVER_THREADS = 16        # Requests handled at once (per gunicorn worker)
+SERVER_WORKERS = 2         # gunicorn worker processes
+MAX_CONNECTIONS = 500      # Open connections accepted before new ones wait in the backlog
+LISTEN_BACKLOG = 1024      # Connections the OS queues while all are busy
+KEEPALIVE_TIMEOUT = 120    # Seconds an idle keep-alive connection (e.g. from cloudflared) stays open
+SHUTDOWN_TIMEOUT = 10      # Seconds in-flight deliveries get to finish on shutdown
+
+BACKENDS = ("waitress", "gunicorn", "uvicorn", "werkzeug")
+
+
+class WaitressServer:
+    """waitress: a pure-Python threaded WSGI server that runs on Windows too."""
+
+    def __init__(self, app, host, port, threads):
+        from waitress.server import create_server
+        self.server = create_server(
+            app, host=host, port=port, threads=threads, connection_limit=MAX_CONNECTIONS, backlog=LISTEN_BACKLOG,
+            channel_timeout=KEEPALIVE_TIMEOUT, max_request_body_size=MAX_PAYLOAD_BYTES, ident="github-notifier",
+        )
+        self.done = threading.Event()
+
+    def serve_forever(self):
+        try:
+            self.server.run()
+        finally:
+            self.done.set()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        # Let running requests finish, then close every socket from the server's own loop thread
+        self.server.task_dispatcher.shutdown(cancel_pending=False, timeout=timeout)
+        self.server.trigger.pull_trigger(self._close_all)
+        self.done.wait(timeout)
+
+    def _close_all(self):
+        for channel in list(self.server._map.values()):
+            channel.close()
+
+
+class GunicornServer:
+    """gunicorn with threaded workers, run as a child process (its master needs the main thread)."""
+
+    def __init__(self, app, host, port, threads, workers=SERVER_WORKERS):
+        if os.name == "nt":
+            raise RuntimeError("gunicorn does not run on Windows; use waitress")
+        if importlib.util.find_spec("gunicorn") is None:
+            raise ImportError("gunicorn is not installed")
+        self.cmd = [
+            sys.executable, "-m", "gunicorn", "github_webhook_server:app",
+            "--bind", f"{host}:{port}", "--worker-class", "gthread",
+            "--workers", str(workers), "--threads", str(threads), "--worker-connections", str(MAX_CONNECTIONS),
+            "--backlog", str(LISTEN_BACKLOG), "--keep-alive", str(KEEPALIVE_TIMEOUT),
+            "--graceful-timeout", str(SHUTDOWN_TIMEOUT),
+        ]
+        self.proc = None
+        self.started = threading.Event()
+
+    def serve_forever(self):
+        self.proc = subprocess.Popen(self.cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.started.set()
+        self.proc.wait()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        if not self.started.wait(timeout) or self.proc.poll() is not None:
+            return
+        # SIGTERM is gunicorn's graceful shutdown: workers finish their requests first
+        self.proc.send_signal(signal.SIGTERM)
+        try:
+            self.proc.wait(timeout + 5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class UvicornServer:
+    """uvicorn (asyncio) serving the Flask app through a2wsgi's thread pool."""
+
+    def __init__(self, app, host, port, threads):
+        import uvicorn
+        from a2wsgi import WSGIMiddleware
+        config = uvicorn.Config(
+            WSGIMiddleware(app, workers=threads), host=host, port=port, log_level="warning",
+            limit_concurrency=MAX_CONNECTIONS, backlog=LISTEN_BACKLOG, timeout_keep_alive=KEEPALIVE_TIMEOUT,
+            timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+        )
+        self.server = uvicorn.Server(config)
+        self.done = threading.Event()
+
+    def serve_forever(self):
+        try:
+            self.server.run()
+        finally:
+            self.done.set()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        self.server.should_exit = True
+        self.done.wait(timeout + 5)
+
+
+class WerkzeugServer:
+    """Flask's development server; kept for debugging only."""
+
+    def __init__(self, app, host, port, threads):
+        from werkzeug.serving import make_server
+        self.server = make_server(host, port, app, threaded=True)
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def create_server(app, port, backend=SERVER_BACKEND, host=HOST, threads=SERVER_THREADS):
+    """Build a server for `app`; call serve_forever() on a thread and shutdown() to stop it gracefully.
+
+    A backend whose package is missing falls back to waitress, then to
+    Flask's development server.
+    """
+    classes = {"waitress": WaitressServer, "gunicorn": GunicornServer, "uvicorn": UvicornServer,
+               "werkzeug": WerkzeugServer}
+    if backend not in classes:
+        raise ValueError(f"Unknown server backend: {backend} (choose from {', '.join(BACKENDS)})")
+    for name in dict.fromkeys((backend, "waitress", "werkzeug")):
+        try:
+            return name, classes[name](app, host, port, threads)
+        except (ImportError, RuntimeError) as e:
+            print(f"Server backend {name} unavailable ({e}); trying the next one")
+    raise RuntimeError("No webhook server backend is available")
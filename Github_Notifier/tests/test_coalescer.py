@@ -0,0 +1,84 @@
+import threading
+import time
+
+from coalescer import OVERFLOW_GROUPS, NotificationCoalescer, TokenBucket
+
+
+class Recorder:
+    def __init__(self):
+        self.shown = []
+        self.event = threading.Event()
+
+    def __call__(self, title, message):
+        self.shown.append((title, message))
+        self.event.set()
+
+
+def commits(*messages, author="dev"):
+    return [{"message": message, "author": {"name": author}} for message in messages]
+
+
+def test_pushes_within_the_window_become_one_notification():
+    notify = Recorder()
+    coalescer = NotificationCoalescer(notify, window=0.3)
+    coalescer.add("o/r", "main", "alice", commits("one"))
+    coalescer.add("o/r", "main", "bob", commits("two", "three", author="bob"))
+    assert not notify.shown  # still inside the window
+    assert notify.event.wait(5)
+    time.sleep(0.1)
+    assert len(notify.shown) == 1
+    title, message = notify.shown[0]
+    assert title == "GitHub: o/r (main)"
+    assert message.startswith("2 pushes, 3 commits by 2 authors")
+    assert "- one\n- two\n- three" in message
+
+
+def test_single_push_lists_its_pusher():
+    notify = Recorder()
+    NotificationCoalescer(notify, window=0).add("o/r", "dev", "alice", commits("fix"))
+    assert notify.event.wait(5)
+    assert notify.shown == [("GitHub: o/r (dev)", "Pusher: alice\nCommits:\n- fix")]
+
+
+def test_flush_shows_waiting_groups_without_waiting_for_the_window():
+    notify = Recorder()
+    coalescer = NotificationCoalescer(notify, window=60)
+    coalescer.add("o/r", "main", "alice", commits("a"))
+    coalescer.add("o/r", "dev", "alice", commits("b"))
+    coalescer.add("o/r", "main", "alice", commits("c"))
+    assert coalescer.flush() == 2
+    assert sorted(title for title, _ in notify.shown) == ["GitHub: o/r (dev)", "GitHub: o/r (main)"]
+    assert coalescer.flush() == 0
+
+
+def test_flush_merges_many_groups_into_one_overview():
+    notify = Recorder()
+    coalescer = NotificationCoalescer(notify, window=60)
+    for n in range(OVERFLOW_GROUPS + 1):
+        coalescer.add(f"o/r{n}", "main", "alice", commits("a", "b"))
+    assert coalescer.flush() == OVERFLOW_GROUPS + 1
+    assert len(notify.shown) == 1
+    title, message = notify.shown[0]
+    assert title == f"GitHub: {OVERFLOW_GROUPS + 1} pushes in {OVERFLOW_GROUPS + 1} repos"
+    assert message.startswith(f"{OVERFLOW_GROUPS + 1} pushes, {2 * (OVERFLOW_GROUPS + 1)} commits")
+
+
+def test_groups_wait_for_the_rate_limit():
+    notify = Recorder()
+    bucket = TokenBucket(rate_per_minute=1, burst=1)
+    coalescer = NotificationCoalescer(notify, window=0, bucket=bucket)
+    coalescer.add("o/r", "main", "alice", commits("a"))
+    assert notify.event.wait(5)
+    coalescer.add("o/r", "dev", "alice", commits("b"))
+    time.sleep(0.3)
+    assert len(notify.shown) == 1  # the bucket is empty for another minute
+    assert coalescer.flush() == 1
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert 0 < bucket.wait_time() <= 0.1
+    time.sleep(0.15)
+    assert bucket.try_take()
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+import github_api
+from api_stub import GitHubAPIStub
+from github_api import GitHubAPIError, GitHubClient
+
+HOOK_URL = "https://example.invalid/github-webhook"
+
+
+@pytest.fixture
+def stub():
+    stub = GitHubAPIStub().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setattr(github_api, "BACKOFF_BASE", 0.01)
+    client = GitHubClient("", base_url=stub.url)
+    yield client
+    client.close()
+
+
+def test_unchanged_get_is_answered_from_the_etag_cache(stub, client):
+    client.create_hook("o/r", HOOK_URL, "secret")
+    body, from_cache = client.get("/repos/o/r/hooks")
+    remaining = stub.remaining
+    again, from_cache_again = client.get("/repos/o/r/hooks")
+    assert (from_cache, from_cache_again) == (False, True)
+    assert again == body
+    assert stub.remaining == remaining  # a 304 does not count against the limit
+
+    client.create_hook("o/r", HOOK_URL + "/2", "secret")
+    assert len(client.list_hooks("o/r")) == 2
+
+
+def test_retry_after_is_honoured(stub, client):
+    stub.faults.append(("GET", 429, {"Retry-After": "1"}))
+    started = time.monotonic()
+    assert client.list_hooks("o/r") == []
+    assert time.monotonic() - started >= 0.9
+    assert stub.requests["GET"] == 2
+    assert client.paused_until > 0
+
+
+def test_rate_limit_headers_are_tracked(stub, client):
+    client.list_hooks("o/r")
+    assert client.rate_remaining == stub.remaining
+
+
+def test_server_errors_on_get_are_retried(stub, client):
+    stub.faults += [("GET", 502), ("GET", 503)]
+    assert client.list_hooks("o/r") == []
+    assert stub.requests["GET"] == 3
+
+
+def test_failed_post_is_not_repeated_blindly(stub, client):
+    stub.faults.append(("POST", 502))  # the hook is made, but the client only sees the error
+    hook_id = client.ensure_hook("o/r", HOOK_URL, "secret")
+    assert list(stub.hooks["o/r"]) == [hook_id]
+    assert stub.requests["POST"] == 1
+
+
+def test_ensure_hook_reuses_an_existing_hook(stub, client):
+    hook_id = client.ensure_hook("o/r", HOOK_URL, "secret")
+    assert client.ensure_hook("o/r", HOOK_URL, "secret") == hook_id
+    assert stub.requests["POST"] == 1
+
+
+def test_client_errors_on_post_are_raised(stub, client):
+    stub.faults.append(("POST", 422))
+    with pytest.raises(GitHubAPIError) as raised:
+        client.ensure_hook("o/r", HOOK_URL, "secret")
+    assert raised.value.status_code == 422
+
+
+def test_register_and_remove_hooks_on_many_repos(stub, client):
+    repos = [f"o/repo-{n}" for n in range(40)]
+    hook_ids, errors = client.register_hooks(repos, HOOK_URL, "secret", workers=8)
+    assert not errors
+    assert sorted(hook_ids) == sorted(repos)
+    assert client.remove_hooks(hook_ids, workers=8) == {}
+    assert not any(stub.hooks[repo] for repo in repos)
+
+
+def test_bulk_calls_report_failures_per_repo():
+    def func(repo):
+        if repo == "bad/json":
+            raise ValueError("Expecting value")
+        return repo.upper()
+
+    results, errors = GitHubClient._for_each(["a/b", "bad/json"], func, 2)
+    assert results == {"a/b": "A/B"}
+    assert list(errors) == ["bad/json"]
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+import ingest_queue
+from ingest_queue import DeliveryQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_queue, "RETRY_DELAY", 0)
+    monkeypatch.setattr(ingest_queue, "POLL_INTERVAL", 0.05)
+    queue = DeliveryQueue(str(tmp_path / "queue.db"))
+    yield queue
+    queue.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_redelivery_of_a_queued_id_is_dropped(queue):
+    assert queue.enqueue("d-1", "push", b"{}")
+    assert not queue.enqueue("d-1", "push", b"{}")
+    assert queue.enqueue("d-2", "push", b"{}")
+    assert queue.stats() == {"pending": 2}
+
+
+def test_deliveries_without_an_id_are_all_kept(queue):
+    assert queue.enqueue(None, "ping", b"{}")
+    assert queue.enqueue(None, "ping", b"{}")
+    assert queue.stats() == {"pending": 2}
+
+
+def test_processed_ids_still_dedup(queue):
+    done = threading.Event()
+    queue.start(lambda event, body: done.set(), workers=1)
+    queue.enqueue("d-1", "push", b"{}")
+    assert done.wait(5)
+    assert wait_for(lambda: queue.stats() == {"done": 1})
+    assert not queue.enqueue("d-1", "push", b"{}")
+
+
+def test_deliveries_are_processed_in_arrival_order(queue):
+    seen = []
+    for n in range(5):
+        queue.enqueue(f"d-{n}", "push", str(n).encode())
+    queue.start(lambda event, body: seen.append(body), workers=1)
+    assert wait_for(lambda: len(seen) == 5)
+    assert seen == [b"0", b"1", b"2", b"3", b"4"]
+
+
+def test_failures_are_retried_then_parked(queue):
+    attempts = []
+
+    def handler(event, body):
+        attempts.append(body)
+        raise RuntimeError("boom")
+
+    queue.enqueue("d-1", "push", b"{}")
+    queue.start(handler, workers=1)
+    assert wait_for(lambda: queue.stats() == {"failed": 1})
+    assert len(attempts) == ingest_queue.MAX_ATTEMPTS
+
+    queue.stop()
+    assert queue.replay() == 1
+    assert queue.stats() == {"pending": 1}
+
+
+def test_interrupted_deliveries_run_again_on_start(tmp_path):
+    path = str(tmp_path / "queue.db")
+    first = DeliveryQueue(path)
+    first.enqueue("d-1", "push", b"{}")
+    assert first._claim() is not None  # taken by a consumer that then died
+    first.close()
+
+    second = DeliveryQueue(path)
+    done = threading.Event()
+    second.start(lambda event, body: done.set(), workers=1)
+    assert done.wait(5)
+    second.close()
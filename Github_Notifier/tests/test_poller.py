@@ -0,0 +1,110 @@
+import json
+import time
+
+import pytest
+
+from api_stub import GitHubAPIStub
+from github_api import GitHubClient
+from poller import (DEFAULT_POLL_INTERVAL, ERROR_BACKOFF, IDLE_BACKOFF, MAX_POLL_INTERVAL, EventPoller,
+                    webhook_name, webhook_payload)
+
+
+@pytest.fixture
+def stub():
+    stub = GitHubAPIStub(poll_interval=DEFAULT_POLL_INTERVAL).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def client(stub):
+    client = GitHubClient("", base_url=stub.url)
+    yield client
+    client.close()
+
+
+def make_poller(client, sources=("o/r",), started=0):
+    delivered = []
+    poller = EventPoller(client, list(sources), lambda *delivery: delivered.append(delivery))
+    poller.started = started  # as if start() ran then, without the scheduler thread
+    return poller, delivered
+
+
+def test_webhook_name():
+    assert webhook_name("PushEvent") == "push"
+    assert webhook_name("PullRequestReviewCommentEvent") == "pull_request_review_comment"
+
+
+def test_webhook_payload_looks_like_a_webhook():
+    payload = webhook_payload({"type": "PushEvent", "actor": {"login": "alice"}, "repo": {"name": "o/r"},
+                               "payload": {"ref": "refs/heads/main"}})
+    assert payload == {"ref": "refs/heads/main", "repository": {"full_name": "o/r"},
+                       "sender": {"login": "alice"}, "pusher": {"name": "alice"}}
+
+
+def test_new_events_are_delivered_once_in_order(stub, client):
+    poller, delivered = make_poller(client)
+    source = poller.sources[0]
+    first = stub.add_event("o/r", "PushEvent", {"ref": "refs/heads/main"})
+    second = stub.add_event("o/r", "IssuesEvent", {"action": "opened"})
+    poller._poll_once(source)
+    assert [d[:2] for d in delivered] == [("push", f"event-{first}"), ("issues", f"event-{second}")]
+    assert json.loads(delivered[0][2])["repository"] == {"full_name": "o/r"}
+
+    poller._poll_once(source)  # unchanged: 304
+    third = stub.add_event("o/r", "PushEvent", {"ref": "refs/heads/dev"})
+    poller._poll_once(source)  # changed: only the event not seen before
+    assert [d[1] for d in delivered] == [f"event-{first}", f"event-{second}", f"event-{third}"]
+
+
+def test_history_from_before_the_start_is_not_replayed(stub, client):
+    stub.add_event("o/r", "PushEvent", {})
+    poller, delivered = make_poller(client, started=time.time() + 3600)
+    poller._poll_once(poller.sources[0])
+    assert delivered == []
+
+
+def test_unchanged_polls_back_off_and_new_events_reset(stub, client):
+    poller, delivered = make_poller(client)
+    source = poller.sources[0]
+    assert poller._poll_once(source) == DEFAULT_POLL_INTERVAL
+    remaining = stub.remaining
+    assert poller._poll_once(source) == DEFAULT_POLL_INTERVAL * IDLE_BACKOFF
+    assert stub.remaining == remaining  # the 304 was free
+    for _ in range(10):
+        poller._poll_once(source)
+    assert source.interval == MAX_POLL_INTERVAL
+    stub.add_event("o/r", "PushEvent", {})
+    assert poller._poll_once(source) == DEFAULT_POLL_INTERVAL
+
+
+def test_poll_interval_header_is_a_floor(stub, client):
+    stub.poll_interval = MAX_POLL_INTERVAL * 2
+    poller, _ = make_poller(client)
+    source = poller.sources[0]
+    assert poller._poll_once(source) == MAX_POLL_INTERVAL * 2
+    assert poller._poll_once(source) == MAX_POLL_INTERVAL * 2  # idle growth is capped at GitHub's floor
+
+
+def test_failed_poll_backs_off_and_is_rescheduled(stub, client):
+    stub.faults.append(("GET", 404))
+    poller, _ = make_poller(client, ["org:acme"])
+    source = poller.sources[0]
+    assert source.path == "/orgs/acme/events"
+    poller._poll(source)
+    assert source.interval == DEFAULT_POLL_INTERVAL * ERROR_BACKOFF
+    assert [entry[2] for entry in poller.schedule] == [source]
+
+
+def test_start_and_stop_deliver_through_the_scheduler(stub, client):
+    stub.poll_interval = 1
+    poller, delivered = make_poller(client)
+    poller.start()
+    try:
+        stub.add_event("o/r", "PushEvent", {})
+        deadline = time.monotonic() + 10
+        while not delivered and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        poller.stop()
+    assert len(delivered) == 1
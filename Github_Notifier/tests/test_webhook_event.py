@@ -0,0 +1,56 @@
+import hashlib
+import hmac
+import io
+import json
+
+import pytest
+
+import webhook_event
+from webhook_event import PayloadTooLarge, Signer, WebhookEvent, parse_signature
+
+SECRET = "s3cret"
+
+
+def expected_digest(body):
+    return hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+def test_parse_signature():
+    digest = "ab" * 32
+    assert parse_signature(f"sha256={digest}") == digest
+    assert parse_signature(f"sha256={digest.upper()}") == digest
+    assert parse_signature(None) is None
+    assert parse_signature("") is None
+    assert parse_signature(f"sha1={digest}") is None
+    assert parse_signature("sha256=abc") is None
+    assert parse_signature("sha256=" + "zz" * 32) is None
+
+
+def test_signer_matches_hmac_across_read_chunks(monkeypatch):
+    monkeypatch.setattr(webhook_event, "READ_CHUNK", 7)
+    body = json.dumps({"ref": "refs/heads/main", "commits": [{"message": "x" * 100}]}).encode()
+    assert Signer(SECRET).read(io.BytesIO(body), limit=len(body)) == (body, expected_digest(body))
+
+
+def test_signer_is_reusable():
+    signer = Signer(SECRET)
+    signer.read(io.BytesIO(b"first"), limit=100)
+    assert signer.read(io.BytesIO(b"second"), limit=100)[1] == expected_digest(b"second")
+
+
+def test_signer_rejects_bodies_over_the_limit(monkeypatch):
+    monkeypatch.setattr(webhook_event, "READ_CHUNK", 4)
+    stream = io.BytesIO(b"x" * 1000)
+    with pytest.raises(PayloadTooLarge):
+        Signer(SECRET).read(stream, limit=10)
+    assert stream.tell() < 1000  # stopped reading as soon as the limit was passed
+
+
+def test_webhook_event_parses_lazily():
+    event = WebhookEvent("push", b"not json")
+    assert event.body == b"not json"  # nothing parsed yet
+    event = WebhookEvent("push", json.dumps({
+        "ref": "refs/heads/main", "repository": {"full_name": "o/r"}, "pusher": {"name": "p"},
+        "commits": [{"message": "m"}]}).encode())
+    assert (event.repo_name, event.branch, event.pusher, len(event.commits)) == ("o/r", "main", "p", 1)
+    assert WebhookEvent("ping", b"").repo_name == "unknown repo"
@@ -0,0 +1,87 @@
+import hashlib
+import hmac
+import json
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# Bytes read from the request stream at a time while the signature is computed
+READ_CHUNK = 64 * 1024
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class Signer:
+    """Incremental HMAC-SHA256 for one secret; the keyed state is prepared once and copied per request."""
+
+    def __init__(self, secret):
+        self.template = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+    def read(self, stream, limit):
+        """Read a request body once, hashing it as it arrives. Returns (body, hex digest).
+
+        Raises PayloadTooLarge as soon as more than `limit` bytes arrive.
+        """
+        mac = self.template.copy()
+        chunks, size = [], 0
+        for chunk in iter(lambda: stream.read(READ_CHUNK), b""):
+            size += len(chunk)
+            if size > limit:
+                raise PayloadTooLarge(f"payload exceeds {limit} bytes")
+            mac.update(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks), mac.hexdigest()
+
+
+def parse_signature(header):
+    """The hex digest from an X-Hub-Signature-256 header, or None if it is missing or malformed."""
+    if not header:
+        return None
+    algorithm, _, digest = header.partition('=')
+    if algorithm != 'sha256' or len(digest) != 64:
+        return None
+    try:
+        bytes.fromhex(digest)
+    except ValueError:
+        return None
+    return digest.lower()
+
+
+class WebhookEvent:
+    """One delivery: event name and raw body, parsed only when a field is first read."""
+
+    __slots__ = ('name', 'body', 'delivery_id', '_payload')
+
+    def __init__(self, name, body, delivery_id=None, payload=None):
+        self.name = name
+        self.body = body
+        self.delivery_id = delivery_id
+        self._payload = payload
+
+    @property
+    def payload(self):
+        if self._payload is None:
+            self._payload = loads(self.body) if self.body else {}
+        return self._payload
+
+    @property
+    def repo_name(self):
+        return self.payload.get('repository', {}).get('full_name', 'unknown repo')
+
+    @property
+    def pusher(self):
+        return self.payload.get('pusher', {}).get('name', 'unknown pusher')
+
+    @property
+    def branch(self):
+        ref = self.payload.get('ref', '')
+        return ref.split('/')[-1] if ref else 'unknown branch'
+
+    @property
+    def commits(self):
+        return self.payload.get('commits', [])